@@ -0,0 +1,139 @@
+"""
+Citation Parser Benchmark - Rule-based parser vs LLM extraction
+INPUT: Reference strings (one per line in a text file, or the built-in samples)
+OUTPUT: Throughput of both paths + per-field agreement of the parser with the LLM
+CONSTRAINT: The LLM comparison only runs with --llm (needs GROQ_API_KEY, costs tokens)
+
+Usage (from backend/):
+    python benchmarks/citation_parser_bench.py
+    python benchmarks/citation_parser_bench.py references.txt --llm --limit 50
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from citation_parser import parse_citation, CITATION_PARSE_MIN_CONFIDENCE  # noqa: E402
+
+SAMPLES = [
+    "He, K., Zhang, X., Ren, S., & Sun, J. (2016). Deep residual learning for image recognition. In Proceedings of the IEEE conference on computer vision and pattern recognition (pp. 770-778).",
+    "LeCun, Y., Bengio, Y., & Hinton, G. (2015). Deep learning. Nature, 521(7553), 436-444.",
+    "Vaswani, A., Shazeer, N., Parmar, N., Uszkoreit, J., Jones, L., Gomez, A. N., Kaiser, L., & Polosukhin, I. (2017). Attention is all you need. Advances in Neural Information Processing Systems, 30, 5998-6008.",
+    "van der Maaten, L., & Hinton, G. (2008). Visualizing data using t-SNE. Journal of Machine Learning Research, 9, 2579-2605.",
+    "Silver, D., et al. (2016). Mastering the game of Go with deep neural networks and tree search. Nature, 529(7587), 484-489.",
+    '[1] K. He, X. Zhang, S. Ren, and J. Sun, "Deep residual learning for image recognition," in Proc. IEEE Conf. Comput. Vis. Pattern Recognit. (CVPR), 2016, pp. 770-778.',
+    '[2] A. Krizhevsky, I. Sutskever, and G. E. Hinton, "ImageNet classification with deep convolutional neural networks," in Adv. Neural Inf. Process. Syst. (NIPS), 2012, pp. 1097-1105.',
+    '[3] S. Hochreiter and J. Schmidhuber, "Long short-term memory," Neural Computation, vol. 9, no. 8, pp. 1735-1780, 1997.',
+    "Kaiming He, Xiangyu Zhang, Shaoqing Ren, and Jian Sun. 2016. Deep Residual Learning for Image Recognition. In Proceedings of the IEEE Conference on Computer Vision and Pattern Recognition (CVPR). 770-778.",
+    "Jacob Devlin, Ming-Wei Chang, Kenton Lee, and Kristina Toutanova. 2019. BERT: Pre-training of Deep Bidirectional Transformers for Language Understanding. In Proceedings of NAACL-HLT. 4171-4186.",
+    "As Vaswani et al. showed in 2017, attention is all you need for translation.",
+    "Smith (2017). Attention is all you need.",
+]
+
+FIELDS = ["authors", "year", "title", "venue", "pages"]
+
+
+def _tokens(value: object) -> set:
+    return set(re.findall(r"[a-z0-9]+", str(value or "").lower()))
+
+
+def fields_agree(field: str, ours: object, theirs: object) -> bool:
+    """Loose equality: same year/pages, first author surname, or overlapping title/venue words."""
+    a, b = _tokens(ours), _tokens(theirs)
+    if not a and not b:
+        return True
+    if not a or not b:
+        return False
+    if field in ("year", "pages"):
+        return a == b
+    if field == "authors":
+        first = re.findall(r"[A-Za-z\-]{2,}", str(ours))
+        return bool(first) and first[0].lower() in b
+    # Abbreviated venues ("Proc. CVPR") still share words with the full name
+    return len(a & b) / min(len(a), len(b)) >= 0.6
+
+
+def bench_parser(lines: List[str], rounds: int) -> Dict:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [parse_citation(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    accepted = sum(1 for citation, confidence in results
+                   if citation is not None and confidence >= CITATION_PARSE_MIN_CONFIDENCE)
+    return {
+        "results": results,
+        "per_second": len(lines) * rounds / elapsed if elapsed else float("inf"),
+        "accepted": accepted
+    }
+
+
+async def bench_llm(lines: List[str]) -> Dict:
+    from citation_checker import extract_citations_with_llm
+
+    start = time.perf_counter()
+    extracted: List[Optional[Dict]] = []
+    for line in lines:
+        citations = await extract_citations_with_llm(line)
+        extracted.append(citations[0] if citations else None)
+    elapsed = time.perf_counter() - start
+    return {"results": extracted, "per_second": len(lines) / elapsed if elapsed else float("inf")}
+
+
+def report_agreement(lines: List[str], parsed: List, llm: List[Optional[Dict]]) -> None:
+    agree = {field: 0 for field in FIELDS}
+    compared = 0
+    for line, (citation, confidence), reference in zip(lines, parsed, llm):
+        if citation is None or confidence < CITATION_PARSE_MIN_CONFIDENCE or reference is None:
+            continue
+        compared += 1
+        for field in FIELDS:
+            if fields_agree(field, citation.get(field), reference.get(field)):
+                agree[field] += 1
+            else:
+                print(f"  [{field}] parser={citation.get(field)!r} llm={reference.get(field)!r}  <- {line[:60]}")
+
+    print(f"\nAgreement on {compared} citations accepted by the parser:")
+    for field in FIELDS:
+        share = agree[field] / compared if compared else 0.0
+        print(f"  {field:<8} {share:6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the rule-based citation parser")
+    parser.add_argument("file", nargs="?", help="Text file with one reference per line")
+    parser.add_argument("--rounds", type=int, default=200, help="Parser repetitions for timing")
+    parser.add_argument("--llm", action="store_true", help="Also run the LLM path and compare fields")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N references")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+    else:
+        lines = SAMPLES
+    if args.limit:
+        lines = lines[:args.limit]
+
+    stats = bench_parser(lines, args.rounds)
+    print(f"References: {len(lines)}")
+    print(f"Parser: {stats['per_second']:,.0f} citations/s, "
+          f"{stats['accepted']}/{len(lines)} above confidence {CITATION_PARSE_MIN_CONFIDENCE}")
+
+    if not args.llm:
+        print("LLM path skipped (pass --llm to compare throughput and agreement)")
+        return
+
+    llm = asyncio.run(bench_llm(lines))
+    print(f"LLM:    {llm['per_second']:,.2f} citations/s "
+          f"(parser is {stats['per_second'] / llm['per_second']:,.0f}x faster)")
+    report_agreement(lines, stats["results"], llm["results"])
+
+
+if __name__ == "__main__":
+    main()
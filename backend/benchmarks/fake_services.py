@@ -0,0 +1,279 @@
+"""
+Fake Services - Local stand-ins for Groq, SerpAPI and DuckDuckGo for offline load tests
+INPUT: The HTTP requests the backend makes to those services
+OUTPUT: Plausible responses after a configurable latency, with injected errors and 429s
+CONSTRAINT: No network access or API keys; answers are derived from the prompt / query
+            so repeated requests get the same answer
+
+Endpoints:
+    POST /openai/v1/chat/completions   Groq chat completions (JSON or SSE streaming)
+    GET  /serpapi/search               SerpAPI Google results (organic_results)
+    GET  /ddg/search                   DuckDuckGo results as DDGS returns them
+    GET  /stats                        Calls, errors, 429s and tokens per service
+
+Usage (from backend/):
+    python benchmarks/fake_services.py --port 9100 --groq-latency-ms 400 --groq-429-rate 0.02
+    GROQ_BASE_URL=http://127.0.0.1:9100 GROQ_API_KEY=fake \\
+    SERP_API_KEY=fake SERPAPI_URL=http://127.0.0.1:9100/serpapi/search \\
+    DDG_STANDIN_URL=http://127.0.0.1:9100/ddg/search \\
+        uvicorn main:app --port 8000
+"""
+
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from aiohttp import web
+
+STATUSES = ("VERIFIED", "HALLUCINATED", "UNVERIFIABLE")
+
+# Share of verdicts per status (the rest of the pipeline sees a realistic mix)
+STATUS_WEIGHTS = (0.6, 0.25, 0.15)
+
+# Content characters per streamed chunk
+STREAM_CHUNK_CHARS = 24
+
+CHARS_PER_TOKEN = 4
+
+
+class ServiceBehaviour:
+    """Latency distribution, failure injection and counters for one fake service."""
+
+    def __init__(self, name: str, latency_ms: float, sigma: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, rpm: int = 0, retry_after: float = 1.0,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.random = rng or random.Random()
+        self._recent: Deque[float] = deque()
+        self.stats = {"calls": 0, "ok": 0, "errors": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    async def delay(self) -> None:
+        """Sleep for a lognormal latency whose median is latency_ms."""
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000 * math.exp(self.random.gauss(0, self.sigma)))
+
+    def fault(self) -> Optional[web.Response]:
+        """An injected 429 / 500 response, or None to answer normally."""
+        self.stats["calls"] += 1
+        now = time.monotonic()
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+
+        if (self.rpm and len(self._recent) >= self.rpm) or self.random.random() < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429, headers={"retry-after": str(self.retry_after)}
+            )
+        self._recent.append(now)
+        if self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"error": {"message": "Injected failure", "type": "internal_error"}}, status=500)
+        self.stats["ok"] += 1
+        return None
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _status_for(text: str, rng: random.Random, disagree_rate: float) -> str:
+    """Stable status per claim, flipped now and then so adaptive voting needs tie-breakers."""
+    point = (_digest(text) % 1000) / 1000
+    cumulative = 0.0
+    status = STATUSES[-1]
+    for candidate, weight in zip(STATUSES, STATUS_WEIGHTS):
+        cumulative += weight
+        if point < cumulative:
+            status = candidate
+            break
+    if rng.random() < disagree_rate:
+        status = rng.choice([s for s in STATUSES if s != status])
+    return status
+
+
+def _section(prompt: str, start: str, end: str) -> str:
+    match = re.search(re.escape(start) + r"\s*(.*?)\s*" + re.escape(end), prompt, re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.strip()) > 10]
+
+
+def answer(prompt: str, rng: random.Random, disagree_rate: float) -> str:
+    """Model output for each of the backend's prompts."""
+    if "claim extraction assistant" in prompt:
+        text = _section(prompt, "TEXT TO ANALYZE:", "Return a JSON array")
+        return json.dumps([{"claim": s.rstrip(".")} for s in _sentences(text)[:5]])
+
+    if "For EACH numbered claim" in prompt:
+        claims = re.findall(r"CLAIM (\d+):\n(.*?)\n", prompt)
+        return json.dumps([
+            {"id": int(i), "status": _status_for(claim, rng, disagree_rate), "reason": "Checked against the sources"}
+            for i, claim in claims
+        ])
+
+    if "fact-checking assistant" in prompt:
+        claim = _section(prompt, "CLAIM TO VERIFY:", "SEARCH RESULTS:")
+        return json.dumps({"status": _status_for(claim, rng, disagree_rate), "reason": "Checked against the sources"})
+
+    if "parsing academic citations" in prompt:
+        text = _section(prompt, "TEXT:", "Extract ALL citations")
+        citations = []
+        for line in text.splitlines():
+            year = re.search(r"\b(19|20)\d{2}\b", line)
+            if year:
+                citations.append({
+                    "raw_citation": line.strip(),
+                    "authors": line.split("(")[0].strip(" .,"),
+                    "year": year.group(),
+                    "title": line[year.end():].strip(" ).,")[:120],
+                    "venue": "",
+                    "pages": ""
+                })
+        return json.dumps(citations)
+
+    if "citation verifier" in prompt:
+        title = _section(prompt, "- Title:", "- Venue:")
+        status = _status_for(title, rng, disagree_rate)
+        errors = [] if status == "VERIFIED" else ["Year does not match the sources"]
+        return json.dumps({"status": status, "errors": errors, "reason": "Compared with the search results"})
+
+    return "[]"
+
+
+def search_results(query: str, count: int) -> List[Dict[str, str]]:
+    """Results that mention the query, so evidence selection and snippet checks have text to work with."""
+    digest = f"{_digest(query):08x}"
+    return [
+        {
+            "title": f"{query[:60]} - Reference {i + 1}",
+            "url": f"https://reference{i + 1}.example.org/{digest}",
+            "snippet": f"{query}. Sources published in {2000 + _digest(query) % 24} discuss this in detail."
+        }
+        for i in range(count)
+    ]
+
+
+def build_app(groq: ServiceBehaviour, serpapi: ServiceBehaviour, ddg: ServiceBehaviour,
+              disagree_rate: float = 0.1) -> web.Application:
+    rng = random.Random(0)
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        await groq.delay()
+        fault = groq.fault()
+        if fault is not None:
+            return fault
+
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = answer(prompt, rng, disagree_rate)
+        usage = {
+            "prompt_tokens": len(prompt) // CHARS_PER_TOKEN,
+            "completion_tokens": len(content) // CHARS_PER_TOKEN + 1
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        groq.stats["prompt_tokens"] += usage["prompt_tokens"]
+        groq.stats["completion_tokens"] += usage["completion_tokens"]
+        base = {"id": f"chatcmpl-{_digest(prompt + str(time.time())):x}", "created": int(time.time()),
+                "model": body.get("model", "fake")}
+
+        if not body.get("stream"):
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        for piece in pieces:
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            # Tokens arrive over time, as from a real model
+            await asyncio.sleep(0.002)
+        last = {**base, "object": "chat.completion.chunk", "x_groq": {"usage": usage},
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        await response.write(f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    async def serpapi_search(request: web.Request) -> web.Response:
+        await serpapi.delay()
+        fault = serpapi.fault()
+        if fault is not None:
+            return fault
+        results = search_results(request.query.get("q", ""), int(request.query.get("num", "3")))
+        return web.json_response({"organic_results": [
+            {"position": i + 1, "title": r["title"], "link": r["url"], "snippet": r["snippet"]}
+            for i, r in enumerate(results)
+        ]})
+
+    async def ddg_search(request: web.Request) -> web.Response:
+        await ddg.delay()
+        fault = ddg.fault()
+        if fault is not None:
+            return fault
+        results = search_results(request.query.get("q", ""), int(request.query.get("max_results", "3")))
+        return web.json_response([{"title": r["title"], "href": r["url"], "body": r["snippet"]} for r in results])
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({s.name: s.stats for s in (groq, serpapi, ddg)})
+
+    app = web.Application()
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    app.router.add_get("/serpapi/search", serpapi_search)
+    app.router.add_get("/ddg/search", ddg_search)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Groq / SerpAPI / DuckDuckGo services for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--disagree-rate", type=float, default=0.1, help="Share of votes that flip status")
+    for name, latency in (("groq", 400), ("serpapi", 600), ("ddg", 900)):
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=latency, help="Median latency")
+        parser.add_argument(f"--{name}-sigma", type=float, default=0.5, help="Lognormal spread of the latency")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help="Share of 500 responses")
+        parser.add_argument(f"--{name}-429-rate", type=float, default=0.0, help="Share of 429 responses")
+        parser.add_argument(f"--{name}-rpm", type=int, default=0, help="429 above this many requests/min (0 = off)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    services = [
+        ServiceBehaviour(
+            name,
+            latency_ms=getattr(args, f"{name}_latency_ms"),
+            sigma=getattr(args, f"{name}_sigma"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+            rate_limit_rate=getattr(args, f"{name}_429_rate"),
+            rpm=getattr(args, f"{name}_rpm"),
+            rng=random.Random(rng.random())
+        )
+        for name in ("groq", "serpapi", "ddg")
+    ]
+    web.run_app(build_app(*services, disagree_rate=args.disagree_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
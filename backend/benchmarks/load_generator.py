@@ -0,0 +1,207 @@
+"""
+Load Generator - Drive /verify and /verify-citations at a target request rate
+INPUT: Backend URL, target RPS, duration, endpoint mix (+ optional texts file)
+OUTPUT: Latency percentiles (p50/p95/p99), throughput, errors and LLM calls per request
+CONSTRAINT: Open loop - requests start on schedule whether or not earlier ones have
+            finished, so a slow backend shows up as latency instead of a lower rate
+
+LLM calls per request come from the backend's /metrics (llm_calls_total); with
+--fake-url the fake services' own counters (benchmarks/fake_services.py) are reported too.
+
+Usage (from backend/):
+    python benchmarks/load_generator.py --url http://127.0.0.1:8000 --rps 10 --duration 60
+    python benchmarks/load_generator.py --endpoint verify-citations --rps 5 --fake-url http://127.0.0.1:9100
+"""
+
+import re
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+CLAIM_TEXTS = [
+    "The Eiffel Tower was completed in 1889 in Paris. It is 330 metres tall.",
+    "Albert Einstein discovered penicillin in 1928. He was born in Germany.",
+    "The Great Wall of China is visible from the Moon with the naked eye.",
+    "Water boils at 100 degrees Celsius at sea level. Ice is less dense than water.",
+    "Apollo 11 landed on the Moon in 1969. Neil Armstrong was the first person to walk on it.",
+]
+
+CITATION_TEXTS = [
+    "He, K., Zhang, X., Ren, S., & Sun, J. (2016). Deep residual learning for image recognition. "
+    "In Proceedings of the IEEE conference on computer vision and pattern recognition (pp. 770-778).",
+    "LeCun, Y., Bengio, Y., & Hinton, G. (2015). Deep learning. Nature, 521(7553), 436-444.",
+    "Vaswani, A., et al. (2017). Attention is all you need. Advances in Neural Information "
+    "Processing Systems, 30, 5998-6008.",
+]
+
+ENDPOINTS = {"verify": "/verify", "verify-citations": "/verify-citations"}
+
+LLM_CALLS_LINE = re.compile(r'^unhallucinate_llm_calls_total\{[^}]*outcome="([^"]+)"[^}]*\}\s+([0-9.e+-]+)$', re.M)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def llm_calls(session: aiohttp.ClientSession, url: str) -> Optional[float]:
+    """Total Groq calls (all outcomes) reported by the backend, or None if /metrics is unavailable."""
+    try:
+        async with session.get(f"{url}/metrics") as response:
+            text = await response.text()
+    except aiohttp.ClientError:
+        return None
+    return sum(float(value) for _, value in LLM_CALLS_LINE.findall(text))
+
+
+async def fake_stats(session: aiohttp.ClientSession, fake_url: Optional[str]) -> Optional[Dict]:
+    if not fake_url:
+        return None
+    async with session.get(f"{fake_url}/stats") as response:
+        return await response.json()
+
+
+async def run_load(
+    url: str,
+    rps: float,
+    duration: float,
+    endpoints: List[str],
+    claim_texts: List[str],
+    citation_texts: List[str],
+    timeout: float,
+    max_in_flight: int,
+    fake_url: Optional[str] = None
+) -> Dict:
+    """Send requests on an open-loop schedule and summarize the outcome."""
+    latencies: Dict[str, List[float]] = {name: [] for name in endpoints}
+    statuses: Counter = Counter()
+    total = int(rps * duration)
+    slots = asyncio.Semaphore(max_in_flight)
+    skipped = 0
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        calls_before = await llm_calls(session, url)
+        fake_before = await fake_stats(session, fake_url)
+
+        async def one(i: int) -> None:
+            name = endpoints[i % len(endpoints)]
+            texts = claim_texts if name == "verify" else citation_texts
+            started = time.perf_counter()
+            try:
+                async with session.post(url + ENDPOINTS[name], json={"text": texts[i % len(texts)]}) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+                    if response.status == 200:
+                        latencies[name].append(time.perf_counter() - started)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                statuses[type(e).__name__] += 1
+            finally:
+                slots.release()
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Past max_in_flight the backend is hopelessly behind: count, don't pile on
+            if slots.locked():
+                skipped += 1
+                continue
+            await slots.acquire()
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+        calls_after = await llm_calls(session, url)
+        fake_after = await fake_stats(session, fake_url)
+
+    completed = sum(len(v) for v in latencies.values())
+    all_latencies = [x for v in latencies.values() for x in v]
+    report = {
+        "target_rps": rps,
+        "duration_s": round(elapsed, 2),
+        "sent": len(tasks),
+        "skipped": skipped,
+        "completed": completed,
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency_ms": {
+            name: summarize(values) for name, values in list(latencies.items()) + [("all", all_latencies)]
+        }
+    }
+    if calls_before is not None and calls_after is not None and completed:
+        report["llm_calls_per_request"] = round((calls_after - calls_before) / completed, 2)
+    if fake_before is not None and fake_after is not None:
+        report["fake_services"] = {
+            name: {key: fake_after[name][key] - fake_before[name][key] for key in fake_after[name]}
+            for name in fake_after
+        }
+    return report
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.50) * 1000, 1),
+        "p95": round(percentile(values, 0.95) * 1000, 1),
+        "p99": round(percentile(values, 0.99) * 1000, 1),
+        "max": round(max(values) * 1000, 1) if values else 0.0
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"Sent {report['sent']} requests in {report['duration_s']}s "
+          f"(target {report['target_rps']} rps, {report['skipped']} skipped)")
+    print(f"Completed {report['completed']} -> {report['throughput_rps']} rps; statuses: {report['statuses']}")
+    for name, stats in report["latency_ms"].items():
+        print(f"  {name:<17} n={stats['count']:<5} p50={stats['p50']:>8}ms p95={stats['p95']:>8}ms "
+              f"p99={stats['p99']:>8}ms max={stats['max']:>8}ms")
+    if "llm_calls_per_request" in report:
+        print(f"LLM calls per request: {report['llm_calls_per_request']}")
+    for name, stats in report.get("fake_services", {}).items():
+        print(f"  fake {name}: {stats}")
+
+
+def load_texts(path: Optional[str]) -> Tuple[List[str], List[str]]:
+    if not path:
+        return CLAIM_TEXTS, CITATION_TEXTS
+    with open(path, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    return texts, texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend base URL")
+    parser.add_argument("--rps", type=float, default=5.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send requests for")
+    parser.add_argument("--endpoint", choices=["verify", "verify-citations", "mixed"], default="verify")
+    parser.add_argument("--texts", help="File with one request text per line (default: built-in samples)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--fake-url", help="Fake services base URL, to report their call counts")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    endpoints = list(ENDPOINTS) if args.endpoint == "mixed" else [args.endpoint]
+    claim_texts, citation_texts = load_texts(args.texts)
+    report = asyncio.run(run_load(
+        args.url.rstrip("/"), args.rps, args.duration, endpoints, claim_texts, citation_texts,
+        args.timeout, args.max_in_flight, args.fake_url
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
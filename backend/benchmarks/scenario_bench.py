@@ -0,0 +1,229 @@
+"""
+Scenario Benchmark - End-to-end latency and calls per request, replayed from a cassette
+INPUT: The /verify and /verify-citations cases in tests/test_scenarios.py, and a cassette
+       of the Groq / search interactions they make (recorded once with --record)
+OUTPUT: Per-scenario latency and LLM / search calls, compared with a stored baseline;
+        exits 1 on regressions so it can gate commits
+CONSTRAINT: Replay needs no network or API keys. Caches (verdicts, search results,
+            knowledge base, citation index) are turned off so every run does the same work
+
+Usage (from backend/):
+    python benchmarks/scenario_bench.py --record            # real services (or fake_services.py, see tests/README.md)
+    python benchmarks/scenario_bench.py --update-baseline   # after an intended change
+    python benchmarks/scenario_bench.py                     # compare with the baseline
+    python benchmarks/scenario_bench.py --latency zero      # pipeline overhead only
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, "tests"))
+
+BENCH_DIR = os.path.join(BACKEND_DIR, "benchmarks")
+DEFAULT_CASSETTE = os.path.join(BENCH_DIR, "cassettes", "scenarios.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "scenarios-{latency}.json")
+
+LLM_BOUNDARIES = ("llm", "llm_stream")
+SEARCH_BOUNDARIES = ("search_serpapi", "search_duckduckgo")
+
+
+
+def disable_caches() -> None:
+    """Every run must do the full pipeline, whatever is configured locally (call before importing main)."""
+    for name in ("VERDICT_CACHE_PATH", "KNOWLEDGE_BASE_PATH", "CITATION_INDEX_PATH"):
+        os.environ[name] = ""
+    os.environ["SEARCH_CACHE_SIZE"] = "0"
+
+
+def scenarios() -> List[Tuple[str, str, str]]:
+    """(name, endpoint, text) for every case in tests/test_scenarios.py."""
+    from test_scenarios import CLAIM_TEST_CASES, CITATION_TEST_CASES
+    cases = [("/verify", case) for case in CLAIM_TEST_CASES]
+    cases += [("/verify-citations", case) for case in CITATION_TEST_CASES]
+    return [(f"{endpoint} {case['desc']}", endpoint, case["input"]) for endpoint, case in cases]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(client, cassette, repeat: int) -> Dict[str, Dict]:
+    """Latency (median of `repeat` runs) and boundary calls for each scenario."""
+    results = {}
+    for name, endpoint, text in scenarios():
+        latencies = []
+        for _ in range(repeat):
+            cassette.rewind()
+            cassette.reset_stats()
+            started = time.perf_counter()
+            response = client.post(endpoint, json={"text": text})
+            latencies.append(time.perf_counter() - started)
+        results[name] = {
+            "status": response.status_code,
+            "latency_ms": round(statistics.median(latencies) * 1000, 1),
+            "llm_calls": sum(cassette.calls[b] for b in LLM_BOUNDARIES),
+            "search_calls": sum(cassette.calls[b] for b in SEARCH_BOUNDARIES),
+            "misses": sum(cassette.misses.values())
+        }
+    return results
+
+
+def summary(results: Dict[str, Dict]) -> Dict:
+    return {
+        "total_ms": round(sum(r["latency_ms"] for r in results.values()), 1),
+        "llm_calls": sum(r["llm_calls"] for r in results.values()),
+        "search_calls": sum(r["search_calls"] for r in results.values())
+    }
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict], tolerance: float, slack_ms: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`: more calls than before, or latency
+    more than `tolerance` (relative) and `slack_ms` (absolute) above the baseline.
+    """
+    def slower(before: float, after: float) -> bool:
+        return after > before * (1 + tolerance) and after - before > slack_ms
+
+    regressions = []
+    for name, after in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for calls in ("llm_calls", "search_calls"):
+            if after[calls] > before[calls]:
+                regressions.append(f"{name}: {calls} {before[calls]} -> {after[calls]}")
+        if slower(before["latency_ms"], after["latency_ms"]):
+            regressions.append(f"{name}: latency {before['latency_ms']}ms -> {after['latency_ms']}ms")
+
+    before_total, after_total = summary(baseline)["total_ms"], summary(current)["total_ms"]
+    if slower(before_total, after_total):
+        regressions.append(f"total latency {before_total}ms -> {after_total}ms")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]]) -> None:
+    for name, r in results.items():
+        before = (baseline or {}).get(name)
+        change = f" (baseline {before['latency_ms']}ms)" if before else ""
+        print(f"  {name[:60]:<60} {r['latency_ms']:>9}ms{change:<22} llm={r['llm_calls']:<3} "
+              f"search={r['search_calls']:<3} status={r['status']}")
+    totals = summary(results)
+    print(f"Total {totals['total_ms']}ms, {totals['llm_calls']} LLM calls, {totals['search_calls']} search calls "
+          f"for {len(results)} scenarios")
+
+
+def load_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True, ensure_ascii=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--baseline", help="Baseline file (default: benchmarks/baselines/scenarios-<latency>.json)")
+    parser.add_argument("--record", action="store_true", help="Call the real services and (re)write the cassette")
+    parser.add_argument("--latency", choices=["exact", "zero"], default="exact", help="Replayed service latency")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (median latency is kept)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative latency increase")
+    parser.add_argument("--slack-ms", type=float, default=25.0, help="Latency increases below this are ignored")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--history", help="Append this run's totals to a JSON-lines file")
+    args = parser.parse_args()
+
+    disable_caches()
+    import cassettes
+    from fastapi.testclient import TestClient
+
+    if args.record:
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+        from main import app
+        import search_module
+        from search_backends import SEARCH_BACKENDS, get_backend
+        with cassettes.using(args.cassette, cassettes.RECORD) as cassette, TestClient(app) as client:
+            cassette.meta["search_backends"] = [
+                name for name in SEARCH_BACKENDS if get_backend(name) is not None and get_backend(name).available()
+            ]
+            # Real services or the fake_services.py stand-ins
+            cassette.meta["services"] = {
+                "groq": os.getenv("GROQ_BASE_URL") or "https://api.groq.com",
+                "serpapi": search_module.SERPAPI_URL,
+                "duckduckgo": search_module.DDG_STANDIN_URL or "ddgs"
+            }
+            results = run(client, cassette, repeat=1)
+        print_results(results, None)
+        print(f"Recorded {len(cassette.interactions)} interactions to {args.cassette}")
+        return 0
+
+    if not os.path.exists(args.cassette):
+        print(f"No cassette at {args.cassette}; record one with --record")
+        return 2
+    # Enable the search backends the recording used; API keys are only checked, never sent
+    backends = load_json(args.cassette).get("meta", {}).get("search_backends", [])
+    os.environ["SEARCH_BACKENDS"] = ",".join(backends)
+    os.environ.setdefault("GROQ_API_KEY", "replay")
+    if "serpapi" in backends:
+        os.environ.setdefault("SERP_API_KEY", "replay")
+
+    from main import app
+    with cassettes.using(args.cassette, cassettes.REPLAY, args.latency) as cassette, TestClient(app) as client:
+        results = run(client, cassette, args.repeat)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE.format(latency=args.latency)
+    stored = load_json(baseline_path)
+    baseline = stored["scenarios"] if stored else None
+    print_results(results, baseline)
+
+    misses = sum(r["misses"] for r in results.values())
+    if misses and args.latency == "exact":
+        print(f"{misses} calls were not in the cassette (prompts or queries changed?); re-record with --record")
+    elif misses:
+        # Without latency, claims that streamed in one by one arrive together and are batched differently
+        print(f"{misses} calls were not in the cassette (expected with --latency zero when batching changes)")
+
+    regressions = compare(baseline, results, args.tolerance, args.slack_ms) if baseline else []
+    commit = git_commit()
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"commit": commit, "time": int(time.time()), "latency": args.latency,
+                                **summary(results), "misses": misses, "regressions": len(regressions)}) + "\n")
+
+    if args.update_baseline:
+        write_json(baseline_path, {"commit": commit, "latency": args.latency, "repeat": args.repeat,
+                                   "scenarios": results, **summary(results)})
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; create one with --update-baseline")
+    elif regressions:
+        print(f"{len(regressions)} regressions against {stored.get('commit')}:")
+        for line in regressions:
+            print(f"  {line}")
+    else:
+        print(f"No regressions against {stored.get('commit')}")
+    return 1 if regressions or (misses and args.latency == "exact") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Cassettes Module - Record and replay Groq and search interactions
+INPUT: Calls crossing the external-service boundaries (llm_client.complete /
+       stream_complete, search_module.search_serpapi / search_duckduckgo)
+OUTPUT: A cassette file of requests, responses and observed latencies (record),
+        or the recorded responses without touching the network (replay)
+CONSTRAINT: Off by default; with no cassette active a boundary costs one global
+            lookup. Replay either sleeps for the recorded latency ("exact", so
+            timing-dependent code like hedging behaves as it did) or not at all ("zero")
+
+Set CASSETTE_MODE=record|replay and CASSETTE_PATH to run the server against a
+cassette, or use `using()` in scripts (see benchmarks/scenario_bench.py).
+"""
+
+import os
+import json
+import time
+import atexit
+import asyncio
+import hashlib
+import inspect
+import logging
+import functools
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+# "record" (call the real services and store what they return), "replay", or empty (off)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "").lower()
+
+# Cassette file (JSON)
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassette.json")
+
+# Replayed latency: "exact" (as recorded) or "zero"
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "exact").lower()
+
+# Extra seconds a call cancelled while recording waits to be cancelled again on replay
+CASSETTE_CANCEL_GRACE = float(os.getenv("CASSETTE_CANCEL_GRACE", "1.0"))
+
+RECORD = "record"
+REPLAY = "replay"
+EXACT = "exact"
+ZERO = "zero"
+
+FORMAT_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded interaction for a call."""
+
+
+class CassetteMismatch(CassetteMiss):
+    """Replay diverged from the recording (e.g. a call recorded as cancelled was not cancelled)."""
+
+
+class Cassette:
+    """
+    Interactions keyed by boundary and call arguments. A key called several
+    times (e.g. repeated votes) replays its recordings in order, then repeats the last.
+    Calls cancelled while recording are replayed as calls that wait to be cancelled.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, latency: str = EXACT,
+                 cancel_grace: float = CASSETTE_CANCEL_GRACE):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if latency not in (EXACT, ZERO):
+            raise ValueError(f"Unknown cassette latency: {latency}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.cancel_grace = cancel_grace
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        # Free-form context about the recording (e.g. which backends were enabled)
+        self.meta: Dict[str, Any] = {}
+        self.calls: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._positions: Counter = Counter()
+        if mode == REPLAY or os.path.exists(path):
+            self.load()
+
+    def load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+        self.interactions = data["interactions"]
+        self.meta = data.get("meta", {})
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "meta": self.meta, "interactions": self.interactions}, f,
+                      indent=1, sort_keys=True, ensure_ascii=False)
+        log.info("Saved cassette %s (%d keys)", self.path, len(self.interactions))
+
+    def rewind(self) -> None:
+        """Replay every key from its first recording again."""
+        self._positions.clear()
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.misses.clear()
+
+    def next(self, key: str, boundary: str) -> Dict[str, Any]:
+        entries = self.interactions.get(key)
+        if not entries:
+            self.misses[boundary] += 1
+            raise CassetteMiss(f"No recorded {boundary} interaction for key {key}")
+        position = self._positions[key]
+        self._positions[key] += 1
+        return entries[min(position, len(entries) - 1)]
+
+    def add(self, key: str, entry: Dict[str, Any]) -> None:
+        self.interactions.setdefault(key, []).append(entry)
+
+    async def wait(self, seconds: float) -> None:
+        if self.latency == EXACT and seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def wait_for_cancel(self, key: str, boundary: str, seconds: float) -> None:
+        """
+        Replay of a call that was cancelled while recording (e.g. a hedge that lost the race):
+        wait up to the recorded time plus cancel_grace to be cancelled, then raise CassetteMismatch.
+        """
+        timeout = (max(seconds, 0.0) if self.latency == EXACT else 0.0) + self.cancel_grace
+        try:
+            await asyncio.wait_for(asyncio.get_running_loop().create_future(), timeout)
+        except asyncio.TimeoutError:
+            self.misses[boundary] += 1
+            raise CassetteMismatch(
+                f"{boundary} interaction {key} was cancelled while recording but not within {timeout:.1f}s on replay"
+            ) from None
+
+
+_active: Optional[Cassette] = None
+
+
+def active() -> Optional[Cassette]:
+    return _active
+
+
+def activate(cassette: Optional[Cassette]) -> None:
+    global _active
+    _active = cassette
+
+
+@contextmanager
+def using(path: str, mode: str = REPLAY, latency: str = EXACT, **options: Any) -> Iterator[Cassette]:
+    """Route the boundaries through a cassette for the duration of the block (saved after recording)."""
+    cassette = Cassette(path, mode, latency, **options)
+    previous = _active
+    activate(cassette)
+    try:
+        yield cassette
+    finally:
+        activate(previous)
+        if mode == RECORD:
+            cassette.save()
+
+
+def _arguments(signature: inspect.Signature, args: tuple, kwargs: Dict, ignore: Sequence[str]) -> Dict[str, Any]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        else:
+            arguments[name] = value
+    return {name: value for name, value in arguments.items() if name not in ignore}
+
+
+def _key(boundary: str, arguments: Dict[str, Any]) -> str:
+    payload = json.dumps(arguments, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{boundary}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+
+
+def boundary(
+    name: str,
+    ignore: Sequence[str] = (),
+    encode: Callable[[Any], Any] = lambda value: value,
+    decode: Callable[[Any], Any] = lambda value: value,
+    bypass: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Callable:
+    """
+    Decorator for an async function that calls an external service.
+
+    Args:
+        name: Boundary name (cassette keys and call counts)
+        ignore: Arguments left out of the key (e.g. timeouts)
+        encode / decode: Convert the return value to / from JSON-compatible data
+        bypass: Calls it returns True for always go to the real function
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cassette = _active
+            if cassette is None:
+                return await func(*args, **kwargs)
+            arguments = _arguments(signature, args, kwargs, ignore)
+            if bypass is not None and bypass(arguments):
+                return await func(*args, **kwargs)
+
+            cassette.calls[name] += 1
+            key = _key(name, arguments)
+            if cassette.mode == REPLAY:
+                entry = cassette.next(key, name)
+                if entry.get("cancelled"):
+                    await cassette.wait_for_cancel(key, name, entry["latency"])
+                await cassette.wait(entry["latency"])
+                return decode(entry["response"])
+
+            started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                cassette.add(key, {"request": arguments, "cancelled": True,
+                                   "latency": round(time.monotonic() - started, 4)})
+                raise
+            cassette.add(key, {
+                "request": arguments,
+                "response": encode(result),
+                "latency": round(time.monotonic() - started, 4)
+            })
+            return result
+        return wrapper
+    return decorator
+
+
+def stream_boundary(name: str, ignore: Sequence[str] = ()) -> Callable:
+    """Like boundary(), for async generators of JSON-compatible items (e.g. content deltas)."""
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+            cassette = _active
+            if cassette is None:
+                async for item in func(*args, **kwargs):
+                    yield item
+                return
+
+            cassette.calls[name] += 1
+            arguments = _arguments(signature, args, kwargs, ignore)
+            key = _key(name, arguments)
+            started = time.monotonic()
+            if cassette.mode == REPLAY:
+                entry = cassette.next(key, name)
+                for offset, item in entry["chunks"]:
+                    await cassette.wait(started + offset - time.monotonic())
+                    yield item
+                if entry.get("cancelled"):
+                    await cassette.wait_for_cancel(key, name, started + entry["latency"] - time.monotonic())
+                await cassette.wait(started + entry["latency"] - time.monotonic())
+                return
+
+            chunks = []
+            cancelled = False
+            try:
+                async for item in func(*args, **kwargs):
+                    chunks.append([round(time.monotonic() - started, 4), item])
+                    yield item
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                entry = {"request": arguments, "chunks": chunks, "latency": round(time.monotonic() - started, 4)}
+                if cancelled:
+                    entry["cancelled"] = True
+                cassette.add(key, entry)
+        return wrapper
+    return decorator
+
+
+if CASSETTE_MODE:
+    activate(Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_LATENCY))
+    if CASSETTE_MODE == RECORD:
+        atexit.register(_active.save)
@@ -0,0 +1,155 @@
+"""
+Circuit Breaker Module - Skip dependencies that are known to be failing
+INPUT: Outcome (success / failure + latency) of every call to a dependency
+OUTPUT: Whether the next call may go ahead, plus per-dependency health state
+CONSTRAINT: Rolling time window; opens on a high error rate or too many slow calls,
+            lets one probe through after BREAKER_OPEN_SECONDS (half-open) to recover
+"""
+
+import os
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+# Rolling window the error / slow-call rates are computed over
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+
+# Calls needed in the window before the breaker may open
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+
+# Open when this share of calls failed, or this share was slower than the slow-call limit
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "4"))
+
+# How long an open breaker rejects calls before letting a probe through
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-dependency breaker. Callers ask allow() before a call and report
+    the outcome with record_success() / record_failure().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = BREAKER_WINDOW_SECONDS,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate: float = BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_started = 0.0
+        # (time, ok, latency) of recent calls
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def _open(self, now: float) -> None:
+        if self.state != OPEN:
+            log.warning("Circuit breaker '%s' opened", self.name)
+        self.state = OPEN
+        self.opened_at = now
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. Rejected calls should fail fast."""
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self._probe_started = 0.0
+
+        if self.state == HALF_OPEN:
+            # One probe at a time; a probe that never reports back is retried after open_seconds
+            if now - self._probe_started >= self.open_seconds:
+                self._probe_started = now
+                return True
+        elif self.state == CLOSED:
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            log.info("Circuit breaker '%s' closed", self.name)
+            self.state = CLOSED
+            self._calls.clear()
+        self._record(now, True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._open(now)
+            return
+        self._record(now, False, latency)
+
+    def _record(self, now: float, ok: bool, latency: float) -> None:
+        self._calls.append((now, ok, latency))
+        self._prune(now)
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures, slow = self._counts()
+        if failures / len(self._calls) >= self.error_rate or slow / len(self._calls) >= self.slow_call_rate:
+            self._open(now)
+
+    def _counts(self) -> Tuple[int, int]:
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, _, latency in self._calls if latency >= self.slow_call_seconds)
+        return failures, slow
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        calls = len(self._calls)
+        failures, slow = self._counts()
+        latencies = sorted(latency for _, _, latency in self._calls)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "error_rate": round(failures / calls, 4) if calls else 0.0,
+            "slow_rate": round(slow / calls, 4) if calls else 0.0,
+            "p95_latency": round(latencies[int(0.95 * (calls - 1))], 3) if calls else 0.0,
+            "rejected": self.rejected
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, **settings: Any) -> CircuitBreaker:
+    """Return the process-wide breaker for a dependency, creating it on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, **settings)
+        _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
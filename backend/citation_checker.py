@@ -2,20 +2,25 @@
 Citation Checker Module
 Extracts and verifies academic citations from text.
 Checks: author names, year, title, venue, page numbers
+Well-formed APA/IEEE/ACM references are parsed locally; only the rest goes to the LLM
 """
 
-import os
 import re
+import logging
 import json
-import asyncio
 from typing import List, Dict, Tuple
-from collections import Counter
 from dotenv import load_dotenv
-from groq import AsyncGroq
+from llm_client import complete
+from metrics import timed
+from citation_parser import parse_citations
+from citation_compare import verdict_from_snippets
+from reranker import select_evidence
+from verdict_store import verdicts, verdict_key, prompt_version
+from voting import collect_votes, majority, describe_votes, VOTING_MODE
 
 load_dotenv()
 
-client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+log = logging.getLogger(__name__)
 
 CITATION_EXTRACT_PROMPT = """You are an expert at parsing academic citations. Extract citation details from the given text.
 
@@ -79,10 +84,25 @@ STATUS RULES:
 
 Return ONLY valid JSON."""
 
+# Different temperatures for voting diversity
+TEMPERATURES = [0.1, 0.3, 0.5]
 
+# Prefix of the reason returned when a single verification call fails
+MODEL_ERROR_PREFIX = "Model error"
+
+# Citation fields that make up the verdict cache key
+CITATION_FIELDS = ["authors", "year", "title", "venue", "pages"]
+
+# Changing the prompt or voting setup invalidates cached verdicts
+VERDICT_VERSION = prompt_version(CITATION_VERIFY_PROMPT, TEMPERATURES, VOTING_MODE)
+
+
+@timed("extract_citations")
 async def extract_citations(text: str) -> List[Dict]:
     """
-    Extract academic citations from text using LLM.
+    Extract academic citations from text.
+    Reference entries the rule-based parser is confident about skip the LLM;
+    the remaining spans are sent to the LLM together in one call.
     
     Args:
         text: Text containing citations
@@ -93,8 +113,37 @@ async def extract_citations(text: str) -> List[Dict]:
     if not text.strip():
         return []
     
+    parsed, leftover = parse_citations(text)
+    if not leftover:
+        return [citation for _, citation in parsed]
+    
+    extracted = await extract_citations_with_llm("\n".join(span for _, span in leftover))
+    if not parsed:
+        return extracted
+    
+    # Put LLM citations back in document order next to the parsed ones
+    def position(citation: Dict) -> int:
+        found = text.find(str(citation.get("raw_citation") or "")[:60])
+        return found if found >= 0 else leftover[0][0]
+    
+    ordered = parsed + [(position(c), c) for c in extracted]
+    ordered.sort(key=lambda pair: pair[0])
+    return [citation for _, citation in ordered]
+
+
+async def extract_citations_with_llm(text: str) -> List[Dict]:
+    """
+    Extract academic citations from text using LLM.
+    
+    Args:
+        text: Text containing citations
+        
+    Returns:
+        List of citation dicts with author, year, title, venue, pages
+    """
     try:
-        response = await client.chat.completions.create(
+        response = await complete(
+            "citation_checker",
             model="llama-3.1-8b-instant",
             messages=[
                 {
@@ -117,7 +166,7 @@ async def extract_citations(text: str) -> List[Dict]:
         return json.loads(content)
         
     except Exception as e:
-        print(f"Error extracting citations: {e}")
+        log.error("Error extracting citations: %s", e)
         return []
 
 
@@ -129,7 +178,8 @@ async def verify_citation_with_model(citation: Dict, search_results: str, temper
         Tuple of (status, errors list, reason)
     """
     try:
-        response = await client.chat.completions.create(
+        response = await complete(
+            "citation_checker",
             model="llama-3.1-8b-instant",
             messages=[
                 {
@@ -167,43 +217,66 @@ async def verify_citation_with_model(citation: Dict, search_results: str, temper
         return (status, errors, reason)
         
     except Exception as e:
-        print(f"Error verifying citation (temp={temperature}): {e}")
-        return ("UNVERIFIABLE", [], f"Error: {str(e)[:100]}")
+        log.warning("Error verifying citation (temp=%s): %s", temperature, e)
+        return ("UNVERIFIABLE", [], f"{MODEL_ERROR_PREFIX}: {str(e)[:100]}")
 
 
+@timed("verify_citation")
 async def verify_citation(citation: Dict, search_results: List[Dict]) -> Dict:
     """
-    Verify a single citation using multi-model voting.
+    Verify a single citation. Deterministic field checks against the snippets
+    decide clear cases; the rest go to multi-model voting
+    (adaptive voting skips the third check when the first two agree).
     
     Args:
         citation: Citation dict with author, year, title, venue, pages
         search_results: List of search results
         
     Returns:
-        Dict with status, errors, reason
+        Dict with status, errors, reason and votes (checks used)
     """
     if not search_results:
         return {
             "status": "UNVERIFIABLE",
             "errors": [],
-            "reason": "No search results found to verify this citation"
+            "reason": "No search results found to verify this citation",
+            "votes": 0
         }
     
+    # Year / pages / venue checks settle clear cases without LLM calls
+    verdict = verdict_from_snippets(citation, search_results)
+    if verdict is not None:
+        return verdict
+    
+    # Only the snippet sentences that best match the citation go into the prompt
+    search_results = select_evidence(
+        " ".join(str(citation.get(field) or "") for field in CITATION_FIELDS),
+        search_results
+    )
+    
+    # Same citation judged against the same evidence before: no LLM calls
+    cache_key = verdict_key(
+        "citation",
+        {field: citation.get(field) for field in CITATION_FIELDS},
+        search_results,
+        VERDICT_VERSION
+    )
+    cached = await verdicts.get(cache_key)
+    if cached is not None:
+        return cached
+    
     # Format search results
     formatted_results = "\n".join([
         f"- {r['title']}: {r['snippet']}"
         for r in search_results
     ])
     
-    # Run 3 verification calls with different temperatures
-    temperatures = [0.1, 0.3, 0.5]
-    
     try:
-        tasks = [
-            verify_citation_with_model(citation, formatted_results, temp)
-            for temp in temperatures
-        ]
-        results = await asyncio.gather(*tasks)
+        # Run verification calls with different temperatures (2 or 3 checks)
+        results = await collect_votes(
+            lambda temp: verify_citation_with_model(citation, formatted_results, temp),
+            TEMPERATURES
+        )
         
         # Extract statuses
         statuses = [r[0] for r in results]
@@ -213,31 +286,32 @@ async def verify_citation(citation: Dict, search_results: List[Dict]) -> Dict:
         reasons = {r[0]: r[2] for r in results}
         
         # Vote on status
-        vote_counts = Counter(statuses)
-        majority_status = vote_counts.most_common(1)[0][0]
-        vote_count = vote_counts[majority_status]
+        majority_status, vote_count = majority(statuses)
         
         # Deduplicate errors
         unique_errors = list(set(all_errors))
         
         # Create reason
-        if vote_count == 3:
-            reason = f"All 3 checks agree: {reasons[majority_status]}"
-        elif vote_count == 2:
-            reason = f"2/3 checks agree: {reasons[majority_status]}"
-        else:
-            reason = f"Checks disagree. {majority_status}: {reasons[majority_status]}"
+        reason = describe_votes(vote_count, len(results), "checks", majority_status, reasons[majority_status])
         
-        return {
+        verdict = {
             "status": majority_status,
             "errors": unique_errors,
-            "reason": reason[:150]
+            "reason": reason[:150],
+            "votes": len(results)
         }
         
+        # Only cache verdicts where every check actually answered
+        if not any(r[2].startswith(MODEL_ERROR_PREFIX) for r in results):
+            await verdicts.put(cache_key, "citation", verdict)
+        
+        return verdict
+        
     except Exception as e:
-        print(f"Error in citation verification: {e}")
+        log.error("Error in citation verification: %s", e)
         return {
             "status": "UNVERIFIABLE",
             "errors": [],
-            "reason": f"Error: {str(e)[:100]}"
+            "reason": f"Error: {str(e)[:100]}",
+            "votes": 0
         }
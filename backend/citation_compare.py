@@ -0,0 +1,410 @@
+"""
+Citation Compare Module - Deterministic field-level citation checks
+INPUT: Citation dict + reference metadata (an offline index record) or web search snippets
+OUTPUT: Per-field "match" / "mismatch" / "unknown" results, concrete errors and a verdict
+CONSTRAINT: Pure string and number checks, no I/O; a missing field is never a mismatch,
+            and snippet checks return None (escalate to the LLM) unless they are conclusive
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+MATCH = "match"
+MISMATCH = "mismatch"
+UNKNOWN = "unknown"
+
+# Words ignored when comparing venues or building venue acronyms
+VENUE_STOPWORDS = {
+    "the", "of", "on", "and", "in", "for", "a", "an", "at", "to", "annual",
+    "proceedings", "proc", "conference", "conf", "international", "intl",
+    "journal", "j", "workshop", "symposium", "symp", "transactions", "trans",
+    "advances", "ieee", "acm", "siam"
+}
+
+# Renamed venues whose old and new acronyms should match
+VENUE_ALIASES = {"neurips": "nips"}
+
+# Well-known venues; a snippet naming exactly one of them tells us where a paper appeared
+KNOWN_VENUES = {
+    "cvpr", "iccv", "eccv", "nips", "icml", "iclr", "aaai", "ijcai", "kdd", "sigir", "sigmod",
+    "vldb", "acl", "emnlp", "naacl", "coling", "chi", "uist", "www", "wsdm", "icra", "iros",
+    "siggraph", "osdi", "sosp", "nsdi", "usenix", "podc", "stoc", "focs", "soda", "icse",
+    "fse", "pldi", "popl", "jmlr", "tpami", "pnas", "nejm", "nature", "lancet"
+}
+
+# Known venues written as ordinary title-case words rather than acronyms
+TITLE_CASE_VENUES = {"nature", "lancet"}
+
+# Min title similarity for a search result to count as evidence about the cited paper
+EVIDENCE_MIN_SIMILARITY = 0.6
+
+# Page ranges in snippets ("pp. 770-778", "770–778"); year ranges are filtered out
+SNIPPET_PAGES = re.compile(r"(\bpp?\.\s*|\bpages?\s+)?\b(\d{1,5})\s*[-–—]{1,2}\s*(\d{1,5})\b", re.I)
+# A range right after these words counts search results, not pages ("Related articles 1-10")
+SNIPPET_COUNT_WORDS = re.compile(r"\b(?:articles|results|items|entries|versions|showing|of)\W*$", re.I)
+# Years, but not digits of a longer number ("1706.03762", "2017/18", "12017")
+SNIPPET_YEAR = re.compile(r"(?<![\w./])(1[6-9]\d{2}|20\d{2})(?![\d/]|[.,]\d)")
+
+# URLs, DOIs and arXiv ids, whose digits are not years
+SNIPPET_IDENTIFIERS = re.compile(
+    r"https?://\S+|\bwww\.\S+|\b10\.\d{4,9}/\S+|\barxiv:\s*[\w.\-/]+|\b\d{4}\.\d{4,5}(?:v\d+)?\b", re.I
+)
+
+# A year right after these words is when a page was read or changed, not published
+SNIPPET_ACCESS_WORDS = re.compile(
+    r"(?:accessed|retrieved|viewed|visited|updated|modified|copyright|©)\W*(?:on\W+)?(?:\w+\W+){0,2}$", re.I
+)
+
+# A year right after these words dates a preprint, not the publication
+SNIPPET_PREPRINT_WORDS = re.compile(r"(?:arxiv|preprint|biorxiv|medrxiv|ssrn|corr)\b[^.;]{0,30}$", re.I)
+
+# A venue right after these words is where the paper appeared ("In CVPR", "Proc. ICML", "K He - CVPR")
+SNIPPET_VENUE_LABEL = re.compile(r"(?:\b(?:in|proc|proceedings of(?: the)?|published in)\.?|\s[-–—])\s*$", re.I)
+
+# Particles and markers that are not surnames
+AUTHOR_STOPWORDS = {"and", "et", "al", "van", "von", "der", "den", "de", "da", "del", "di", "du", "la", "le"}
+
+
+def normalize_title(title: object) -> str:
+    """Lowercase alphanumeric words, e.g. 'Deep Residual Learning: A Study' -> 'deep residual learning a study'."""
+    return " ".join(re.findall(r"[a-z0-9]+", str(title or "").lower()))
+
+
+def trigrams(norm_title: str) -> Set[str]:
+    padded = f" {norm_title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Dice coefficient of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def parse_year(value: object) -> Optional[int]:
+    match = re.search(r"\b(1[5-9]\d{2}|20\d{2})\b", str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def parse_pages(value: object) -> Optional[Tuple[int, int]]:
+    """'770–778', 'pp. 770-778' or '770' -> (first, last)."""
+    numbers = re.findall(r"\d+", str(value or ""))
+    if not numbers:
+        return None
+    first = int(numbers[0])
+    last = int(numbers[1]) if len(numbers) > 1 else first
+    return first, last
+
+
+def surnames(authors: object) -> List[str]:
+    """Lowercased name words of two or more letters, in order ("He, K., & Sun, J." -> ['he', 'sun'])."""
+    words = re.findall(r"[^\W\d_][\w'\-]+", str(authors or ""))
+    return [w.lower() for w in words if w.lower() not in AUTHOR_STOPWORDS]
+
+
+def _venue_words(venue: object) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", str(venue or "").lower())
+    return [w for w in words if w not in VENUE_STOPWORDS and not re.fullmatch(r"\d+(?:st|nd|rd|th)?", w)]
+
+
+def _explicit_acronyms(venue: object) -> Set[str]:
+    """Acronyms written in the venue itself ('CVPR', '(ICML)'), publishers excluded."""
+    found = {a.lower() for a in re.findall(r"\b[A-Z][A-Za-z]*[A-Z]\b", str(venue or "")) if len(a) >= 3}
+    return {VENUE_ALIASES.get(a, a) for a in found if a not in VENUE_STOPWORDS}
+
+
+def _acronyms(venue: object) -> Set[str]:
+    """Explicit acronyms plus the initials of the significant words."""
+    found = _explicit_acronyms(venue)
+    initials = "".join(w[0] for w in _venue_words(venue) if not w.isdigit())
+    if len(initials) >= 3:
+        found.add(initials)
+    return found
+
+
+def _word_in(word: str, others: List[str]) -> bool:
+    """Exact word, or an abbreviation of one ("comput" for "computer")."""
+    for other in others:
+        if word == other:
+            return True
+        if min(len(word), len(other)) >= 3 and (other.startswith(word) or word.startswith(other)):
+            return True
+    return False
+
+
+def compare_year(claimed: object, actual: object) -> str:
+    claimed_year, actual_year = parse_year(claimed), parse_year(actual)
+    if claimed_year is None or actual_year is None:
+        return UNKNOWN
+    return MATCH if claimed_year == actual_year else MISMATCH
+
+
+def compare_pages(claimed: object, actual: object) -> str:
+    claimed_pages, actual_pages = parse_pages(claimed), parse_pages(actual)
+    if claimed_pages is None or actual_pages is None:
+        return UNKNOWN
+    if claimed_pages == actual_pages:
+        return MATCH
+    # A single page number inside the real range is fine
+    if claimed_pages[0] == claimed_pages[1] and actual_pages[0] <= claimed_pages[0] <= actual_pages[1]:
+        return MATCH
+    return MISMATCH
+
+
+def compare_venue(claimed: object, actual: object) -> str:
+    claimed_words, actual_words = _venue_words(claimed), _venue_words(actual)
+    if not claimed_words or not actual_words:
+        return UNKNOWN
+
+    if _acronyms(claimed) & _acronyms(actual):
+        return MATCH
+
+    overlap = sum(1 for w in claimed_words if _word_in(w, actual_words)) / len(claimed_words)
+    if overlap >= 0.6:
+        return MATCH
+    if overlap <= 0.2:
+        # An unknown acronym against a full name is not conclusive; two different acronyms are
+        if len(claimed_words) == 1 and not _explicit_acronyms(actual):
+            return UNKNOWN
+        return MISMATCH
+    return UNKNOWN
+
+
+def compare_authors(claimed: object, actual: object) -> str:
+    claimed_names, actual_names = surnames(claimed), set(surnames(actual))
+    if not claimed_names or not actual_names:
+        return UNKNOWN
+    matched = sum(1 for name in claimed_names if name in actual_names)
+    # Given names and initials may be missing on either side, so the share is lenient
+    if matched == 0:
+        return MISMATCH
+    if matched / len(claimed_names) >= 0.5:
+        return MATCH
+    return UNKNOWN
+
+
+COMPARATORS = {
+    "authors": compare_authors,
+    "year": compare_year,
+    "venue": compare_venue,
+    "pages": compare_pages
+}
+
+
+def compare_fields(citation: Dict, reference: Dict) -> Dict[str, str]:
+    """Compare authors, year, venue and pages of a citation against reference metadata."""
+    return {
+        field: compare(citation.get(field), reference.get(field))
+        for field, compare in COMPARATORS.items()
+    }
+
+
+def field_errors(citation: Dict, reference: Dict, results: Dict[str, str]) -> List[str]:
+    """Human-readable errors for every mismatching field."""
+    return [
+        f"{field.capitalize()} is {citation.get(field)!r}, source says {reference.get(field)!r}"
+        for field, result in results.items() if result == MISMATCH
+    ]
+
+
+def verdict_from_record(citation: Dict, record: Dict) -> Dict:
+    """
+    Verdict for a citation whose title matched a trusted bibliographic record.
+
+    Returns:
+        Dict with status (VERIFIED / HALLUCINATED), errors, reason and votes (always 0)
+    """
+    results = compare_fields(citation, record)
+    errors = field_errors(citation, record, results)
+    if errors:
+        status = "HALLUCINATED"
+        reason = f"Offline index record disagrees on {', '.join(f for f, r in results.items() if r == MISMATCH)}"
+    else:
+        status = "VERIFIED"
+        checked = [f for f, r in results.items() if r == MATCH]
+        reason = "Matches offline index record" + (f" ({', '.join(checked)})" if checked else "")
+    return {"status": status, "errors": errors, "reason": reason[:150], "votes": 0}
+
+
+def relevant_evidence(citation: Dict, search_results: List[Dict]) -> List[str]:
+    """Title + snippet text of the search results that are about the cited title."""
+    norm = normalize_title(citation.get("title"))
+    if len(norm) < 8:
+        return []
+    wanted = trigrams(norm)
+    texts = []
+    for result in search_results:
+        title = normalize_title(result.get("title"))
+        text = f"{result.get('title', '')} {result.get('snippet', '')}"
+        if norm in normalize_title(text) or similarity(wanted, trigrams(title)) >= EVIDENCE_MIN_SIMILARITY:
+            texts.append(text)
+    return texts
+
+
+def _is_venue_word(word: str) -> bool:
+    return VENUE_ALIASES.get(word.lower(), word.lower()) in KNOWN_VENUES
+
+
+def _year_mentions(text: str) -> List[Tuple[int, bool]]:
+    """
+    (year, labelled) for every year in a snippet. `labelled` means the year sits
+    next to a venue ("CVPR 2016", "NeurIPS (2016)"). Access dates and preprint
+    years ("arXiv preprint arXiv:1512.03385, 2015") are left out.
+    """
+    text = SNIPPET_IDENTIFIERS.sub(" ", text)
+    mentions = []
+    for match in SNIPPET_YEAR.finditer(text):
+        before, after = text[max(0, match.start() - 40):match.start()], text[match.end():match.end() + 20]
+        if SNIPPET_ACCESS_WORDS.search(before) or SNIPPET_PREPRINT_WORDS.search(before):
+            continue
+        previous = re.search(r"([A-Za-z]+)[\s,(]+$", before)
+        following = re.match(r"[\s,)]+([A-Za-z]+)", after)
+        labelled = (
+            (previous is not None and _is_venue_word(previous.group(1)))
+            or (following is not None and _is_venue_word(following.group(1)))
+        )
+        mentions.append((int(match.group(1)), labelled))
+    return mentions
+
+
+def _page_mentions(text: str) -> List[Tuple[Tuple[int, int], bool]]:
+    """((first, last), labelled) for every page range; `labelled` means "pp." or "pages" before it."""
+    text = SNIPPET_IDENTIFIERS.sub(" ", text)
+    mentions = []
+    for match in SNIPPET_PAGES.finditer(text):
+        label, first, last = match.group(1), int(match.group(2)), int(match.group(3))
+        is_year_range = 1600 <= first <= 2100 and 1600 <= last <= 2100
+        if not first < last <= first + 500 or is_year_range:
+            continue
+        if not label and SNIPPET_COUNT_WORDS.search(text[max(0, match.start() - 30):match.start()]):
+            continue
+        mentions.append(((first, last), bool(label)))
+    return mentions
+
+
+def _venue_mentions(text: str) -> List[Tuple[str, bool]]:
+    """
+    (venue, labelled) for every known venue; `labelled` means "In CVPR", "Proc. CVPR"
+    or a Scholar byline ("K He - CVPR 2016"). Workshops of a venue are not the venue.
+    """
+    mentions = []
+    for match in re.finditer(r"[A-Za-z]+", text):
+        word = match.group()
+        key = VENUE_ALIASES.get(word.lower(), word.lower())
+        if key not in KNOWN_VENUES:
+            continue
+        # "CVPR" / "NeurIPS" or "Nature", but not "chi" or "the nature of"
+        uppercase = sum(1 for ch in word if ch.isupper())
+        if uppercase < 2 and not (key in TITLE_CASE_VENUES and word == word.capitalize()):
+            continue
+        if re.match(r"\W*(?:\d{4}\W*)?(?:workshops?|wksp)\b", text[match.end():], re.I):
+            continue
+        labelled = SNIPPET_VENUE_LABEL.search(text[max(0, match.start() - 40):match.start()]) is not None
+        mentions.append((key, labelled))
+    return mentions
+
+
+def _settled(mentions: List[List[Tuple[Any, bool]]]) -> Optional[Any]:
+    """
+    The one value the snippets settle on: the only value in a labelled bibliographic
+    context, or, with no labelled value, the only value seen when several results agree.
+    """
+    labelled = {value for found in mentions for value, is_labelled in found if is_labelled}
+    if labelled:
+        return next(iter(labelled)) if len(labelled) == 1 else None
+    per_result = [{value for value, _ in found} for found in mentions]
+    values = set().union(*per_result)
+    if len(values) == 1 and sum(1 for found in per_result if found) >= 2:
+        return next(iter(values))
+    return None
+
+
+def _snippet_evidence(texts: List[str]) -> Dict[str, Tuple[Set[Any], Optional[Any]]]:
+    """Per field: every value mentioned in the snippets, and the value they settle on (or None)."""
+    evidence = {}
+    for field, find in (("year", _year_mentions), ("pages", _page_mentions), ("venue", _venue_mentions)):
+        mentions = [find(text) for text in texts]
+        evidence[field] = ({value for found in mentions for value, _ in found}, _settled(mentions))
+    return evidence
+
+
+def compare_with_snippets(citation: Dict, texts: List[str]) -> Dict[str, str]:
+    """
+    Score year, pages, venue and authors against snippet text. A field is a mismatch
+    only when the snippets settle on a different value (see _settled); a single
+    unlabelled mention may be anything (a preprint, a result count) and stays unknown.
+    """
+    joined = " ".join(texts)
+    results = {field: UNKNOWN for field in COMPARATORS}
+    evidence = _snippet_evidence(texts)
+
+    year = parse_year(citation.get("year"))
+    if year is not None:
+        years, settled = evidence["year"]
+        if year in years:
+            results["year"] = MATCH
+        elif settled is not None:
+            results["year"] = MISMATCH
+
+    if parse_pages(citation.get("pages")) is not None:
+        ranges, settled = evidence["pages"]
+        if any(compare_pages(citation.get("pages"), f"{a}-{b}") == MATCH for a, b in ranges):
+            results["pages"] = MATCH
+        elif settled is not None:
+            results["pages"] = MISMATCH
+
+    venue = citation.get("venue")
+    if _venue_words(venue):
+        venues, settled = evidence["venue"]
+        claimed = _acronyms(venue) | {w for w in _venue_words(venue) if w in KNOWN_VENUES}
+        words = _venue_words(venue)
+        if claimed & venues or sum(1 for w in words if _word_in(w, _venue_words(joined))) / len(words) >= 0.6:
+            results["venue"] = MATCH
+        elif settled is not None and claimed & KNOWN_VENUES:
+            results["venue"] = MISMATCH
+
+    names = surnames(citation.get("authors"))
+    if names and names[0] in set(surnames(joined)):
+        results["authors"] = MATCH
+    return results
+
+
+def verdict_from_snippets(citation: Dict, search_results: List[Dict]) -> Optional[Dict]:
+    """
+    Decide a citation from search snippets when the evidence is conclusive.
+
+    Returns:
+        HALLUCINATED when the snippets settle on a different year / pages / venue, VERIFIED when the year and every
+        cited author / venue / page field are confirmed, otherwise None (ask the LLM)
+    """
+    texts = relevant_evidence(citation, search_results)
+    if not texts:
+        return None
+
+    results = compare_with_snippets(citation, texts)
+    mismatched = [field for field, result in results.items() if result == MISMATCH]
+    if mismatched:
+        settled = {field: value for field, (_, value) in _snippet_evidence(texts).items()}
+        actual = {
+            "year": str(settled["year"]),
+            "pages": "{}-{}".format(*settled["pages"]) if settled["pages"] else None,
+            "venue": settled["venue"].upper() if settled["venue"] else None
+        }
+        return {
+            "status": "HALLUCINATED",
+            "errors": field_errors(citation, actual, results),
+            "reason": f"Search results disagree on {', '.join(mismatched)}",
+            "votes": 0
+        }
+
+    cited = [field for field in ("authors", "venue", "pages") if citation.get(field)]
+    if results["year"] == MATCH and all(results[field] == MATCH for field in cited):
+        checked = [field for field, result in results.items() if result == MATCH]
+        return {
+            "status": "VERIFIED",
+            "errors": [],
+            "reason": f"Search results confirm {', '.join(checked)}",
+            "votes": 0
+        }
+    return None
@@ -0,0 +1,385 @@
+"""
+Citation Index Module - Offline bibliographic index used before web search
+INPUT: Citation dict (title, authors, year, venue, pages, raw_citation)
+OUTPUT: Best matching bibliographic record, or None on a miss
+CONSTRAINT: SQLite file opened read-only and lazily, so startup cost does not grow with
+            the number of records; fuzzy titles use a character-trigram inverted index
+Set CITATION_INDEX_PATH to enable it. Build or extend an index with:
+    python citation_index.py build dump.bib more.jsonl extra.csv --path citations.sqlite3
+"""
+
+import os
+import logging
+import re
+import csv
+import json
+import sqlite3
+import asyncio
+import argparse
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from dotenv import load_dotenv
+
+from citation_compare import normalize_title, compare_fields, trigrams, similarity, MISMATCH
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Empty (the default) disables the offline index
+CITATION_INDEX_PATH = os.getenv("CITATION_INDEX_PATH", "")
+
+# Min trigram similarity (Dice) for a fuzzy title match
+CITATION_INDEX_MIN_SIMILARITY = float(os.getenv("CITATION_INDEX_MIN_SIMILARITY", "0.8"))
+
+# Rarest query trigrams used to collect fuzzy candidates
+FUZZY_GRAMS = 12
+FUZZY_CANDIDATES = 50
+
+# Records written per transaction while building
+BUILD_BATCH = 10000
+
+RECORD_FIELDS = ["doi", "title", "authors", "year", "venue", "pages", "url"]
+
+# How a lookup found its record; only DOI and exact-title hits are known to be the cited work
+MATCH_DOI = "doi"
+MATCH_TITLE = "title"
+MATCH_FUZZY = "fuzzy"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE,
+    doi TEXT,
+    title TEXT NOT NULL,
+    norm_title TEXT NOT NULL,
+    authors TEXT,
+    year TEXT,
+    venue TEXT,
+    pages TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_records_doi ON records (doi);
+CREATE INDEX IF NOT EXISTS idx_records_title ON records (norm_title);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, record_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gram_counts (
+    gram TEXT PRIMARY KEY,
+    records INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+DOI = re.compile(r"\b(10\.\d{4,9}/[^\s\"<>]+)", re.IGNORECASE)
+
+
+def normalize_doi(value: object) -> str:
+    match = DOI.search(str(value or ""))
+    return match.group(1).rstrip(".,;)").lower() if match else ""
+
+
+def record_key(doi: str, norm_title: str, year: object) -> str:
+    """Identity of a record across imports: its DOI, else normalized title and year."""
+    return f"doi:{doi}" if doi else f"title:{norm_title}|{str(year or '').strip()}"
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Give indexes built before records had a key one, keeping the newest of any duplicates."""
+    if "key" in {row[1] for row in conn.execute("PRAGMA table_info(records)")}:
+        return
+    with conn:
+        conn.execute("ALTER TABLE records ADD COLUMN key TEXT")
+        rows = conn.execute("SELECT id, doi, norm_title, year FROM records ORDER BY id").fetchall()
+        newest = {record_key(doi or "", norm, year): record_id for record_id, doi, norm, year in rows}
+        stale = [(record_id,) for record_id, *_ in rows if record_id not in set(newest.values())]
+        conn.executemany("DELETE FROM grams WHERE record_id = ?", stale)
+        conn.executemany("DELETE FROM records WHERE id = ?", stale)
+        conn.executemany("UPDATE records SET key = ? WHERE id = ?", list(newest.items()))
+        conn.execute("CREATE UNIQUE INDEX idx_records_key ON records (key)")
+
+
+def _latex_to_text(value: str) -> str:
+    value = re.sub(r"\\[a-zA-Z]+\s*", "", value)
+    value = re.sub(r"\\.", "", value)
+    return " ".join(value.replace("{", "").replace("}", "").split())
+
+
+BIBTEX_FIELD = re.compile(r"\s*([A-Za-z][\w\-]*)\s*=\s*")
+
+
+def _read_bibtex_value(body: str, i: int) -> Tuple[str, int]:
+    """Read a {braced}, "quoted" or bare value starting at i. Returns (value, end)."""
+    if i < len(body) and body[i] in "{\"":
+        quoted = body[i] == "\""
+        depth = 0 if quoted else 1
+        j = i + 1
+        while j < len(body):
+            ch = body[j]
+            if ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0 and not quoted:
+                    break
+            elif ch == "\"" and quoted and depth == 0:
+                break
+            j += 1
+        return body[i + 1:j], j + 1
+    end = body.find(",", i)
+    end = len(body) if end < 0 else end
+    return body[i:end], end
+
+
+def _bibtex_fields(body: str) -> Dict[str, str]:
+    """Parse 'key, name = {value}, name = "value", name = 123' into a dict."""
+    fields = {}
+    i = body.find(",") + 1
+    while 0 < i < len(body):
+        match = BIBTEX_FIELD.match(body, i)
+        if not match:
+            break
+        value, i = _read_bibtex_value(body, match.end())
+        fields[match.group(1).lower()] = _latex_to_text(value.strip())
+        i = body.find(",", i) + 1
+    return fields
+
+
+def iter_bibtex(f: TextIO) -> Iterator[Dict]:
+    """Stream entries from a BibTeX file without loading it whole."""
+    buffer: List[str] = []
+    depth = 0
+    opened = False
+    for line in f:
+        if not buffer:
+            at = line.find("@")
+            if at < 0:
+                continue
+            line = line[at:]
+        buffer.append(line)
+        depth += line.count("{") - line.count("}")
+        opened = opened or "{" in line
+        if depth > 0 or not opened:
+            continue
+        entry = "".join(buffer)
+        buffer, depth, opened = [], 0, False
+        kind = entry[1:entry.find("{")].strip().lower()
+        if kind in ("comment", "preamble", "string"):
+            continue
+        fields = _bibtex_fields(entry[entry.find("{") + 1:entry.rfind("}")])
+        yield {
+            "doi": fields.get("doi", ""),
+            "title": fields.get("title", ""),
+            "authors": fields.get("author", "").replace(" and ", "; "),
+            "year": fields.get("year", ""),
+            "venue": fields.get("journal") or fields.get("booktitle") or fields.get("publisher", ""),
+            "pages": fields.get("pages", "").replace("--", "-"),
+            "url": fields.get("url", "")
+        }
+
+
+def _from_mapping(row: Dict) -> Dict:
+    """Accept the common column names used by JSONL / CSV exports."""
+    authors = row.get("authors") or row.get("author") or ""
+    if isinstance(authors, list):
+        authors = "; ".join(str(a.get("name", a)) if isinstance(a, dict) else str(a) for a in authors)
+    return {
+        "doi": row.get("doi") or "",
+        "title": row.get("title") or "",
+        "authors": str(authors),
+        "year": str(row.get("year") or ""),
+        "venue": row.get("venue") or row.get("journal") or row.get("booktitle") or "",
+        "pages": str(row.get("pages") or "").replace("--", "-"),
+        "url": row.get("url") or ""
+    }
+
+
+def iter_jsonl(f: TextIO) -> Iterator[Dict]:
+    for line in f:
+        if line.strip():
+            yield _from_mapping(json.loads(line))
+
+
+def iter_csv(f: TextIO) -> Iterator[Dict]:
+    for row in csv.DictReader(f):
+        yield _from_mapping({k.strip().lower(): v for k, v in row.items() if k})
+
+
+IMPORTERS = {".bib": iter_bibtex, ".jsonl": iter_jsonl, ".json": iter_jsonl, ".csv": iter_csv}
+
+
+class CitationIndex:
+    """SQLite bibliographic index. Lookups run in worker threads on read-only connections."""
+
+    def __init__(self, path: str, min_similarity: float = CITATION_INDEX_MIN_SIMILARITY):
+        self.path = path
+        self.min_similarity = min_similarity
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def build(self, records: Iterable[Dict]) -> int:
+        """
+        Add or replace records (dicts with RECORD_FIELDS), keyed by DOI, else by normalized
+        title and year, and refresh trigram counts. Returns records written.
+        """
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        added = 0
+        batch: List[Dict] = []
+
+        def flush() -> None:
+            with conn:
+                for record in batch:
+                    norm = normalize_title(record["title"])
+                    doi = normalize_doi(record["doi"])
+                    key = record_key(doi, norm, record["year"])
+                    conn.execute(
+                        "INSERT INTO records (key, doi, title, norm_title, authors, year, venue, pages, url) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET doi = excluded.doi, title = excluded.title, "
+                        "norm_title = excluded.norm_title, authors = excluded.authors, year = excluded.year, "
+                        "venue = excluded.venue, pages = excluded.pages, url = excluded.url",
+                        (key, doi, record["title"], norm, record["authors"],
+                         record["year"], record["venue"], record["pages"], record["url"])
+                    )
+                    record_id = conn.execute("SELECT id FROM records WHERE key = ?", (key,)).fetchone()[0]
+                    # An updated record may have a new title
+                    conn.execute("DELETE FROM grams WHERE record_id = ?", (record_id,))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO grams (gram, record_id) VALUES (?, ?)",
+                        [(gram, record_id) for gram in trigrams(norm)]
+                    )
+            batch.clear()
+
+        for record in records:
+            if not normalize_title(record.get("title")):
+                continue
+            batch.append(record)
+            added += 1
+            if len(batch) >= BUILD_BATCH:
+                flush()
+        flush()
+
+        with conn:
+            conn.execute("DELETE FROM gram_counts")
+            conn.execute("INSERT INTO gram_counts SELECT gram, COUNT(*) FROM grams GROUP BY gram")
+        conn.close()
+        return added
+
+    def _rows(self, sql: str, params: tuple) -> List[Dict]:
+        return [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+
+    def _fuzzy(self, norm: str) -> List[Dict]:
+        grams = trigrams(norm)
+        conn = self._connect()
+        placeholders = ",".join("?" * len(grams))
+        # Only the rarest grams are used to collect candidates, so common ones stay cheap
+        rare = [row[0] for row in conn.execute(
+            f"SELECT gram FROM gram_counts WHERE gram IN ({placeholders}) ORDER BY records LIMIT ?",
+            (*grams, FUZZY_GRAMS)
+        )]
+        if not rare:
+            return []
+        candidates = self._rows(
+            f"SELECT r.*, COUNT(*) AS hits FROM grams g JOIN records r ON r.id = g.record_id "
+            f"WHERE g.gram IN ({','.join('?' * len(rare))}) "
+            f"GROUP BY g.record_id ORDER BY hits DESC LIMIT ?",
+            (*rare, FUZZY_CANDIDATES)
+        )
+        scored = [(similarity(grams, trigrams(c["norm_title"])), c) for c in candidates]
+        best = max((score for score, _ in scored), default=0.0)
+        if best < self.min_similarity:
+            return []
+        return [c for score, c in scored if score == best]
+
+    def lookup_sync(self, citation: Dict) -> Optional[Dict]:
+        """
+        Exact DOI, then exact title, then fuzzy title. Ties go to the record that agrees most.
+        The record's "match" field says which one hit (MATCH_DOI / MATCH_TITLE / MATCH_FUZZY).
+        """
+        doi = normalize_doi(citation.get("doi")) or normalize_doi(citation.get("raw_citation"))
+        candidates: List[Dict] = []
+        match = MATCH_DOI
+        if doi:
+            candidates = self._rows("SELECT * FROM records WHERE doi = ?", (doi,))
+
+        norm = normalize_title(citation.get("title"))
+        if not candidates and norm:
+            match = MATCH_TITLE
+            candidates = self._rows("SELECT * FROM records WHERE norm_title = ?", (norm,))
+            if not candidates:
+                match = MATCH_FUZZY
+                candidates = self._fuzzy(norm)
+        if not candidates:
+            return None
+
+        # e.g. a preprint and the conference version share a title
+        def mismatches(record: Dict) -> int:
+            return sum(1 for result in compare_fields(citation, record).values() if result == MISMATCH)
+
+        best = min(candidates, key=mismatches)
+        return {**{field: best.get(field) or "" for field in RECORD_FIELDS}, "match": match}
+
+    async def lookup(self, citation: Dict) -> Optional[Dict]:
+        """Return the matching record, or None on a miss. Never raises."""
+        if not self.enabled:
+            return None
+        try:
+            return await asyncio.to_thread(self.lookup_sync, citation)
+        except sqlite3.Error as e:
+            log.error("Citation index lookup error: %s", e)
+            return None
+
+
+def record_source(record: Dict) -> Dict:
+    """Present an index record like a search result."""
+    url = record.get("url") or (f"https://doi.org/{record['doi']}" if record.get("doi") else "")
+    details = ", ".join(v for v in (record.get("authors"), record.get("year"), record.get("venue"), record.get("pages")) if v)
+    return {"title": record.get("title", ""), "url": url, "snippet": f"Offline index: {details}"}
+
+
+citation_index = CitationIndex(CITATION_INDEX_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query the offline citation index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Import .bib, .jsonl or .csv dumps (updates records already in the index)")
+    build.add_argument("files", nargs="+")
+    build.add_argument("--path", default=CITATION_INDEX_PATH or "citation_index.sqlite3")
+
+    lookup = commands.add_parser("lookup", help="Look up a title or DOI")
+    lookup.add_argument("query")
+    lookup.add_argument("--path", default=CITATION_INDEX_PATH or "citation_index.sqlite3")
+
+    args = parser.parse_args()
+    index = CitationIndex(args.path)
+
+    if args.command == "build":
+        for name in args.files:
+            importer = IMPORTERS.get(os.path.splitext(name)[1].lower())
+            if importer is None:
+                parser.error(f"Unsupported file type: {name}")
+            with open(name, encoding="utf-8", newline="") as f:
+                print(f"{name}: {index.build(importer(f))} records written")
+    else:
+        print(json.dumps(index.lookup_sync({"title": args.query, "doi": args.query}), indent=2))
+
+
+if __name__ == "__main__":
+    main()
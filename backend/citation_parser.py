@@ -0,0 +1,233 @@
+"""
+Citation Parser Module - Rule-based fast path for well-formed citations
+INPUT: String (reference list or text containing citations)
+OUTPUT: Citation dicts (raw_citation, authors, year, title, venue, pages) + confidence
+CONSTRAINT: Only APA, IEEE and ACM reference styles; spans below
+            CITATION_PARSE_MIN_CONFIDENCE are returned untouched for the LLM
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Parsed citations below this confidence are sent to the LLM instead (above 1 disables the parser)
+CITATION_PARSE_MIN_CONFIDENCE = float(os.getenv("CITATION_PARSE_MIN_CONFIDENCE", "0.75"))
+
+# How much each field contributes to the confidence of a style match
+FIELD_WEIGHTS = {"authors": 0.25, "year": 0.25, "title": 0.25, "venue": 0.15, "pages": 0.1}
+
+# Authors weight for capitalized words that are not clearly a name list ("Smith", "The Eiffel Tower"):
+# prose like "Smith (2017). Attention is all you need." then needs a venue or pages to pass
+PLAIN_AUTHORS_WEIGHT = 0.1
+
+YEAR = r"(?:1[5-9]|20)\d{2}[a-z]?"
+
+# [12] or 12. at the start of a reference list entry
+ENTRY_MARKER = re.compile(r"^\s*(?:\[\d{1,4}\]|\d{1,4}\.)\s+")
+
+# Inline "[2] ..." markers when a whole reference list is on one line
+INLINE_MARKER = re.compile(r"\s+(?=\[\d{1,4}\]\s)")
+
+# He, K., & Sun, J. (2016). Title. Venue, 1(2), 770-778.
+APA = re.compile(
+    rf"^(?P<authors>.+?)\s*\((?P<year>{YEAR})\)\.?\s+(?P<title>[^.?!]+[.?!])\s*(?P<rest>.*)$",
+    re.DOTALL
+)
+
+# K. He and J. Sun, "Title," in Proc. CVPR, 2016, pp. 770-778.
+IEEE = re.compile(
+    r'^(?P<authors>.+?),?\s+["“](?P<title>.+?)[,.]?["”],?\s*(?P<rest>.*)$',
+    re.DOTALL
+)
+
+# Kaiming He and Jian Sun. 2016. Title. In Proceedings of CVPR. 770-778.
+ACM = re.compile(
+    rf"^(?P<authors>.+?)\.\s+(?P<year>{YEAR})\.\s+(?P<title>.+?[.?!])\s+(?P<rest>.*)$",
+    re.DOTALL
+)
+
+PAGES = re.compile(r"(?:\bpp?\.\s*)?\b(\d{1,6})\s*[-–—]+\s*(\d{1,6})\b")
+
+# Venue ends at a comma, a volume/page parenthesis or a sentence followed by numbers
+VENUE_END = re.compile(r",|\s\((?:pp|vol|\d)|\.\s+(?=\d)|\.\s*$")
+
+# Section headings that are neither parsed nor worth an LLM call
+HEADING = re.compile(r"^(?:references|bibliography|works cited|literature cited|citations)\s*:?$", re.IGNORECASE)
+
+# An initial ("K. He", "He, K.", "J.-P.") or a list of two or more names
+AUTHOR_INITIAL = re.compile(r"(?:^|[\s,])[A-Z]\.(?=[\s,\-;]|$)")
+AUTHOR_SEPARATOR = re.compile(r",|\s+and\s+|\s*&\s*")
+
+# Lowercase words allowed in author lists ("van der Maaten, L.", "He, K. et al.")
+NAME_PARTICLES = {
+    "and", "&", "et", "al", "van", "von", "der", "den", "de", "da", "del",
+    "di", "du", "la", "le", "dos", "y", "bin", "ibn"
+}
+
+
+def split_reference_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into (start, end) spans, one per reference entry or paragraph line.
+    A line that does not end a sentence and is not followed by a new entry
+    marker is treated as a wrapped continuation of the same entry.
+    """
+    spans: List[List[int]] = []
+    open_entry = False
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        start, end = offset, offset + len(line)
+        offset = end
+        stripped = line.strip()
+        if not stripped:
+            open_entry = False
+            continue
+        if open_entry and spans and not ENTRY_MARKER.match(line):
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+        open_entry = not stripped.endswith((".", ")", "]"))
+
+    pieces = []
+    for start, end in spans:
+        # Several numbered entries on one line
+        cuts = [start] + [start + m.end() for m in INLINE_MARKER.finditer(text[start:end])] + [end]
+        for a, b in zip(cuts, cuts[1:]):
+            while a < b and text[a].isspace():
+                a += 1
+            while b > a and text[b - 1].isspace():
+                b -= 1
+            if a < b:
+                pieces.append((a, b))
+    return pieces
+
+
+def _clean(value: str) -> str:
+    return " ".join(value.replace("“", "").replace("”", "").strip(" .,;:\"'").split())
+
+
+def _looks_like_authors(authors: str) -> bool:
+    """Every word is capitalized, an initial or a name particle (rules out prose)."""
+    if not authors or len(authors) > 400:
+        return False
+    words = [w.strip(",.;") for w in authors.split()]
+    for word in words:
+        if not word:
+            continue
+        if word.lower() in NAME_PARTICLES or word[0].isupper():
+            continue
+        return False
+    return any(word[:1].isupper() for word in words)
+
+
+def _citation_authors(authors: str) -> bool:
+    """Initials or several names, as in a reference list rather than a sentence subject."""
+    if AUTHOR_INITIAL.search(authors):
+        return True
+    names = [name for name in AUTHOR_SEPARATOR.split(authors) if name.strip()]
+    return len(names) >= 2
+
+
+def _valid_year(year: str) -> bool:
+    return 1500 <= int(year[:4]) <= time.gmtime().tm_year + 1
+
+
+def _find_pages(rest: str) -> str:
+    match = PAGES.search(rest)
+    if not match or int(match.group(2)) < int(match.group(1)):
+        return ""
+    return f"{match.group(1)}-{match.group(2)}"
+
+
+def _find_venue(rest: str) -> str:
+    venue = VENUE_END.split(rest.strip(), maxsplit=1)[0]
+    venue = re.sub(r"^(?:in|In)\s+", "", venue.strip())
+    venue = _clean(venue)
+    # A bare number or page range is not a venue
+    return "" if not re.search(r"[A-Za-z]", venue) else venue
+
+
+def _score(fields: Dict[str, str]) -> float:
+    score = 0.0
+    if _looks_like_authors(fields["authors"]):
+        score += FIELD_WEIGHTS["authors"] if _citation_authors(fields["authors"]) else PLAIN_AUTHORS_WEIGHT
+    if fields["year"] and _valid_year(fields["year"]):
+        score += FIELD_WEIGHTS["year"]
+    title = fields["title"]
+    if 3 <= len(title) <= 300 and (title[0].isupper() or title[0].isdigit()):
+        score += FIELD_WEIGHTS["title"]
+    if fields["venue"]:
+        score += FIELD_WEIGHTS["venue"]
+    if fields["pages"]:
+        score += FIELD_WEIGHTS["pages"]
+    return round(score, 4)
+
+
+def _fields_from_match(style: str, match: "re.Match") -> Dict[str, str]:
+    rest = match.group("rest")
+    year = match.group("year") if style != "ieee" else ""
+    if style == "ieee":
+        years = re.findall(rf"\b({YEAR})\b", rest)
+        year = years[-1] if years else ""
+    return {
+        # Keep the trailing period of a final initial ("Sun, J.")
+        "authors": " ".join(match.group("authors").split()).strip(" ,;"),
+        "year": year[:4],
+        "title": _clean(match.group("title")),
+        "venue": _find_venue(rest),
+        "pages": _find_pages(rest)
+    }
+
+
+def parse_citation(span: str) -> Tuple[Optional[Dict], float]:
+    """
+    Parse one reference string with the APA, IEEE and ACM rules.
+
+    Args:
+        span: A single reference entry (a leading [n] / n. marker is ignored)
+
+    Returns:
+        (citation dict or None, confidence between 0 and 1); the best-scoring style wins
+    """
+    raw = ENTRY_MARKER.sub("", span.strip(), count=1).strip()
+    if not raw:
+        return None, 0.0
+
+    best: Tuple[Optional[Dict], float] = (None, 0.0)
+    for style, pattern in (("apa", APA), ("ieee", IEEE), ("acm", ACM)):
+        match = pattern.match(raw)
+        if not match:
+            continue
+        fields = _fields_from_match(style, match)
+        confidence = _score(fields)
+        if confidence > best[1]:
+            best = ({"raw_citation": raw, **fields}, confidence)
+    return best
+
+
+def parse_citations(
+    text: str,
+    min_confidence: float = CITATION_PARSE_MIN_CONFIDENCE
+) -> Tuple[List[Tuple[int, Dict]], List[Tuple[int, str]]]:
+    """
+    Parse every reference span in text.
+
+    Args:
+        text: Text containing citations
+        min_confidence: Spans parsed with a lower confidence are left over
+
+    Returns:
+        (parsed: list of (offset, citation), leftover: list of (offset, span text))
+    """
+    parsed = []
+    leftover = []
+    for start, end in split_reference_spans(text):
+        span = text[start:end]
+        if HEADING.match(span):
+            continue
+        citation, confidence = parse_citation(span)
+        if citation is not None and confidence >= min_confidence:
+            parsed.append((start, citation))
+        else:
+            leftover.append((start, span))
+    return parsed, leftover
@@ -3,20 +3,22 @@ Claim Extractor Module
 INPUT: String (user text)
 OUTPUT: List[Dict] with claim, start_char, end_char
 CONSTRAINT: Max 5 claims, must be factual
+Claims are parsed from the streamed completion as soon as each one is complete
 """
 
-import os
 import json
+import logging
 import re
-from typing import List, Dict
+from contextlib import aclosing
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
-from groq import AsyncGroq
+from llm_client import stream_complete
+from metrics import timed
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+log = logging.getLogger(__name__)
 
 EXTRACTION_PROMPT = """You are a claim extraction assistant. Extract COMPLETE factual statements that can be verified or disproven.
 
@@ -51,12 +53,93 @@ Example: [{{"claim": "The sky is blue"}}, {{"claim": "Water is wet"}}]
 Return ONLY valid JSON array, no other text."""
 
 
-async def extract_claims(text: str) -> List[Dict]:
+# Max claims returned per extraction call
+MAX_CLAIMS = 5
+
+
+class JSONArrayStreamParser:
+    """
+    Incrementally pull complete top-level objects out of a JSON array
+    that arrives in chunks, e.g. '[{"claim": "A"}, {"cla' ... 'im": "B"}]'.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.object_start = -1
+        self.found = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Add a chunk and return the objects it completed."""
+        self.buffer += chunk
+        objects = []
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif not self.started:
+                self.started = ch == "["
+            elif ch == '"' and self.depth > 0:
+                self.in_string = True
+            elif ch == "{":
+                if self.depth == 0:
+                    self.object_start = self.pos
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        objects.append(json.loads(self.buffer[self.object_start:self.pos + 1]))
+                        self.found += 1
+                    except json.JSONDecodeError:
+                        pass
+                    # Drop consumed text so the buffer stays small
+                    self.buffer = self.buffer[self.pos + 1:]
+                    self.pos = -1
+            self.pos += 1
+        return objects
+
+
+def locate_claim(text: str, claim: Dict) -> Dict:
+    """Find a claim in the original text and attach its character offsets."""
+    claim_text = claim.get("claim", "") if isinstance(claim, dict) else ""
+    
+    # Search for the claim in the text to find indices
+    # We do this in Python now instead of asking the LLM
+    start = -1
+    end = -1
+    
+    found_pos = text.find(claim_text) if claim_text else -1
+    if found_pos != -1:
+        start = found_pos
+        end = found_pos + len(claim_text)
+    
+    return {
+        "claim": claim_text,
+        "start_char": start,
+        "end_char": end
+    }
+
+
+@timed("extract_claims")
+async def extract_claims(text: str, on_claim: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
     """
     Extract factual claims from text using Groq LLM.
+    The completion is streamed and parsed incrementally, so each claim can
+    be handed to on_claim (e.g. to start searching) before the model finishes.
     
     Args:
         text: The input text to analyze
+        on_claim: Optional callback invoked with each claim as soon as it is parsed
         
     Returns:
         List of dicts with claim, start_char, end_char
@@ -64,8 +147,20 @@ async def extract_claims(text: str) -> List[Dict]:
     if not text.strip():
         return []
     
+    validated_claims = []
+    
+    def accept(claim: Dict) -> None:
+        item = locate_claim(text, claim)
+        validated_claims.append(item)
+        if on_claim is not None:
+            on_claim(item)
+    
     try:
-        response = await client.chat.completions.create(
+        parser = JSONArrayStreamParser()
+        content_parts = []
+        
+        stream = stream_complete(
+            "claim_extractor",
             model="llama-3.1-8b-instant",
             messages=[
                 {
@@ -76,43 +171,32 @@ async def extract_claims(text: str) -> List[Dict]:
             temperature=0.1,
             max_tokens=1024
         )
+        async with aclosing(stream):
+            async for delta in stream:
+                content_parts.append(delta)
+                for claim in parser.feed(delta):
+                    if len(validated_claims) < MAX_CLAIMS:
+                        accept(claim)
+                # Max 5 claims - no need to wait for the rest
+                if len(validated_claims) >= MAX_CLAIMS:
+                    break
         
-        content = response.choices[0].message.content.strip()
-        
-        # Parse JSON from response
-        # Try to extract JSON array from the response
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        if json_match:
-            claims = json.loads(json_match.group())
-        else:
-            claims = json.loads(content)
-        
-        # Validate claims - ensure they exist in the original text
-        validated_claims = []
-        for claim in claims[:5]:  # Max 5 claims
-            claim_text = claim.get("claim", "")
-            
-            # Search for the claim in the text to find indices
-            # We do this in Python now instead of asking the LLM
-            start = -1
-            end = -1
-            
-            found_pos = text.find(claim_text)
-            if found_pos != -1:
-                start = found_pos
-                end = found_pos + len(claim_text)
-            
-            validated_claims.append({
-                "claim": claim_text,
-                "start_char": start,
-                "end_char": end
-            })
+        if parser.found == 0:
+            # Not a streamed array of objects: parse the whole response
+            content = "".join(content_parts).strip()
+            json_match = re.search(r'\[.*\]', content, re.DOTALL)
+            if json_match:
+                claims = json.loads(json_match.group())
+            else:
+                claims = json.loads(content)
+            for claim in claims[:MAX_CLAIMS]:
+                accept(claim)
         
         return validated_claims
         
     except json.JSONDecodeError:
-        # If JSON parsing fails, return empty list
-        return []
+        # If JSON parsing fails, keep whatever was already parsed
+        return validated_claims
     except Exception as e:
-        print(f"Error extracting claims: {e}")
-        return []
+        log.error("Error extracting claims: %s", e)
+        return validated_claims
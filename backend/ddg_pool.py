@@ -0,0 +1,123 @@
+"""
+DDG Pool Module - Dedicated worker threads for the blocking DuckDuckGo client
+INPUT: Search query + max_results + timeout
+OUTPUT: Raw DDGS text results (dicts with title, href, body)
+CONSTRAINT: DDG_WORKERS threads, each reusing one long-lived DDGS client; queries that
+            time out are cancelled if still queued and skipped if they start too late
+"""
+
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Dict, List, Optional
+from duckduckgo_search import DDGS
+
+# Worker threads (each one holds its own DDGS client)
+DDG_WORKERS = int(os.getenv("DDG_WORKERS", "4"))
+
+# HTTP timeout used by each DDGS client, in seconds
+DDG_CLIENT_TIMEOUT = int(os.getenv("DDG_CLIENT_TIMEOUT", "5"))
+
+
+class DDGPool:
+    """Thread pool of long-lived DDGS clients, separate from the default executor."""
+
+    def __init__(self, workers: int = DDG_WORKERS):
+        self.workers = max(1, workers)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.skipped = 0
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="ddg"
+            )
+        return self._executor
+
+    def _client(self) -> DDGS:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = DDGS(timeout=DDG_CLIENT_TIMEOUT)
+            self._local.client = client
+        return client
+
+    def _count(self, **changes: int) -> None:
+        with self._lock:
+            for name, delta in changes.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _run(self, query: str, max_results: int, deadline: float) -> List[Dict]:
+        self._count(queued=-1)
+        # The caller already gave up while this sat in the queue
+        if time.monotonic() > deadline:
+            self._count(skipped=1)
+            return []
+
+        self._count(running=1)
+        try:
+            # Force English results with region parameter
+            results = list(self._client().text(
+                query,
+                region='wt-wt',  # Worldwide English
+                safesearch='moderate',
+                max_results=max_results
+            ))
+            self._count(completed=1)
+            return results
+        except Exception:
+            # Start over with a fresh client after any failure
+            self._local.client = None
+            self._count(failed=1)
+            raise
+        finally:
+            self._count(running=-1)
+
+    async def search(self, query: str, max_results: int, timeout: float) -> List[Dict]:
+        """
+        Run a DDGS text search on the pool.
+
+        Raises:
+            asyncio.TimeoutError: No answer within `timeout`; the job is
+            cancelled if it has not started yet
+        """
+        self._count(queued=1)
+        future = self._get_executor().submit(self._run, query, max_results, time.monotonic() + timeout)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._count(timed_out=1)
+            raise
+        finally:
+            # No-op once running; a queued job never starts
+            if future.cancel():
+                self._count(queued=-1, skipped=1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "skipped": self.skipped
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; queued jobs are dropped."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+ddg_pool = DDGPool()
@@ -0,0 +1,167 @@
+"""
+Document Chunker Module - Long-document mode for claim and citation extraction
+INPUT: Long text + an extractor for a single short window
+OUTPUT: Deduplicated items with start_char/end_char mapped to document offsets
+CONSTRAINT: Sentence-aligned windows of at most LONG_DOC_WINDOW_CHARS, neighbouring
+            windows share LONG_DOC_OVERLAP_SENTENCES sentences; work grows linearly
+"""
+
+import os
+import logging
+import re
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from scheduler import run_bounded
+
+log = logging.getLogger(__name__)
+
+# Texts up to this length are extracted in a single call
+SINGLE_PASS_CHARS = 200
+
+# Hard limit on documents accepted in long-document mode
+MAX_DOCUMENT_CHARS = int(os.getenv("MAX_DOCUMENT_CHARS", "100000"))
+
+# Window size and overlap for long documents
+LONG_DOC_WINDOW_CHARS = int(os.getenv("LONG_DOC_WINDOW_CHARS", "400"))
+LONG_DOC_OVERLAP_SENTENCES = int(os.getenv("LONG_DOC_OVERLAP_SENTENCES", "1"))
+
+# Max items (claims / citations) kept for one document
+LONG_DOC_MAX_ITEMS = int(os.getenv("LONG_DOC_MAX_ITEMS", "100"))
+
+# A sentence ends at . ! ? (plus closing quotes/brackets) followed by whitespace, or at a newline
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Return (start, end) spans of the sentences in text, trailing whitespace included."""
+    spans = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def _split_long_span(text: str, start: int, end: int, window_chars: int) -> List[Tuple[int, int]]:
+    """Break a sentence longer than a window at whitespace."""
+    pieces = []
+    while end - start > window_chars:
+        cut = text.rfind(" ", start + 1, start + window_chars)
+        if cut <= start:
+            cut = start + window_chars
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def chunk_document(
+    text: str,
+    window_chars: int = LONG_DOC_WINDOW_CHARS,
+    overlap_sentences: int = LONG_DOC_OVERLAP_SENTENCES
+) -> List[Tuple[str, int]]:
+    """
+    Split text into sentence-aligned, overlapping windows.
+
+    Args:
+        text: The full document
+        window_chars: Max characters per window
+        overlap_sentences: Sentences repeated at the start of the next window
+
+    Returns:
+        List of (window text, offset of the window in the document)
+    """
+    spans = []
+    for start, end in split_sentences(text):
+        spans.extend(_split_long_span(text, start, end, window_chars))
+
+    windows = []
+    i = 0
+    while i < len(spans):
+        j = i
+        # Always take at least one sentence, then as many as fit
+        while j + 1 < len(spans) and spans[j + 1][1] - spans[i][0] <= window_chars:
+            j += 1
+        window_start, window_end = spans[i][0], spans[j][1]
+        window = text[window_start:window_end]
+        if window.strip():
+            windows.append((window, window_start))
+        if j + 1 >= len(spans):
+            break
+        # Step forward, keeping the overlap but always making progress
+        i = max(i + 1, j + 1 - overlap_sentences)
+    return windows
+
+
+def _dedupe_key(value: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", value.lower()).split())
+
+
+def _shift(item: Dict, offset: int) -> Dict:
+    item = dict(item)
+    if item.get("start_char", -1) >= 0 and item.get("end_char", -1) >= 0:
+        item["start_char"] += offset
+        item["end_char"] += offset
+    return item
+
+
+async def extract_in_windows(
+    text: str,
+    extract: Callable[..., Awaitable[List[Dict]]],
+    dedupe_field: str,
+    limit: Optional[int] = None,
+    on_item: Optional[Callable[[Dict], None]] = None
+) -> List[Dict]:
+    """
+    Run `extract` over each window in parallel and merge the results.
+
+    Args:
+        text: The full document
+        extract: Extractor for a single window (extract_claims / extract_citations)
+        dedupe_field: Field used to drop items repeated across window overlaps
+        limit: Max windows extracted at the same time
+        on_item: Optional callback for each new item as soon as its window
+                 emits it (requires an extractor with an on_claim callback)
+
+    Returns:
+        Items in document order; start_char/end_char (when found) are document offsets
+    """
+    windows = chunk_document(text)
+
+    # Items already handed to on_item, so the final list reuses the same dicts
+    emitted: Dict[str, Dict] = {}
+
+    def window_callback(offset: int) -> Callable[[Dict], None]:
+        def on_window_item(item: Dict) -> None:
+            key = _dedupe_key(str(item.get(dedupe_field) or ""))
+            if not key or key in emitted or len(emitted) >= LONG_DOC_MAX_ITEMS:
+                return
+            emitted[key] = _shift(item, offset)
+            on_item(emitted[key])
+        return on_window_item
+
+    async def extract_window(window: Tuple[str, int]) -> List[Dict]:
+        if on_item is None:
+            return await extract(window[0])
+        return await extract(window[0], on_claim=window_callback(window[1]))
+
+    outcomes = await run_bounded(extract_window, windows, limit)
+
+    merged = []
+    seen = set()
+    for (_, offset), items in zip(windows, outcomes):
+        if isinstance(items, BaseException):
+            log.error("Error extracting window at %d: %s", offset, items)
+            continue
+        for item in items:
+            key = _dedupe_key(str(item.get(dedupe_field) or ""))
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            merged.append(emitted.get(key) or _shift(item, offset))
+
+            if len(merged) >= LONG_DOC_MAX_ITEMS:
+                return merged
+    return merged
@@ -3,23 +3,28 @@ Fact Checker Module with Multi-Model Voting
 INPUT: Claim string + search results
 OUTPUT: {status, reason}
 CONSTRAINT: status must be exactly one of: VERIFIED | HALLUCINATED | UNVERIFIABLE
-Uses 3 different models and takes majority vote for accuracy
+Uses up to 3 runs and takes majority vote for accuracy
+(adaptive voting skips the third run when the first two agree)
+Concurrent checks are batched so several claims share one LLM call per vote
 """
 
-import os
 import json
+import logging
 import re
+import os
 import asyncio
-from typing import List, Dict, Tuple
-from collections import Counter
+from typing import List, Dict, Optional, Set, Tuple
 from dotenv import load_dotenv
-from groq import AsyncGroq
+from llm_client import complete
+from metrics import timed
+from verdict_store import verdicts, verdict_key, prompt_version
+from reranker import select_evidence
+from voting import collect_votes, collect_batch_votes, majority, describe_votes, VOTING_MODE
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Groq client
-client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+log = logging.getLogger(__name__)
 
 # Three different models for voting - using different parameter settings for diversity
 MODELS = [
@@ -31,6 +36,14 @@ MODELS = [
 # Different temperatures for model diversity
 TEMPERATURES = [0.1, 0.3, 0.5]
 
+# Prefix of the reason returned when a single model call fails
+MODEL_ERROR_PREFIX = "Model error"
+
+# Micro-batching: check_fact calls arriving within the window share one
+# LLM request per vote (up to FACT_CHECK_BATCH_SIZE claims). 1 disables it.
+FACT_CHECK_BATCH_SIZE = int(os.getenv("FACT_CHECK_BATCH_SIZE", "5"))
+FACT_CHECK_BATCH_WINDOW_MS = float(os.getenv("FACT_CHECK_BATCH_WINDOW_MS", "50"))
+
 FACT_CHECK_PROMPT = """You are a rigorous fact-checking assistant. Analyze whether the ENTIRE claim is supported by search results.
 
 CLAIM TO VERIFY:
@@ -65,6 +78,33 @@ IMPORTANT:
 - Return ONLY valid JSON, no other text"""
 
 
+BATCH_FACT_CHECK_PROMPT = """You are a rigorous fact-checking assistant. For EACH numbered claim, analyze whether the ENTIRE claim is supported by ITS OWN search results.
+
+{claims}
+
+VERIFICATION RULES (apply to each claim separately):
+1. VERIFIED - The search results CLEARLY and DIRECTLY support the COMPLETE claim (subject, action, object, time, place, etc.)
+2. HALLUCINATED - The search results CONTRADICT the claim OR show any part of it is factually wrong
+3. UNVERIFIABLE - Not enough evidence to confirm or deny, or the sources are ambiguous
+
+CRITICAL: Verify the COMPLETE STATEMENT, not just that entities exist!
+- "Einstein discovered penicillin" is HALLUCINATED even though Einstein existed
+
+Respond with ONLY a JSON array containing one object per claim, in this exact format:
+[{{"id": 1, "status": "VERIFIED|HALLUCINATED|UNVERIFIABLE", "reason": "Brief explanation under 150 characters"}}]
+
+IMPORTANT:
+- id MUST be the claim number
+- status MUST be exactly one of: VERIFIED, HALLUCINATED, UNVERIFIABLE
+- Return ONLY a valid JSON array, no other text"""
+
+# Changing the prompt or voting setup invalidates cached verdicts
+VERDICT_VERSION = prompt_version(
+    FACT_CHECK_PROMPT, BATCH_FACT_CHECK_PROMPT, FACT_CHECK_BATCH_SIZE, MODELS, TEMPERATURES, VOTING_MODE
+)
+
+
+@timed("check_fact_vote")
 async def check_fact_with_model(claim: str, search_results: str, model: str, temperature: float) -> Tuple[str, str]:
     """
     Check a claim with a specific model and temperature.
@@ -73,7 +113,8 @@ async def check_fact_with_model(claim: str, search_results: str, model: str, tem
         Tuple of (status, reason)
     """
     try:
-        response = await client.chat.completions.create(
+        response = await complete(
+            "fact_checker",
             model=model,
             messages=[
                 {
@@ -108,70 +149,285 @@ async def check_fact_with_model(claim: str, search_results: str, model: str, tem
         return (status, reason)
         
     except Exception as e:
-        print(f"Error with model {model} (temp={temperature}): {e}")
-        return ("UNVERIFIABLE", f"Model error: {str(e)[:100]}")
+        log.warning("Error with model %s (temp=%s): %s", model, temperature, e)
+        return ("UNVERIFIABLE", f"{MODEL_ERROR_PREFIX}: {str(e)[:100]}")
 
 
-async def check_fact(claim: str, search_results: List[Dict]) -> Dict:
+def format_search_results(search_results: List[Dict]) -> str:
+    """Format search results as prompt evidence lines."""
+    return "\n".join([
+        f"- {r['title']}: {r['snippet']}"
+        for r in search_results
+    ])
+
+
+@timed("check_fact_batch_vote")
+async def check_batch_with_model(items: List[Tuple[str, str]], model: str, temperature: float) -> Dict[int, Tuple[str, str]]:
     """
-    Check a claim against search results using 3 different models with voting.
+    Check several claims in one completion with a specific model and temperature.
     
     Args:
-        claim: The claim to verify
-        search_results: List of search results with title, url, snippet
+        items: List of (claim, formatted search results)
         
     Returns:
-        Dict with status (majority vote) and reason
+        Dict of item index -> (status, reason). Claims missing from the
+        model's answer (or everything, if the call fails) are left out.
     """
-    # If no search results, mark as unverifiable
-    if not search_results:
+    claims_block = "\n\n".join(
+        f"CLAIM {i + 1}:\n{claim}\nSEARCH RESULTS FOR CLAIM {i + 1}:\n{results}"
+        for i, (claim, results) in enumerate(items)
+    )
+    
+    try:
+        response = await complete(
+            "fact_checker",
+            model=model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": BATCH_FACT_CHECK_PROMPT.format(claims=claims_block)
+                }
+            ],
+            temperature=temperature,
+            max_tokens=128 * len(items)
+        )
+        
+        content = response.choices[0].message.content.strip()
+        
+        # Parse JSON array from response
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        parsed = json.loads(json_match.group() if json_match else content)
+        
+        verdicts_by_index = {}
+        valid_statuses = ["VERIFIED", "HALLUCINATED", "UNVERIFIABLE"]
+        for entry in parsed:
+            try:
+                index = int(entry.get("id")) - 1
+            except (AttributeError, TypeError, ValueError):
+                continue
+            status = str(entry.get("status", "")).upper()
+            if not 0 <= index < len(items) or index in verdicts_by_index or status not in valid_statuses:
+                continue
+            verdicts_by_index[index] = (status, str(entry.get("reason", "Unable to determine"))[:150])
+        
+        return verdicts_by_index
+        
+    except Exception as e:
+        log.warning("Error with batched model %s (temp=%s, %d claims): %s", model, temperature, len(items), e)
+        return {}
+
+
+async def _vote_batch(items: List[Tuple[str, str]], indices: List[int], setting: Tuple[str, float]) -> List[Tuple[str, str]]:
+    """One batched vote for the given items; claims the batch missed fall back to check_fact_with_model."""
+    subset = [items[i] for i in indices]
+    parsed = await check_batch_with_model(subset, *setting) if len(subset) > 1 else {}
+    
+    missing = [k for k in range(len(subset)) if k not in parsed]
+    fallbacks = await asyncio.gather(*(
+        check_fact_with_model(subset[k][0], subset[k][1], *setting) for k in missing
+    ))
+    parsed.update(zip(missing, fallbacks))
+    
+    return [parsed[k] for k in range(len(subset))]
+
+
+def _verdict_from_votes(results: List[Tuple[str, str]]) -> Dict:
+    """Turn (status, reason) votes into the check_fact verdict dict."""
+    # Extract statuses and reasons
+    statuses = [r[0] for r in results]
+    reasons = {r[0]: r[1] for r in results}  # Map status to reason
+    
+    # Get majority vote (or most common if no majority)
+    majority_status, vote_count = majority(statuses)
+    
+    # Create reason with voting info
+    reason = describe_votes(vote_count, len(results), "runs", majority_status, reasons[majority_status])
+    
+    return {
+        "status": majority_status,
+        "reason": reason[:150],
+        "votes": len(results)
+    }
+
+
+async def _store_verdict(cache_key: str, verdict: Dict, results: List[Tuple[str, str]]) -> None:
+    # Only cache verdicts where every run actually answered
+    if not any(r[1].startswith(MODEL_ERROR_PREFIX) for r in results):
+        await verdicts.put(cache_key, "claim", verdict)
+
+
+async def _check_uncached(claim: str, search_results: List[Dict], cache_key: str) -> Dict:
+    """Vote on a single claim (no cache lookup)."""
+    formatted_results = format_search_results(search_results)
+    
+    try:
+        # Run the models with different temperatures (2 or 3 runs)
+        results = await collect_votes(
+            lambda setting: check_fact_with_model(claim, formatted_results, *setting),
+            list(zip(MODELS, TEMPERATURES))
+        )
+        
+        verdict = _verdict_from_votes(results)
+        await _store_verdict(cache_key, verdict, results)
+        return verdict
+        
+    except Exception as e:
+        log.error("Error in multi-model fact checking: %s", e)
         return {
             "status": "UNVERIFIABLE",
-            "reason": "No search results found to verify this claim"
+            "reason": f"Error during verification: {str(e)[:100]}",
+            "votes": 0
         }
+
+
+async def _check_uncached_batch(items: List[Tuple[str, List[Dict], str]]) -> List[Dict]:
+    """Vote on several claims with one LLM call per vote round (no cache lookup)."""
+    if len(items) == 1:
+        return [await _check_uncached(*items[0])]
     
-    # Format search results for the prompt
-    formatted_results = "\n".join([
-        f"- {r['title']}: {r['snippet']}"
-        for r in search_results
-    ])
+    prompts = [(claim, format_search_results(results)) for claim, results, _ in items]
     
     try:
-        # Run all 3 models in parallel with different temperatures
-        tasks = [
-            check_fact_with_model(claim, formatted_results, model, temp)
-            for model, temp in zip(MODELS, TEMPERATURES)
-        ]
-        results = await asyncio.gather(*tasks)
-        
-        # Extract statuses and reasons
-        statuses = [r[0] for r in results]
-        reasons = {r[0]: r[1] for r in results}  # Map status to reason
-        
-        # Count votes
-        vote_counts = Counter(statuses)
-        
-        # Get majority vote (or most common if no majority)
-        majority_status = vote_counts.most_common(1)[0][0]
-        vote_count = vote_counts[majority_status]
-        
-        # Create reason with voting info
-        if vote_count == 3:
-            reason = f"All 3 runs agree: {reasons[majority_status]}"
-        elif vote_count == 2:
-            reason = f"2/3 runs agree: {reasons[majority_status]}"
-        else:
-            # No majority - all different
-            reason = f"Runs disagree (1/3 each). Using {majority_status}: {reasons[majority_status]}"
+        votes = await collect_batch_votes(
+            lambda indices, setting: _vote_batch(prompts, indices, setting),
+            list(zip(MODELS, TEMPERATURES)),
+            len(items)
+        )
+    except Exception as e:
+        log.error("Error in batched fact checking: %s", e)
+        return [{
+            "status": "UNVERIFIABLE",
+            "reason": f"Error during verification: {str(e)[:100]}",
+            "votes": 0
+        } for _ in items]
+    
+    verdicts_out = []
+    for (_, _, cache_key), results in zip(items, votes):
+        verdict = _verdict_from_votes(results)
+        await _store_verdict(cache_key, verdict, results)
+        verdicts_out.append(verdict)
+    return verdicts_out
+
+
+class _FactCheckBatcher:
+    """
+    Collects check_fact calls that arrive within a short window and
+    checks them together, so concurrent claims share LLM calls.
+    """
+
+    def __init__(self, max_size: int, window: float):
+        self.max_size = max_size
+        self.window = window
+        self._pending: List[Tuple[Tuple[str, List[Dict], str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; hold them until they finish
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, claim: str, search_results: List[Dict], cache_key: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((claim, search_results, cache_key), future))
         
-        return {
-            "status": majority_status,
-            "reason": reason[:150]
-        }
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
         
-    except Exception as e:
-        print(f"Error in multi-model fact checking: {e}")
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Tuple[str, List[Dict], str], asyncio.Future]]) -> None:
+        try:
+            results = await _check_uncached_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), verdict in zip(batch, results):
+            if not future.done():
+                future.set_result(verdict)
+
+
+_batcher = _FactCheckBatcher(FACT_CHECK_BATCH_SIZE, FACT_CHECK_BATCH_WINDOW_MS / 1000.0)
+
+
+def _precheck(claim: str, search_results: List[Dict]) -> Tuple[Optional[Dict], str]:
+    """Verdict that needs no LLM (no evidence), plus the cache key."""
+    # If no search results, mark as unverifiable
+    if not search_results:
         return {
             "status": "UNVERIFIABLE",
-            "reason": f"Error during verification: {str(e)[:100]}"
-        }
+            "reason": "No search results found to verify this claim",
+            "votes": 0
+        }, ""
+    return None, verdict_key("claim", {"claim": claim}, search_results, VERDICT_VERSION)
+
+
+@timed("check_fact")
+async def check_fact(claim: str, search_results: List[Dict]) -> Dict:
+    """
+    Check a claim against search results using majority voting over model runs.
+    Only the snippet sentences that best match the claim go into the prompt.
+    Concurrent calls are micro-batched into shared LLM requests when
+    FACT_CHECK_BATCH_SIZE > 1.
+    
+    Args:
+        claim: The claim to verify
+        search_results: List of search results with title, url, snippet
+        
+    Returns:
+        Dict with status (majority vote), reason and votes (runs used)
+    """
+    search_results = select_evidence(claim, search_results)
+    verdict, cache_key = _precheck(claim, search_results)
+    if verdict is not None:
+        return verdict
+    
+    # Same claim judged against the same evidence before: no LLM calls
+    cached = await verdicts.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    if FACT_CHECK_BATCH_SIZE > 1:
+        return await _batcher.submit(claim, search_results, cache_key)
+    return await _check_uncached(claim, search_results, cache_key)
+
+
+async def check_facts_batch(items: List[Tuple[str, List[Dict]]]) -> List[Dict]:
+    """
+    Check several claims together, one LLM call per vote round.
+    
+    Args:
+        items: List of (claim, search results)
+        
+    Returns:
+        One check_fact-style verdict per item, in order
+    """
+    verdicts_out: List[Optional[Dict]] = []
+    misses = []
+    for i, (claim, search_results) in enumerate(items):
+        search_results = select_evidence(claim, search_results)
+        verdict, cache_key = _precheck(claim, search_results)
+        if verdict is None:
+            verdict = await verdicts.get(cache_key)
+        if verdict is None:
+            misses.append((i, (claim, search_results, cache_key)))
+        verdicts_out.append(verdict)
+    
+    for start in range(0, len(misses), max(1, FACT_CHECK_BATCH_SIZE)):
+        chunk = misses[start:start + max(1, FACT_CHECK_BATCH_SIZE)]
+        results = await _check_uncached_batch([item for _, item in chunk])
+        for (i, _), verdict in zip(chunk, results):
+            verdicts_out[i] = verdict
+    
+    return verdicts_out
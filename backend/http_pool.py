@@ -0,0 +1,79 @@
+"""
+HTTP Pool Module - One long-lived aiohttp session for all HTTP search backends
+INPUT: None (configured from environment)
+OUTPUT: Shared aiohttp.ClientSession with keep-alive, per-host limits and DNS cache
+CONSTRAINT: Opened and closed by the FastAPI app lifespan; scripts and tests that use it
+            outside the lifespan await shutdown() themselves
+"""
+
+import os
+import ssl
+import asyncio
+import certifi
+import aiohttp
+import logging
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+# Connection pool limits
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))
+
+# Seconds to keep idle connections and DNS answers around
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_DNS_TTL_SECONDS = int(os.getenv("HTTP_DNS_TTL_SECONDS", "300"))
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    global _session_loop
+    _session_loop = asyncio.get_running_loop()
+    # certifi bundle avoids Windows DNS/SSL issues with aiohttp
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_TTL_SECONDS,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def startup() -> None:
+    """Open the shared session (called from the app lifespan)."""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+
+
+async def shutdown() -> None:
+    """Close the shared session and its pooled connections."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def leaked() -> bool:
+    """True if the shared session is still open but its event loop has closed (shutdown() was never awaited)."""
+    return _session is not None and not _session.closed and _session_loop is not None and _session_loop.is_closed()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared session.
+    Outside the app lifespan (scripts, tests) a session is created lazily; the
+    caller must await shutdown() before its event loop closes.
+    """
+    global _session
+    if _session is None or _session.closed or _session_loop is not asyncio.get_running_loop():
+        if _session is not None and not _session.closed:
+            log.warning("HTTP session from another event loop was not shut down; await http_pool.shutdown() first")
+            if _session_loop is not None and _session_loop.is_running():
+                asyncio.run_coroutine_threadsafe(_session.close(), _session_loop)
+        _session = _create_session()
+    return _session
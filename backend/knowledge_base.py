@@ -0,0 +1,242 @@
+"""
+Knowledge Base Module - Offline full-text search backend (SQLite FTS5)
+INPUT: Search query (a claim)
+OUTPUT: List[Dict] with title, url, snippet (same shape as search_web)
+CONSTRAINT: Only results covering at least KB_MIN_RELEVANCE of the query terms are
+            returned, so weak local matches fall through to web search
+Set KNOWLEDGE_BASE_PATH to enable it. Build or update the index with:
+    python knowledge_base.py build enwiki-latest-abstract.xml --path kb.sqlite3
+    python knowledge_base.py update more_articles.jsonl --path kb.sqlite3
+"""
+
+import os
+import logging
+import re
+import json
+import sqlite3
+import asyncio
+import argparse
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List
+from dotenv import load_dotenv
+
+from reranker import tokenize, STOPWORDS
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Empty (the default) disables the knowledge base
+KNOWLEDGE_BASE_PATH = os.getenv("KNOWLEDGE_BASE_PATH", "")
+
+# Share of query terms a local result must contain to be used instead of the web
+KB_MIN_RELEVANCE = float(os.getenv("KB_MIN_RELEVANCE", "0.6"))
+
+# FTS candidates re-scored for relevance per query
+KB_CANDIDATES = 10
+
+# Characters of the article body returned as the snippet
+KB_SNIPPET_CHARS = 400
+
+# Documents written per transaction while importing
+IMPORT_BATCH = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, body, content='docs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO docs_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+"""
+
+
+def iter_jsonl(f) -> Iterator[Dict]:
+    """Lines like {"title": ..., "url": ..., "text" | "abstract" | "body": ...}."""
+    for line in f:
+        if line.strip():
+            row = json.loads(line)
+            yield {
+                "title": row.get("title") or "",
+                "url": row.get("url") or "",
+                "body": row.get("text") or row.get("abstract") or row.get("body") or ""
+            }
+
+
+def iter_wikipedia_abstracts(f) -> Iterator[Dict]:
+    """Stream <doc> entries from a Wikipedia abstract dump (enwiki-*-abstract.xml)."""
+    for _, element in ET.iterparse(f, events=("end",)):
+        if element.tag != "doc":
+            continue
+        title = (element.findtext("title") or "").strip()
+        if title.startswith("Wikipedia: "):
+            title = title[len("Wikipedia: "):]
+        yield {
+            "title": title,
+            "url": (element.findtext("url") or "").strip(),
+            "body": (element.findtext("abstract") or "").strip()
+        }
+        # Keep memory flat on multi-GB dumps
+        element.clear()
+
+
+IMPORTERS = {".jsonl": iter_jsonl, ".json": iter_jsonl, ".xml": iter_wikipedia_abstracts}
+
+
+def match_query(query: str) -> str:
+    """FTS5 query matching any of the query's content words."""
+    words = [w for w in re.findall(r"\w+", query.lower()) if w not in STOPWORDS]
+    return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+
+def relevance(query: str, title: str, body: str) -> float:
+    """Share of the query's content words found in the document (0-1)."""
+    wanted = set(tokenize(query))
+    if not wanted:
+        return 0.0
+    return len(wanted & set(tokenize(f"{title} {body}"))) / len(wanted)
+
+
+class KnowledgeBase:
+    """SQLite FTS5 article index. Searches run in worker threads."""
+
+    def __init__(self, path: str, min_relevance: float = KB_MIN_RELEVANCE):
+        self.path = path
+        self.min_relevance = min_relevance
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, docs: Iterable[Dict], rebuild: bool = False) -> int:
+        """
+        Add or replace documents (keyed by url, else title). Returns documents written.
+        With rebuild=True the existing index file is replaced.
+        """
+        if rebuild:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+        written = 0
+        batch = []
+
+        def flush() -> None:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO docs (key, title, url, body) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET title = excluded.title, url = excluded.url, body = excluded.body",
+                    batch
+                )
+            batch.clear()
+
+        for doc in docs:
+            title, body = doc["title"].strip(), doc["body"].strip()
+            if not title or not body:
+                continue
+            batch.append((doc["url"] or title, title, doc["url"], body))
+            written += 1
+            if len(batch) >= IMPORT_BATCH:
+                flush()
+        flush()
+
+        with conn:
+            conn.execute("INSERT INTO docs_fts (docs_fts) VALUES ('optimize')")
+        conn.close()
+        return written
+
+    def search_sync(self, query: str, max_results: int = 3) -> List[Dict]:
+        fts_query = match_query(query)
+        if not fts_query:
+            return []
+        rows = self._connect().execute(
+            "SELECT d.title, d.url, d.body FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ? ORDER BY bm25(docs_fts, 5.0, 1.0) LIMIT ?",
+            (fts_query, KB_CANDIDATES)
+        ).fetchall()
+
+        scored = [(relevance(query, title, body), title, url, body) for title, url, body in rows]
+        scored = [row for row in scored if row[0] >= self.min_relevance]
+        # Stable sort keeps the BM25 order among equally relevant documents
+        scored.sort(key=lambda row: -row[0])
+        return [
+            {"title": title, "url": url, "snippet": body[:KB_SNIPPET_CHARS]}
+            for _, title, url, body in scored[:max_results]
+        ]
+
+    async def search(self, query: str, max_results: int = 3) -> List[Dict]:
+        """Relevant local results, or [] (also on errors or when disabled)."""
+        if not self.enabled:
+            return []
+        try:
+            return await asyncio.to_thread(self.search_sync, query, max_results)
+        except sqlite3.Error as e:
+            log.error("Knowledge base search error: %s", e)
+            return []
+
+
+knowledge_base = KnowledgeBase(KNOWLEDGE_BASE_PATH)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build, update or query the offline knowledge base")
+    commands = parser.add_subparsers(dest="command", required=True)
+    default_path = KNOWLEDGE_BASE_PATH or "knowledge_base.sqlite3"
+
+    for name, help_text in (
+        ("build", "Replace the index with the given .xml (Wikipedia abstracts) or .jsonl files"),
+        ("update", "Add or replace articles from the given files, keeping the rest")
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("files", nargs="+")
+        command.add_argument("--path", default=default_path)
+
+    search = commands.add_parser("search", help="Run a query against the index")
+    search.add_argument("query")
+    search.add_argument("--path", default=default_path)
+
+    args = parser.parse_args()
+    kb = KnowledgeBase(args.path)
+
+    if args.command == "search":
+        print(json.dumps(kb.search_sync(args.query), indent=2))
+        return
+
+    for i, name in enumerate(args.files):
+        importer = IMPORTERS.get(os.path.splitext(name)[1].lower())
+        if importer is None:
+            parser.error(f"Unsupported file type: {name}")
+        binary = importer is iter_wikipedia_abstracts
+        with open(name, "rb") if binary else open(name, encoding="utf-8") as f:
+            written = kb.upsert(importer(f), rebuild=args.command == "build" and i == 0)
+        print(f"{name}: {written} articles written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+LLM Client Module - Shared, rate-aware Groq client
+INPUT: Chat completion arguments (model, messages, temperature, max_tokens)
+OUTPUT: Groq chat completion response (or streamed content deltas)
+CONSTRAINT: Stays under the requests/min and tokens/min quota, backs off on 429s
+All modules that talk to Groq go through complete() so they share one
+client, one token bucket and one adaptive concurrency limit.
+"""
+
+import os
+import logging
+import time
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from dotenv import load_dotenv
+from groq import AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
+from groq.types.chat import ChatCompletion
+import cassettes
+from circuit_breaker import CircuitOpenError, get_breaker
+from metrics import LLM_CALLS, LLM_SECONDS, LLM_TOKENS, record_error
+import request_timing
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+# Groq quota for llama-3.1-8b-instant on the free tier
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+
+# Adaptive concurrency (AIMD) bounds for in-flight Groq requests
+GROQ_MIN_CONCURRENCY = int(os.getenv("GROQ_MIN_CONCURRENCY", "1"))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+
+# Retries for 429s and transient Groq errors
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+
+# Groq calls slower than this count as slow for the circuit breaker
+GROQ_SLOW_CALL_SECONDS = float(os.getenv("GROQ_SLOW_CALL_SECONDS", "20"))
+
+# Rough prompt size estimate used before the real usage is known
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` units are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) units after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter.
+    Each success adds 1/limit to the limit (about +1 per round trip),
+    each throttle halves it.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Hand a wake-up we may have received to the next waiter
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2.0)
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+_client: Optional[AsyncGroq] = None
+request_bucket = TokenBucket(GROQ_RPM)
+token_bucket = TokenBucket(GROQ_TPM)
+limiter = AdaptiveLimiter(GROQ_MAX_CONCURRENCY // 2 or 1, GROQ_MIN_CONCURRENCY, GROQ_MAX_CONCURRENCY)
+
+# Connection errors and 5xx open it; 429s are quota, handled by the limiter instead
+breaker = get_breaker("groq", slow_call_seconds=GROQ_SLOW_CALL_SECONDS)
+
+# Monotonic time before which nobody may call Groq (set from Retry-After)
+_cooldown_until = 0.0
+
+
+def get_client() -> AsyncGroq:
+    """Return the process-wide Groq client, creating it on first use."""
+    global _client
+    if _client is None:
+        # Retries are handled here so 429s feed the AIMD limiter
+        _client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+    return _client
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Estimate prompt + completion tokens for the token bucket."""
+    prompt_chars = sum(len(m.get("content", "")) for m in messages)
+    return prompt_chars // CHARS_PER_TOKEN + max_tokens
+
+
+def retry_after_seconds(error: Exception, attempt: int) -> float:
+    """Read Retry-After from a Groq error, else use exponential backoff."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return float(2 ** attempt)
+
+
+def record_usage(module: str, usage: Any, estimate: int) -> None:
+    """Correct the token bucket with the real usage Groq reported, and count the tokens."""
+    if usage is None or not getattr(usage, "total_tokens", None):
+        return
+    token_bucket.adjust(usage.total_tokens - estimate)
+    counts = {}
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        counts[kind] = tokens if isinstance(tokens, int) else 0
+        LLM_TOKENS.inc(module, kind, amount=counts[kind])
+    request_timing.record_llm(counts["prompt"], counts["completion"], call=False)
+
+
+async def _wait_for_cooldown() -> None:
+    delay = _cooldown_until - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+# Streams are recorded by stream_complete as content deltas
+@cassettes.boundary(
+    "llm", encode=lambda response: response.model_dump(), decode=ChatCompletion.model_validate,
+    bypass=lambda arguments: bool(arguments.get("stream"))
+)
+async def complete(
+    module: str,
+    *,
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    **kwargs: Any
+) -> Any:
+    """
+    Create a Groq chat completion under the shared rate limits.
+
+    Args:
+        module: Name of the calling module (for logging)
+        model: Groq model name
+        messages: Chat messages
+        temperature: Sampling temperature
+        max_tokens: Completion token cap
+        **kwargs: Extra arguments passed to chat.completions.create
+
+    Returns:
+        The Groq chat completion response
+    
+    Raises:
+        CircuitOpenError: Groq has been failing and is skipped for now
+    """
+    global _cooldown_until
+    estimate = estimate_tokens(messages, max_tokens)
+    backoff = 0.0
+
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        if backoff:
+            await asyncio.sleep(backoff)
+            backoff = 0.0
+        # Checked before the buckets, so rejected calls neither wait nor spend quota
+        if not breaker.allow():
+            LLM_CALLS.inc(module, "circuit_open")
+            raise CircuitOpenError("Groq circuit breaker is open")
+        await _wait_for_cooldown()
+        await request_bucket.acquire(1)
+        await token_bucket.acquire(estimate)
+
+        await limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = await get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs
+            )
+        except RateLimitError as e:
+            LLM_CALLS.inc(module, "rate_limited")
+            limiter.on_throttle()
+            delay = retry_after_seconds(e, attempt)
+            _cooldown_until = max(_cooldown_until, time.monotonic() + delay)
+            log.warning("Groq 429 in %s, backing off %.1fs (limit=%.1f)", module, delay, limiter.limit)
+            if attempt == GROQ_MAX_RETRIES:
+                raise
+            continue
+        except (APIConnectionError, InternalServerError) as e:
+            LLM_CALLS.inc(module, "error")
+            record_error("llm", e)
+            breaker.record_failure(time.monotonic() - started)
+            if attempt == GROQ_MAX_RETRIES:
+                raise
+            log.warning("Groq error in %s: %s, retrying", module, type(e).__name__)
+            backoff = retry_after_seconds(e, attempt)
+            continue
+        except Exception as e:
+            LLM_CALLS.inc(module, "error")
+            record_error("llm", e)
+            raise
+        finally:
+            limiter.release()
+
+        latency = time.monotonic() - started
+        limiter.on_success()
+        breaker.record_success(latency)
+        LLM_CALLS.inc(module, "ok")
+        LLM_SECONDS.observe(latency, module)
+        request_timing.record_llm()
+        record_usage(module, getattr(response, "usage", None), estimate)
+        return response
+
+
+@cassettes.stream_boundary("llm_stream")
+async def stream_complete(
+    module: str,
+    *,
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    **kwargs: Any
+) -> AsyncIterator[str]:
+    """
+    Stream a Groq chat completion under the shared rate limits.
+    Rate limiting and retries apply until the stream starts; the
+    concurrency slot is released once the response headers arrive.
+
+    Yields:
+        Content deltas as the model produces them
+    """
+    stream = await complete(
+        module,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        **kwargs
+    )
+    estimate = estimate_tokens(messages, max_tokens)
+
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # Groq reports usage on the last chunk
+            record_usage(module, getattr(getattr(chunk, "x_groq", None), "usage", None), estimate)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            await close()
@@ -1,29 +1,82 @@
 """
 FastAPI Backend for AI Hallucination Detector
-Endpoints: POST /verify, POST /verify-citations, GET /health, GET /docs
+Endpoints: POST /verify, POST /verify/stream, POST /verify/batch, POST /verify-citations,
+           POST /verify-citations/stream, GET /health, GET /metrics, GET /docs
 """
 
+import os
+import json
+import logging
+import time
 import asyncio
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from fastapi.responses import StreamingResponse, Response
+from pydantic import BaseModel, model_serializer
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 from claim_extractor import extract_claims
-from search_module import search_web, search_for_citation
+from search_module import search_web, search_for_citation, normalize_query
 from fact_checker import check_fact
+from reranker import SEARCH_CANDIDATES
 from citation_checker import extract_citations, verify_citation
+from citation_index import MATCH_FUZZY, citation_index, record_source
+from citation_compare import verdict_from_record
+from scheduler import run_bounded, iter_bounded, iter_completed, BatchPool, Pipeline
+from document_chunker import extract_in_windows, SINGLE_PASS_CHARS, MAX_DOCUMENT_CHARS
+import http_pool
+from ddg_pool import ddg_pool
+from circuit_breaker import breaker_states
+from search_backends import backend_stats
+import metrics
+import request_timing
+import structured_logging
 
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# Max texts accepted by one /verify/batch call
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "1000"))
+
+# Max characters for the non-streaming endpoints (/verify, /verify-citations, batch items):
+# a long document fans out to one LLM call per window and would hold the Groq budget for minutes
+MAX_SYNC_DOCUMENT_CHARS = int(os.getenv("MAX_SYNC_DOCUMENT_CHARS", "5000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the log writer and open shared HTTP connections on startup; close them
+    (and search workers) and flush logs on shutdown.
+    """
+    structured_logging.setup_logging()
+    await http_pool.startup()
+    yield
+    await http_pool.shutdown()
+    ddg_pool.shutdown()
+    structured_logging.shutdown_logging()
+
+
 app = FastAPI(
     title="AI Hallucination Detector",
     description="Detects hallucinations and verifies claims and citations in real-time",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Keep proxies from buffering streamed NDJSON
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Per-route request counts, latency and in-flight gauges for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Request id (X-Request-ID) attached to every log record written while handling a request
+app.add_middleware(structured_logging.RequestIdMiddleware)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -45,12 +98,49 @@ class ClaimResult(BaseModel):
     status: str  # VERIFIED | HALLUCINATED | UNVERIFIABLE
     reason: str
     sources: List[Dict[str, str]]
+    votes: Optional[int] = None  # LLM votes used for the verdict
+
+
+class RequestTiming(BaseModel):
+    total_ms: float
+    stages: Dict[str, Dict[str, float]]  # stage -> calls, total_ms, max_ms
+    items: List[Dict[str, Any]]  # wall time per claim / citation
+    llm_calls: int
+    llm_tokens: Dict[str, int]
+    profile: Optional[Dict[str, Any]] = None
 
 
-class VerifyResponse(BaseModel):
+class DebuggableResponse(BaseModel):
+    """Response with an optional timing section, left out entirely unless requested."""
+    timing: Optional[RequestTiming] = None
+    
+    @model_serializer(mode="wrap")
+    def _drop_empty_timing(self, handler):
+        data = handler(self)
+        if self.timing is None:
+            data.pop("timing", None)
+        return data
+
+
+class VerifyResponse(DebuggableResponse):
     results: List[ClaimResult]
 
 
+# Batch verification models
+class BatchItem(BaseModel):
+    id: str
+    text: str
+
+
+class BatchVerifyRequest(BaseModel):
+    items: List[BatchItem]
+
+
+class BatchVerifyResponse(BaseModel):
+    results: Dict[str, List[ClaimResult]]
+    errors: Dict[str, str]
+
+
 # Citation verification models
 class CitationResult(BaseModel):
     raw_citation: str
@@ -63,138 +153,425 @@ class CitationResult(BaseModel):
     errors: List[str]
     reason: str
     sources: List[Dict[str, str]]
+    votes: Optional[int] = None  # LLM votes used for the verdict
 
 
-class CitationVerifyResponse(BaseModel):
+class CitationVerifyResponse(DebuggableResponse):
     results: List[CitationResult]
 
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
+async def health_check(detail: bool = False):
+    """Health check endpoint. ?detail=true adds circuit breaker, search backend and pool state."""
+    if not detail:
+        return {"status": "ok"}
+    
+    breakers = breaker_states()
+    degraded = any(b["state"] != "closed" for b in breakers.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "breakers": breakers,
+        "search_backends": backend_stats(),
+        "duckduckgo_pool": ddg_pool.stats()
+    }
+
+
+BREAKER_OPEN = metrics.Gauge("circuit_breaker_open", "1 while a dependency's circuit breaker is not closed", ["name"])
+DDG_QUEUE_DEPTH = metrics.Gauge("duckduckgo_queue_depth", "DuckDuckGo searches waiting for a worker")
+LOG_DROPPED = metrics.Gauge("log_records_dropped", "Log records dropped because the log queue was full")
+
+
+def collect_dependency_state() -> None:
+    for name, state in breaker_states().items():
+        BREAKER_OPEN.set(name, value=int(state["state"] != "closed"))
+    DDG_QUEUE_DEPTH.set(value=ddg_pool.stats()["queue_depth"])
+    LOG_DROPPED.set(value=structured_logging.dropped_records())
+
+
+metrics.register_collector(collect_dependency_state)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: stage latencies, LLM calls and tokens, cache hit ratios, errors."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def debug_flags(
+    timing: Optional[str] = None,
+    profile: Optional[str] = None,
+    x_debug_timing: Optional[str] = Header(None),
+    x_debug_profile: Optional[str] = Header(None)
+) -> Dict[str, bool]:
+    """?timing=true / X-Debug-Timing: 1 adds a timing section; ?profile=true / X-Debug-Profile: 1 also profiles."""
+    return {
+        "enabled": request_timing.flag_enabled(timing, x_debug_timing),
+        "profile": request_timing.flag_enabled(profile, x_debug_profile)
+    }
+
+
+def validate_text(text: str, streaming: bool = False) -> None:
+    """Reject empty or over-long input with a 400. Only the streaming endpoints take full documents."""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    
+    if len(text) > MAX_DOCUMENT_CHARS:
+        raise HTTPException(status_code=400, detail=f"Text exceeds {MAX_DOCUMENT_CHARS} character limit")
+    
+    if not streaming and len(text) > MAX_SYNC_DOCUMENT_CHARS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Text exceeds {MAX_SYNC_DOCUMENT_CHARS} character limit; use the /stream endpoint for long documents"
+        )
+
+
+async def extract_text_claims(text: str, on_claim: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Extract claims in one call, or per window in long-document mode.
+    on_claim (optional) receives each claim as soon as it is parsed.
+    """
+    if len(text) <= SINGLE_PASS_CHARS:
+        if on_claim is None:
+            return await extract_claims(text)
+        return await extract_claims(text, on_claim=on_claim)
+    return await extract_in_windows(text, extract_claims, "claim", on_item=on_claim)
+
+
+def claim_key(claim_data: Dict) -> tuple:
+    return (claim_data["claim"], claim_data["start_char"], claim_data["end_char"])
+
+
+async def start_claim_pipeline(text: str) -> Tuple[List[Dict], List[asyncio.Task]]:
+    """
+    Extract claims and start searching/checking each one while the LLM is
+    still emitting the rest. Returns the claims and one task per claim.
+    """
+    pipeline = Pipeline(verify_claim, claim_key)
+    try:
+        claims = await extract_text_claims(text, on_claim=pipeline.submit)
+        return claims, pipeline.finalize(claims)
+    except BaseException:
+        pipeline.cancel()
+        raise
+
+
+async def extract_text_citations(text: str) -> List[Dict]:
+    """Extract citations in one call, or per window in long-document mode."""
+    if len(text) <= SINGLE_PASS_CHARS:
+        return await extract_citations(text)
+    return await extract_in_windows(text, extract_citations, "raw_citation")
+
+
+def ndjson(event: Dict[str, Any]) -> str:
+    """Serialize one streaming event as a line of NDJSON."""
+    return json.dumps(event) + "\n"
+
+
+def summarize(results: List[Any]) -> Dict[str, Any]:
+    """Count results per status for the final streaming event."""
+    counts = {"VERIFIED": 0, "HALLUCINATED": 0, "UNVERIFIABLE": 0}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return {"total": len(results), "counts": counts}
+
+
+async def verify_claim(claim_data: Dict) -> ClaimResult:
+    """Search the web for a single claim and fact-check it."""
+    started = time.perf_counter()
+    # Search the web for evidence (a wider set; check_fact keeps the best sentences)
+    search_results = await search_web(claim_data["claim"], max_results=SEARCH_CANDIDATES)
+    
+    # Check the claim against search results
+    verification = await check_fact(claim_data["claim"], search_results)
+    request_timing.record_item("claim", claim_data["claim"], time.perf_counter() - started)
+    
+    return ClaimResult(
+        claim=claim_data["claim"],
+        start_char=claim_data["start_char"],
+        end_char=claim_data["end_char"],
+        status=verification["status"],
+        reason=verification["reason"],
+        sources=search_results[:3],
+        votes=verification.get("votes")
+    )
+
+
+def claim_outcome(claim_data: Dict, outcome: Any) -> ClaimResult:
+    """Turn a verify_claim outcome (result or exception) into a ClaimResult."""
+    if not isinstance(outcome, BaseException):
+        return outcome
+    
+    log.error("Error processing claim: %s", outcome)
+    metrics.record_error("verify_claim", outcome)
+    return ClaimResult(
+        claim=claim_data["claim"],
+        start_char=claim_data["start_char"],
+        end_char=claim_data["end_char"],
+        status="UNVERIFIABLE",
+        reason=f"Error: {str(outcome)[:100]}",
+        sources=[]
+    )
+
+
+async def verify_single_citation(citation: Dict) -> CitationResult:
+    """Check a single citation against the offline index, or search the web and verify it."""
+    log.info("Processing citation: %s...", (citation.get("title") or "Unknown")[:50])
+    started = time.perf_counter()
+    
+    # A record in the offline index settles the citation without search or LLM calls.
+    # A fuzzy title hit may be a different paper ("... for video recognition"), so search instead
+    record = await citation_index.lookup(citation)
+    if record is not None and record.get("match") == MATCH_FUZZY:
+        log.info("Offline index has only a similar title: %s", record["title"][:50])
+        record = None
+    if record is not None:
+        search_results = [record_source(record)]
+        verification = verdict_from_record(citation, record)
+        log.info("Found in offline index")
+    else:
+        # Search for citation evidence
+        search_query = f"{citation.get('authors', '')} {citation.get('year', '')} {citation.get('title', '')}"
+        search_results = await search_for_citation(search_query)
+        log.info("Found %d search results", len(search_results))
+        
+        # Verify the citation
+        verification = await verify_citation(citation, search_results)
+    log.info("Citation status: %s", verification["status"])
+    request_timing.record_item(
+        "citation", citation.get("title") or citation.get("raw_citation", ""), time.perf_counter() - started
+    )
+    
+    return CitationResult(
+        raw_citation=citation.get("raw_citation", ""),
+        authors=citation.get("authors"),
+        year=citation.get("year"),
+        title=citation.get("title"),
+        venue=citation.get("venue"),
+        pages=citation.get("pages"),
+        status=verification["status"],
+        errors=verification.get("errors", []),
+        reason=verification["reason"],
+        sources=search_results,
+        votes=verification.get("votes")
+    )
+
+
+def citation_outcome(citation: Dict, outcome: Any) -> CitationResult:
+    """Turn a verify_single_citation outcome (result or exception) into a CitationResult."""
+    if not isinstance(outcome, BaseException):
+        return outcome
+    
+    log.error("Error processing citation: %s", outcome)
+    metrics.record_error("verify_citation", outcome)
+    return CitationResult(
+        raw_citation=citation.get("raw_citation", ""),
+        authors=citation.get("authors"),
+        year=citation.get("year"),
+        title=citation.get("title"),
+        venue=citation.get("venue"),
+        pages=citation.get("pages"),
+        status="UNVERIFIABLE",
+        errors=[],
+        reason=f"Error: {str(outcome)[:100]}",
+        sources=[]
+    )
+
+
+async def verify_text_claims(text: str) -> List[ClaimResult]:
+    # Step 1: Extract claims (max 5, or per window for long documents)
+    # Step 2 & 3 start for each claim as soon as it is extracted (bounded)
+    claims, tasks = await start_claim_pipeline(text)
+    
+    if not claims:
+        return []
+    
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    return [claim_outcome(c, o) for c, o in zip(claims, outcomes)]
 
 
 @app.post("/verify", response_model=VerifyResponse)
-async def verify_text(request: VerifyRequest):
+async def verify_text(request: VerifyRequest, debug: Dict[str, bool] = Depends(debug_flags)):
     """
     Main endpoint: Extract claims, search web, and verify each claim.
     Returns verification status with sources for each claim.
+    ?timing=true adds per-stage and per-claim timings; ?profile=true adds a profile.
     """
-    if not request.text.strip():
-        raise HTTPException(status_code=400, detail="Text cannot be empty")
-    
-    if len(request.text) > 200:
-        raise HTTPException(status_code=400, detail="Text exceeds 200 character limit")
+    validate_text(request.text)
     
     try:
-        # Step 1: Extract claims (max 5)
-        claims = await extract_claims(request.text)
-        
-        if not claims:
-            return VerifyResponse(results=[])
-        
-        # Step 2 & 3: For each claim, search and verify (with rate limit protection)
-        results = []
-        for claim_data in claims:
-            # Search the web for evidence
-            search_results = await search_web(claim_data["claim"])
-            
-            # Check the claim against search results
-            verification = await check_fact(claim_data["claim"], search_results)
+        with request_timing.tracing(**debug) as trace:
+            results = await verify_text_claims(request.text)
+        return VerifyResponse(results=results, timing=trace.report() if trace else None)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/verify/stream")
+async def verify_text_stream(request: VerifyRequest):
+    """
+    Streaming variant of /verify (NDJSON, one event per line):
+    - {"event": "claims", "claims": [...]} once claims are extracted
+    - {"event": "result", "index": i, "result": ClaimResult} as each claim finishes
+    - {"event": "summary", "total": n, "counts": {...}} at the end
+    - {"event": "error", "detail": "..."} if the pipeline fails
+    """
+    validate_text(request.text, streaming=True)
+    
+    async def events():
+        try:
+            claims, tasks = await start_claim_pipeline(request.text)
+            yield ndjson({"event": "claims", "claims": claims})
             
-            results.append(ClaimResult(
-                claim=claim_data["claim"],
-                start_char=claim_data["start_char"],
-                end_char=claim_data["end_char"],
-                status=verification["status"],
-                reason=verification["reason"],
-                sources=search_results
-            ))
+            results = []
+            async for index, outcome in iter_completed(tasks):
+                result = claim_outcome(claims[index], outcome)
+                results.append(result)
+                yield ndjson({"event": "result", "index": index, "result": result.model_dump()})
             
-            # Rate limit protection (0.5s between Groq calls)
-            await asyncio.sleep(0.5)
+            yield ndjson({"event": "summary", **summarize(results)})
         
-        return VerifyResponse(results=results)
+        except Exception as e:
+            yield ndjson({"event": "error", "detail": str(e)})
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
+
+
+async def verify_batch_item(pool: BatchPool, item: BatchItem) -> List[ClaimResult]:
+    """
+    Verify one batch text. Every stage call goes through the shared pool;
+    identical texts, claims and search queries are only processed once per batch.
+    """
+    claims = await pool.once(("extract", item.text), extract_text_claims, item.text)
+    
+    async def verify_one(claim_data: Dict) -> ClaimResult:
+        key = normalize_query(claim_data["claim"])
+        search_results = await pool.once(("search", key), search_web, claim_data["claim"], SEARCH_CANDIDATES)
+        verification = await pool.once(("check", key), check_fact, claim_data["claim"], search_results)
+        return ClaimResult(
+            claim=claim_data["claim"],
+            start_char=claim_data["start_char"],
+            end_char=claim_data["end_char"],
+            status=verification["status"],
+            reason=verification["reason"],
+            sources=search_results[:3],
+            votes=verification.get("votes")
+        )
+    
+    outcomes = await asyncio.gather(*(verify_one(c) for c in claims), return_exceptions=True)
+    return [claim_outcome(c, o) for c, o in zip(claims, outcomes)]
+
+
+@app.post("/verify/batch", response_model=BatchVerifyResponse)
+async def verify_batch(request: BatchVerifyRequest):
+    """
+    Bulk endpoint: verify many texts in one call, results keyed by item id.
+    All extraction, search and fact-check work shares one concurrency pool.
+    Items that fail validation or processing are reported under `errors`.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch cannot be empty")
+    
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {MAX_BATCH_ITEMS} items")
+    
+    ids = [item.id for item in request.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Batch item ids must be unique")
+    
+    results: Dict[str, List[ClaimResult]] = {}
+    errors: Dict[str, str] = {}
+    
+    valid_items = []
+    for item in request.items:
+        try:
+            validate_text(item.text)
+            valid_items.append(item)
+        except HTTPException as e:
+            errors[item.id] = e.detail
+    
+    pool = BatchPool()
+    try:
+        outcomes = await asyncio.gather(
+            *(verify_batch_item(pool, item) for item in valid_items),
+            return_exceptions=True
+        )
+    finally:
+        pool.cancel()
+    
+    for item, outcome in zip(valid_items, outcomes):
+        if isinstance(outcome, BaseException):
+            log.error("Error processing batch item %s: %s", item.id, outcome)
+            errors[item.id] = f"Error: {str(outcome)[:100]}"
+        else:
+            results[item.id] = outcome
+    
+    log.info("Batch of %d items done (%d duplicate calls skipped)", len(request.items), pool.deduplicated)
+    return BatchVerifyResponse(results=results, errors=errors)
+
+
+async def verify_text_citations(text: str) -> List[CitationResult]:
+    # Step 1: Extract citations from text
+    log.info("Extracting citations from text...")
+    citations = await extract_text_citations(text)
+    
+    if not citations:
+        return []
+    
+    log.info("Found %d citations", len(citations))
+    
+    # Step 2 & 3: Search and verify all citations concurrently (bounded)
+    outcomes = await run_bounded(verify_single_citation, citations)
+    
+    return [citation_outcome(c, o) for c, o in zip(citations, outcomes)]
 
 
 @app.post("/verify-citations", response_model=CitationVerifyResponse)
-async def verify_citations(request: VerifyRequest):
+async def verify_citations(request: VerifyRequest, debug: Dict[str, bool] = Depends(debug_flags)):
     """
     Citation verification endpoint: Extract citations and verify each one.
     Checks author, year, title, venue, and page numbers for accuracy.
+    ?timing=true adds per-stage and per-citation timings; ?profile=true adds a profile.
     """
-    if not request.text.strip():
-        raise HTTPException(status_code=400, detail="Text cannot be empty")
-    
-    if len(request.text) > 200:
-        raise HTTPException(status_code=400, detail="Text exceeds 200 character limit")
+    validate_text(request.text)
     
     try:
-        # Step 1: Extract citations from text
-        print(f"Extracting citations from text...")
-        citations = await extract_citations(request.text)
-        
-        if not citations:
-            return CitationVerifyResponse(results=[])
-        
-        print(f"Found {len(citations)} citations")
-        
-        # Step 2 & 3: For each citation, search and verify
-        results = []
-        for i, citation in enumerate(citations):
-            print(f"Processing citation {i+1}/{len(citations)}: {citation.get('title', 'Unknown')[:50]}...")
-            
-            try:
-                # Search for citation evidence
-                search_query = f"{citation.get('authors', '')} {citation.get('year', '')} {citation.get('title', '')}"
-                search_results = await search_for_citation(search_query)
-                print(f"  Found {len(search_results)} search results")
-                
-                # Verify the citation
-                verification = await verify_citation(citation, search_results)
-                print(f"  Status: {verification['status']}")
-                
-                results.append(CitationResult(
-                    raw_citation=citation.get("raw_citation", ""),
-                    authors=citation.get("authors"),
-                    year=citation.get("year"),
-                    title=citation.get("title"),
-                    venue=citation.get("venue"),
-                    pages=citation.get("pages"),
-                    status=verification["status"],
-                    errors=verification.get("errors", []),
-                    reason=verification["reason"],
-                    sources=search_results
-                ))
-                
-                # Rate limit protection
-                await asyncio.sleep(0.3)
-                
-            except Exception as e:
-                print(f"  Error processing citation: {e}")
-                results.append(CitationResult(
-                    raw_citation=citation.get("raw_citation", ""),
-                    authors=citation.get("authors"),
-                    year=citation.get("year"),
-                    title=citation.get("title"),
-                    venue=citation.get("venue"),
-                    pages=citation.get("pages"),
-                    status="UNVERIFIABLE",
-                    errors=[],
-                    reason=f"Error: {str(e)[:100]}",
-                    sources=[]
-                ))
-        
-        return CitationVerifyResponse(results=results)
+        with request_timing.tracing(**debug) as trace:
+            results = await verify_text_citations(request.text)
+        return CitationVerifyResponse(results=results, timing=trace.report() if trace else None)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/verify-citations/stream")
+async def verify_citations_stream(request: VerifyRequest):
+    """
+    Streaming variant of /verify-citations. Same events as /verify/stream,
+    with "citations" instead of "claims" and CitationResult payloads.
+    """
+    validate_text(request.text, streaming=True)
+    
+    async def events():
+        try:
+            citations = await extract_text_citations(request.text)
+            yield ndjson({"event": "citations", "citations": citations})
+            
+            results = []
+            async for index, outcome in iter_bounded(verify_single_citation, citations):
+                result = citation_outcome(citations[index], outcome)
+                results.append(result)
+                yield ndjson({"event": "result", "index": index, "result": result.model_dump()})
+            
+            yield ndjson({"event": "summary", **summarize(results)})
+        
+        except Exception as e:
+            yield ndjson({"event": "error", "detail": str(e)})
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
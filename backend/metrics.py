@@ -0,0 +1,251 @@
+"""
+Metrics Module - In-process Prometheus metrics (text exposition format)
+INPUT: Counter increments, gauge updates and latency observations from the pipeline
+OUTPUT: Prometheus text format for GET /metrics
+CONSTRAINT: A few dict / bisect operations per event (about a microsecond); no
+            background work, values are only formatted when /metrics is scraped
+Metrics are updated from the event loop. Label values must be low-cardinality
+(stage, module, backend, route names) - never claims, queries or URLs.
+"""
+
+import time
+import functools
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+from request_timing import record_stage
+
+PREFIX = "unhallucinate_"
+
+# Latency buckets in seconds (searches and LLM calls take 0.1-10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        _registry.append(self)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(_Metric):
+    """Monotonic counter. Label values are passed positionally: inc("fact_checker")."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        return list(self._values.items())
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds; bucket counts are made cumulative when rendered."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            # Per-bucket counts (last one is +Inf), sum
+            series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+_registry: List[_Metric] = []
+_collectors: List[Callable[[], None]] = []
+
+
+def register_collector(collect: Callable[[], None]) -> None:
+    """Run `collect` before every scrape, e.g. to copy pool or breaker state into gauges."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Pipeline
+STAGE_SECONDS = Histogram("stage_seconds", "Latency of pipeline stages", ["stage"])
+SEARCH_BACKEND_SECONDS = Histogram("search_backend_seconds", "Latency of search backend calls", ["backend"])
+SEARCH_BACKEND_RESULTS = Counter("search_backend_results_total", "Results returned by search backends", ["backend"])
+ERRORS = Counter("errors_total", "Errors by stage and exception type", ["stage", "type"])
+
+# LLM
+LLM_CALLS = Counter("llm_calls_total", "Groq calls by calling module and outcome", ["module", "outcome"])
+LLM_TOKENS = Counter("llm_tokens_total", "Groq tokens used by calling module", ["module", "kind"])
+LLM_SECONDS = Histogram("llm_call_seconds", "Latency of Groq calls by calling module", ["module"])
+
+# Caches
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"])
+CACHE_HIT_RATIO = Gauge("cache_hit_ratio", "Share of cache lookups that hit since startup", ["cache"])
+
+# HTTP
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled", ["route"])
+HTTP_REQUESTS = Counter("http_requests_total", "Completed requests by route and status code", ["route", "status"])
+HTTP_SECONDS = Histogram("http_request_seconds", "Request latency including streamed bodies", ["route"])
+
+
+def _collect_cache_ratios() -> None:
+    lookups: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_LOOKUPS.items():
+        lookups.setdefault(cache, [0, 0])[result == "hit"] += value
+    for cache, (misses, hits) in lookups.items():
+        CACHE_HIT_RATIO.set(cache, value=round(hits / (hits + misses), 4) if hits + misses else 0.0)
+
+
+register_collector(_collect_cache_ratios)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def record_error(stage: str, error: BaseException) -> None:
+    ERRORS.inc(stage, type(error).__name__)
+
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator for async functions: observe their latency under STAGE_SECONDS
+    (and in the request's timing breakdown, when enabled) and count exceptions
+    (other than cancellation) under ERRORS.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                record_error(stage, e)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                STAGE_SECONDS.observe(elapsed, stage)
+                record_stage(stage, elapsed)
+        return wrapper
+    return decorator
+
+
+def _route(scope: Dict) -> str:
+    """Route template for a request ("/verify"), or "other" so unknown paths can't add series."""
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "other"
+
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests, status codes and latency per route."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = _route(scope)
+        status = "500"
+
+        async def send_wrapper(message: Dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            record_error("http", e)
+            raise
+        finally:
+            HTTP_IN_FLIGHT.dec(route)
+            HTTP_REQUESTS.inc(route, status)
+            HTTP_SECONDS.observe(time.perf_counter() - started, route)
@@ -0,0 +1,192 @@
+"""
+Request Timing Module - Opt-in per-request stage timing and sampling profiler
+INPUT: Stage latencies, per-item latencies and LLM usage recorded while a request runs
+OUTPUT: Timing breakdown for the response (plus a profile when asked for)
+CONSTRAINT: Off by default; with tracing off every hook is one ContextVar lookup.
+            The profiler samples the event loop thread, so it also sees any other
+            requests running at the same time
+Enable per request with ?timing=true (or X-Debug-Timing: 1) and
+?profile=true (or X-Debug-Profile: 1).
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Profiler sampling interval
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# Directory for full profiles (folded stacks, for flamegraph.pl / speedscope);
+# empty returns the most common stacks in the response instead
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+# Entries returned in the response
+PROFILE_TOP_FUNCTIONS = 25
+PROFILE_TOP_STACKS = 50
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class RequestTrace:
+    """Timings collected for one request (shared by the tasks it starts)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.items: List[Dict[str, Any]] = []
+        self.llm_calls = 0
+        self.llm_tokens = {"prompt": 0, "completion": 0}
+        self.profile: Optional[Dict[str, Any]] = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total_ms": _ms(time.perf_counter() - self.started),
+            "stages": {
+                stage: {"calls": len(times), "total_ms": _ms(sum(times)), "max_ms": _ms(max(times))}
+                for stage, times in self.stages.items()
+            },
+            "items": self.items,
+            "llm_calls": self.llm_calls,
+            "llm_tokens": dict(self.llm_tokens),
+            **({"profile": self.profile} if self.profile is not None else {})
+        }
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def flag_enabled(query_value: Optional[str], header_value: Optional[str]) -> bool:
+    return any(v is not None and v.strip().lower() in TRUE_VALUES for v in (query_value, header_value))
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.stages.setdefault(stage, []).append(seconds)
+
+
+def record_item(kind: str, label: str, seconds: float) -> None:
+    """Wall time for one claim or citation."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.items.append({"kind": kind, "item": label[:100], "ms": _ms(seconds)})
+
+
+def record_llm(prompt_tokens: int = 0, completion_tokens: int = 0, call: bool = True) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.llm_calls += call
+        trace.llm_tokens["prompt"] += prompt_tokens
+        trace.llm_tokens["completion"] += completion_tokens
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread (the event loop's) from a background thread
+    every `interval` seconds using sys._current_frames().
+    """
+
+    _lock = threading.Lock()  # one profile at a time per process
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Start sampling; False if another request is already being profiled."""
+        if not SamplingProfiler._lock.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        SamplingProfiler._lock.release()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                # Folded format: root first, frames joined by ';'
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def report(self) -> Dict[str, Any]:
+        inclusive: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+
+        report: Dict[str, Any] = {
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 2),
+            "top_functions": [
+                {"function": name, "samples": count, "self_samples": own[name]}
+                for name, count in inclusive.most_common(PROFILE_TOP_FUNCTIONS)
+            ]
+        }
+        folded = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        if PROFILE_DIR:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{id(self):x}.folded")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(folded) + "\n")
+            report["path"] = path
+        else:
+            report["stacks"] = folded[:PROFILE_TOP_STACKS]
+        return report
+
+
+@contextmanager
+def tracing(enabled: bool, profile: bool = False) -> Iterator[Optional[RequestTrace]]:
+    """
+    Collect timings for the code run inside the block (and the tasks it starts).
+    Yields None when disabled, so callers can skip attaching a report.
+    """
+    if not enabled and not profile:
+        yield None
+        return
+
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    profiler = SamplingProfiler() if profile else None
+    profiling = profiler is not None and profiler.start()
+    try:
+        yield trace
+    finally:
+        current_trace.reset(token)
+        if profiling:
+            profiler.stop()
+            trace.profile = profiler.report()
+        elif profiler is not None:
+            trace.profile = {"error": "Another request is being profiled"}
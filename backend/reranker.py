@@ -0,0 +1,132 @@
+"""
+Reranker Module - Local BM25 evidence selection for fact-check prompts
+INPUT: Query (claim or citation fields) + search results (title, url, snippet)
+OUTPUT: Search results trimmed to the best-matching snippet sentences
+CONSTRAINT: At most EVIDENCE_TOP_K sentences and EVIDENCE_TOKEN_BUDGET tokens of
+            evidence; pure Python, no model calls
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from document_chunker import split_sentences
+from llm_client import CHARS_PER_TOKEN
+
+# Results fetched per claim before re-ranking (more candidates, same prompt size)
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "8"))
+
+# Evidence kept for the prompt
+EVIDENCE_TOP_K = int(os.getenv("EVIDENCE_TOP_K", "6"))
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "300"))
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "in", "on", "at", "to", "for", "from", "by",
+    "with", "as", "is", "are", "was", "were", "be", "been", "being", "it", "its", "this",
+    "that", "these", "those", "which", "who", "whom", "what", "has", "have", "had", "do",
+    "does", "did", "not", "no", "so", "than", "then", "there", "their", "they", "he", "she",
+    "his", "her", "we", "you", "i", "into", "about", "also", "can", "will", "would"
+}
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so 'discovered' matches 'discovery' / 'discovers'."""
+    for suffix in ("ing", "ed", "es", "y", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+
+
+class BM25:
+    """Okapi BM25 over a small in-memory corpus of tokenized documents."""
+
+    def __init__(self, documents: List[List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.documents = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.average_length = sum(self.lengths) / len(documents) if documents else 0.0
+        frequencies = Counter(term for doc in self.documents for term in doc)
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in frequencies.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        results = []
+        for doc, length in zip(self.documents, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            score = 0.0
+            for term in set(query):
+                tf = doc.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def _sentences(search_results: List[Dict]) -> List[Tuple[int, int, str]]:
+    """(result index, sentence index, sentence) for every snippet sentence."""
+    sentences = []
+    for i, result in enumerate(search_results):
+        snippet = str(result.get("snippet") or "")
+        for j, (start, end) in enumerate(split_sentences(snippet)):
+            sentence = snippet[start:end].strip()
+            if sentence:
+                sentences.append((i, j, sentence))
+    return sentences
+
+
+def select_evidence(
+    query: str,
+    search_results: List[Dict],
+    top_k: int = EVIDENCE_TOP_K,
+    token_budget: int = EVIDENCE_TOKEN_BUDGET
+) -> List[Dict]:
+    """
+    Keep the snippet sentences that best match the query.
+
+    Args:
+        query: Claim text, or citation fields joined together
+        search_results: Candidate results with title, url, snippet
+        top_k: Max sentences kept
+        token_budget: Max estimated tokens of kept titles + sentences
+
+    Returns:
+        Results that contributed a sentence, in their original order, with the
+        snippet replaced by the kept sentences (in snippet order)
+    """
+    sentences = _sentences(search_results)
+    if not sentences:
+        return search_results
+
+    # The result title is part of each sentence's document: it often names the subject
+    documents = [tokenize(f"{search_results[i].get('title', '')} {sentence}") for i, _, sentence in sentences]
+    scores = BM25(documents).scores(tokenize(query))
+    ranked = sorted(range(len(sentences)), key=lambda n: (-scores[n], n))
+
+    budget = token_budget * CHARS_PER_TOKEN
+    kept: Dict[int, List[Tuple[int, str]]] = {}
+    for n in ranked[:max(1, top_k)]:
+        i, j, sentence = sentences[n]
+        cost = len(sentence) + (0 if i in kept else len(str(search_results[i].get("title") or "")))
+        if cost > budget and kept:
+            continue
+        budget -= cost
+        kept.setdefault(i, []).append((j, sentence))
+
+    return [
+        {**search_results[i], "snippet": " ".join(s for _, s in sorted(kept[i]))}
+        for i in sorted(kept)
+    ]
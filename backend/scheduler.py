@@ -0,0 +1,232 @@
+"""
+Scheduler Module - Bounded concurrency for the verification pipeline
+INPUT: List of items (or items discovered over time) + async worker
+OUTPUT: Results in input order, or (index, result) pairs as they finish
+CONSTRAINT: At most `limit` workers run at the same time; exceptions are returned, not raised
+"""
+
+import os
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Max claims searched + fact-checked at the same time for a single request
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "4"))
+
+# Max pipeline calls (extract / search / check) in flight for a whole batch
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+async def run_bounded(
+    worker: Callable[[Any], Awaitable[Any]],
+    items: Sequence[Any],
+    limit: Optional[int] = None
+) -> List[Any]:
+    """
+    Run `worker` over every item concurrently with a concurrency cap.
+
+    Args:
+        worker: Async function called once per item
+        items: Items to process
+        limit: Max workers in flight (defaults to VERIFY_CONCURRENCY)
+
+    Returns:
+        List with one entry per item, in input order. A failed item
+        holds the exception it raised so the others are not lost.
+    """
+    if not items:
+        return []
+
+    semaphore = asyncio.Semaphore(max(1, limit or VERIFY_CONCURRENCY))
+
+    async def run_one(item: Any) -> Any:
+        async with semaphore:
+            return await worker(item)
+
+    return await asyncio.gather(
+        *(run_one(item) for item in items),
+        return_exceptions=True
+    )
+
+
+async def iter_bounded(
+    worker: Callable[[Any], Awaitable[Any]],
+    items: Sequence[Any],
+    limit: Optional[int] = None
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Like run_bounded, but yield (index, result) pairs as soon as each item finishes.
+    Unfinished work is cancelled if the consumer stops iterating early.
+
+    Args:
+        worker: Async function called once per item
+        items: Items to process
+        limit: Max workers in flight (defaults to VERIFY_CONCURRENCY)
+
+    Yields:
+        (index of the item, result or the exception it raised)
+    """
+    semaphore = asyncio.Semaphore(max(1, limit or VERIFY_CONCURRENCY))
+
+    async def run_one(index: int, item: Any) -> Tuple[int, Any]:
+        async with semaphore:
+            try:
+                return index, await worker(item)
+            except Exception as e:
+                return index, e
+
+    tasks = [asyncio.ensure_future(run_one(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class BatchPool:
+    """
+    One concurrency pool shared by every stage of a batch job, plus
+    per-key deduplication so identical work is only done once.
+    Stage calls must not call back into the pool, or slots could deadlock.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self._semaphore = asyncio.Semaphore(max(1, limit or BATCH_CONCURRENCY))
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.deduplicated = 0
+
+    async def run(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run one stage call inside the pool."""
+        async with self._semaphore:
+            return await fn(*args)
+
+    def once(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any) -> "asyncio.Task":
+        """Run fn(*args) in the pool the first time `key` is seen; later callers share the task."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.run(fn, *args))
+            self._tasks[key] = task
+        else:
+            self.deduplicated += 1
+        return task
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
+class Pipeline:
+    """
+    Start bounded work for items as soon as they are discovered (e.g. while
+    claims are still being extracted), then line tasks up with the final list.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[Any], Awaitable[Any]],
+        key: Callable[[Any], Hashable],
+        limit: Optional[int] = None
+    ):
+        self._worker = worker
+        self._key = key
+        self._semaphore = asyncio.Semaphore(max(1, limit or VERIFY_CONCURRENCY))
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def _run(self, item: Any) -> Any:
+        async with self._semaphore:
+            return await self._worker(item)
+
+    def submit(self, item: Any) -> None:
+        """Start work for an item unless an equal item was already started."""
+        key = self._key(item)
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.ensure_future(self._run(item))
+
+    def finalize(self, items: Sequence[Any]) -> List["asyncio.Task"]:
+        """
+        Return one task per final item, in order. Items never submitted are
+        started now; started items that did not make the final list are cancelled.
+        """
+        for item in items:
+            self.submit(item)
+        tasks = [self._tasks[self._key(item)] for item in items]
+        keep = set(map(id, tasks))
+        for task in self._tasks.values():
+            if id(task) not in keep:
+                task.cancel()
+        return tasks
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
+async def iter_completed(tasks: Sequence["asyncio.Task"]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (index, result or exception) for already-started tasks as they finish.
+    Unfinished tasks are cancelled if the consumer stops iterating early.
+    """
+    async def indexed(index: int, task: "asyncio.Task") -> Tuple[int, Any]:
+        try:
+            return index, await task
+        except Exception as e:
+            return index, e
+
+    wrapped = [asyncio.ensure_future(indexed(i, t)) for i, t in enumerate(tasks)]
+    try:
+        for next_done in asyncio.as_completed(wrapped):
+            yield await next_done
+    finally:
+        for task in list(tasks) + wrapped:
+            task.cancel()
+
+
+async def hedge(
+    calls: Sequence[Callable[[], Awaitable[Any]]],
+    delay: float,
+    accept: Callable[[Any], bool] = bool
+) -> Any:
+    """
+    Hedged requests: start calls[0], and start the next call as soon as the
+    previous one fails or after `delay` seconds without an accepted answer.
+
+    Args:
+        calls: Alternative ways to get the same answer, in order of preference
+        delay: Seconds to wait for an answer before starting the next call
+        accept: Whether a result is good enough (defaults to truthiness)
+
+    Returns:
+        The first accepted result; calls still running are cancelled. If none
+        is accepted, the last result is returned (or its exception re-raised).
+    """
+    pending = set()
+    started = 0
+    outcome: Any = None
+
+    def start_next() -> None:
+        nonlocal started
+        pending.add(asyncio.ensure_future(calls[started]()))
+        started += 1
+
+    start_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=delay if started < len(calls) else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                pending.discard(task)
+                outcome = task.exception() or task.result()
+                if task.exception() is None and accept(outcome):
+                    return outcome
+            # Slow answer or a failed call: bring in the next alternative
+            if started < len(calls):
+                start_next()
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,300 @@
+"""
+Search Backends Module - Registry and routing policies for web search backends
+INPUT: Search query + max_results + timeout + request type (claim or citation)
+OUTPUT: List[Dict] with title, url, snippet, deduplicated by normalized URL
+CONSTRAINT: Each backend has its own timeout, weight and call quota; the routing
+            policy per request type is sequential fallback, parallel fan-out or hedging
+Backends are registered by name and enabled (in preference order) with SEARCH_BACKENDS.
+"""
+
+import os
+import logging
+import time
+import random
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from scheduler import hedge
+from metrics import SEARCH_BACKEND_SECONDS, SEARCH_BACKEND_RESULTS, record_error
+from request_timing import record_stage
+
+log = logging.getLogger(__name__)
+
+# Enabled backends, in order of preference ("fake" serves canned results for offline load tests)
+SEARCH_BACKENDS = [n.strip() for n in os.getenv("SEARCH_BACKENDS", "serpapi,duckduckgo").split(",") if n.strip()]
+
+# Request types
+CLAIM = "claim"
+CITATION = "citation"
+
+# Routing policies
+FALLBACK = "fallback"  # one backend at a time, next one only on an empty answer
+FANOUT = "fanout"      # all backends at once, results fused by weight
+HEDGE = "hedge"        # next backend after the hedge delay or an empty answer, first answer wins
+POLICIES = (FALLBACK, FANOUT, HEDGE)
+
+SEARCH_POLICIES = {
+    CLAIM: os.getenv("SEARCH_POLICY_CLAIM", HEDGE),
+    CITATION: os.getenv("SEARCH_POLICY_CITATION", HEDGE)
+}
+
+# Quota periods are fixed windows, counted in-process
+QUOTA_PERIOD_SECONDS = 30 * 24 * 3600
+
+# Backends enforce their own timeout; the registry's limit only catches ones that don't
+TIMEOUT_GRACE_SECONDS = 0.5
+
+# Reciprocal rank fusion constant for fan-out merging
+FUSION_K = 60
+
+# Fake backend behaviour
+FAKE_SEARCH_LATENCY_MS = float(os.getenv("FAKE_SEARCH_LATENCY_MS", "50"))
+FAKE_SEARCH_ERROR_RATE = float(os.getenv("FAKE_SEARCH_ERROR_RATE", "0"))
+
+# Query parameters that never change the page a URL points to (exact keys, plus
+# any key starting with a tracking prefix)
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for deduplication: scheme, 'www.', trailing slash,
+    fragment and tracking parameters are ignored.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+def result_key(result: Dict) -> str:
+    return normalize_url(result["url"]) or result["title"]
+
+
+def fuse_results(weighted_lists: Sequence[Tuple[float, List[Dict]]], max_results: int) -> List[Dict]:
+    """
+    Weighted reciprocal rank fusion: a result scores weight / (FUSION_K + rank)
+    for every backend that returned it, so results several backends agree on rise.
+    Ties keep first-seen order; the first copy of a duplicate URL is kept.
+    """
+    scores: Dict[str, float] = {}
+    first: Dict[str, Dict] = {}
+    for weight, results in weighted_lists:
+        for rank, r in enumerate(results):
+            key = result_key(r)
+            first.setdefault(key, r)
+            scores[key] = scores.get(key, 0.0) + weight / (FUSION_K + rank)
+    ranked = sorted(first, key=lambda key: -scores[key])
+    return [first[key] for key in ranked[:max_results]]
+
+
+class Quota:
+    """At most `limit` calls per fixed window of `period` seconds (0 = unlimited)."""
+
+    def __init__(self, limit: int = 0, period: float = QUOTA_PERIOD_SECONDS):
+        self.limit = limit
+        self.period = period
+        self.used = 0
+        self._window_start = time.monotonic()
+
+    def _roll(self) -> None:
+        now = time.monotonic()
+        if now - self._window_start >= self.period:
+            self._window_start = now
+            self.used = 0
+
+    def remaining(self) -> Optional[int]:
+        """Calls left in the current window, or None when unlimited."""
+        if not self.limit:
+            return None
+        self._roll()
+        return max(0, self.limit - self.used)
+
+    def take(self) -> bool:
+        """Use one call; False when the quota is exhausted."""
+        remaining = self.remaining()
+        if remaining == 0:
+            return False
+        self.used += 1
+        return True
+
+
+class SearchBackend(ABC):
+    """
+    Common interface for search backends. Subclasses implement fetch();
+    callers use search(), which applies the quota and timeout and never raises.
+    """
+
+    def __init__(self, name: str, timeout: float = 5, weight: float = 1.0, quota: int = 0,
+                 quota_period: float = QUOTA_PERIOD_SECONDS):
+        self.name = name
+        self.timeout = timeout
+        self.weight = weight
+        self.quota = Quota(quota, quota_period)
+        self.calls = 0
+        self.errors = 0
+
+    def available(self) -> bool:
+        """Whether the backend is configured (e.g. has an API key)."""
+        return True
+
+    def ready(self) -> bool:
+        return self.available() and self.quota.remaining() != 0
+
+    @abstractmethod
+    async def fetch(self, query: str, max_results: int, timeout: float) -> List[Dict]:
+        """Raw results (title, url, snippet); may raise, search() handles errors."""
+
+    async def search(self, query: str, max_results: int, timeout: float) -> List[Dict]:
+        if not self.quota.take():
+            return []
+        self.calls += 1
+        timeout = min(timeout, self.timeout)
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(
+                self.fetch(query, max_results, timeout), timeout=timeout + TIMEOUT_GRACE_SECONDS
+            )
+            SEARCH_BACKEND_RESULTS.inc(self.name, amount=len(results))
+            return results
+        except asyncio.TimeoutError as e:
+            log.warning("%s timed out after %ss", self.name, timeout)
+            record_error(f"search_{self.name}", e)
+        except Exception as e:
+            log.warning("%s search error: %s: %s", self.name, type(e).__name__, e)
+            record_error(f"search_{self.name}", e)
+        finally:
+            elapsed = time.perf_counter() - started
+            SEARCH_BACKEND_SECONDS.observe(elapsed, self.name)
+            record_stage(f"search_{self.name}", elapsed)
+        self.errors += 1
+        return []
+
+    def stats(self) -> Dict:
+        return {
+            "weight": self.weight,
+            "timeout": self.timeout,
+            "calls": self.calls,
+            "errors": self.errors,
+            "quota_remaining": self.quota.remaining()
+        }
+
+
+class FunctionBackend(SearchBackend):
+    """Backend wrapping an async search function (query, max_results, timeout)."""
+
+    def __init__(self, name: str, fetch: Callable[[str, int, float], Awaitable[List[Dict]]],
+                 available: Callable[[], bool] = lambda: True, **settings):
+        super().__init__(name, **settings)
+        self._fetch = fetch
+        self._available = available
+
+    def available(self) -> bool:
+        return self._available()
+
+    async def fetch(self, query: str, max_results: int, timeout: float) -> List[Dict]:
+        return await self._fetch(query, max_results, timeout)
+
+
+class FakeBackend(SearchBackend):
+    """
+    Offline backend for load tests: deterministic results derived from the query,
+    after a random latency (exponential around latency_ms) and with injected errors.
+    """
+
+    def __init__(self, name: str = "fake", latency_ms: float = FAKE_SEARCH_LATENCY_MS,
+                 error_rate: float = FAKE_SEARCH_ERROR_RATE, seed: Optional[int] = None, **settings):
+        super().__init__(name, **settings)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    async def fetch(self, query: str, max_results: int, timeout: float) -> List[Dict]:
+        if self.latency_ms > 0:
+            await asyncio.sleep(self._random.expovariate(1000 / self.latency_ms))
+        if self._random.random() < self.error_rate:
+            raise ConnectionError("injected fake search failure")
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+        return [
+            {
+                "title": f"{query[:60]} ({self.name} result {i + 1})",
+                "url": f"https://{self.name}.example/{digest}/{i + 1}",
+                "snippet": f"{query}. Reference page {i + 1} discussing this topic."
+            }
+            for i in range(max_results)
+        ]
+
+
+_backends: Dict[str, SearchBackend] = {}
+
+
+def register_backend(backend: SearchBackend) -> SearchBackend:
+    """Add (or replace) a backend under its name. Returns it for module-level assignment."""
+    _backends[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str) -> Optional[SearchBackend]:
+    return _backends.get(name)
+
+
+def active_backends(names: Optional[Sequence[str]] = None) -> List[SearchBackend]:
+    """Enabled, configured backends with quota left, in preference order."""
+    backends = (_backends.get(name) for name in (SEARCH_BACKENDS if names is None else names))
+    return [b for b in backends if b is not None and b.ready()]
+
+
+def backend_stats() -> Dict[str, Dict]:
+    return {name: backend.stats() for name, backend in _backends.items()}
+
+
+async def route(
+    policy: str,
+    backends: Sequence[SearchBackend],
+    query: str,
+    max_results: int,
+    timeout: float,
+    hedge_delay: float
+) -> List[Dict]:
+    """
+    Run a search across backends with the given policy.
+
+    Args:
+        policy: FALLBACK, FANOUT or HEDGE (unknown values fall back to HEDGE)
+        backends: Backends in preference order
+        query: The search query
+        max_results: Number of results to return
+        timeout: Overall timeout in seconds (each backend may use less)
+        hedge_delay: Seconds before HEDGE starts the next backend
+
+    Returns:
+        List of dicts with title, url, snippet ([] when every backend failed)
+    """
+    if not backends:
+        return []
+    calls = [lambda b=b: b.search(query, max_results, timeout) for b in backends]
+
+    if policy == FANOUT:
+        result_lists = await asyncio.gather(*(call() for call in calls))
+        return fuse_results([(b.weight, r) for b, r in zip(backends, result_lists)], max_results)
+
+    if policy == FALLBACK:
+        for call in calls:
+            results = await call()
+            if results:
+                return results
+        return []
+
+    return await hedge(calls, hedge_delay)
+
+
+register_backend(FakeBackend())
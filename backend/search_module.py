@@ -3,33 +3,93 @@ Search Module - Web search for fact verification
 INPUT: String (a claim)
 OUTPUT: List[Dict] with title, url, snippet
 CONSTRAINT: Top 3 results, <5 second timeout
-Uses SerpAPI (Google) with DuckDuckGo as fallback
+Tries the offline knowledge base first (when configured), then the
+registered search backends (SerpAPI, DuckDuckGo) with the routing policy
+for the request type (see search_backends)
 """
 
 import os
+import logging
+import time
 import asyncio
 import aiohttp
 from typing import List, Dict
 from dotenv import load_dotenv
-from duckduckgo_search import DDGS
-import ssl
-import certifi
+from http_pool import get_session
+from ddg_pool import ddg_pool
+from knowledge_base import knowledge_base
+from cache import TTLCache, SingleFlight
+from circuit_breaker import get_breaker
+import cassettes
+from metrics import ERRORS, timed, record_cache, record_error
+from search_backends import (
+    CLAIM, CITATION, SEARCH_POLICIES, FunctionBackend, register_backend, active_backends, route, result_key
+)
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 # SerpAPI for Google Search (free tier: 100 queries/month)
 SERP_API_KEY = os.getenv("SERP_API_KEY", "")
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
+
+# Load tests only: query this HTTP stand-in (benchmarks/fake_services.py) instead of DuckDuckGo
+DDG_STANDIN_URL = os.getenv("DDG_STANDIN_URL", "")
+
+# In-process result cache (entries, seconds)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+# Start the next backend if the current one has not answered within this many milliseconds
+SEARCH_HEDGE_DELAY_MS = float(os.getenv("SEARCH_HEDGE_DELAY_MS", "1500"))
+
+# Per-backend timeout (seconds), fan-out weight and quota (SerpAPI calls per 30 days, 0 = unlimited)
+SERPAPI_TIMEOUT = float(os.getenv("SERPAPI_TIMEOUT", "5"))
+SERPAPI_WEIGHT = float(os.getenv("SERPAPI_WEIGHT", "1.0"))
+SERPAPI_QUOTA = int(os.getenv("SERPAPI_QUOTA", "0"))
+DUCKDUCKGO_TIMEOUT = float(os.getenv("DUCKDUCKGO_TIMEOUT", "5"))
+DUCKDUCKGO_WEIGHT = float(os.getenv("DUCKDUCKGO_WEIGHT", "0.7"))
 
+search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
 
-async def search_web(query: str, max_results: int = 3, timeout: int = 5) -> List[Dict]:
+# Backends that keep failing are skipped instead of costing a timeout per query
+serpapi_breaker = get_breaker("serpapi")
+duckduckgo_breaker = get_breaker("duckduckgo")
+_inflight_searches = SingleFlight()
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache keys (case and whitespace insensitive)."""
+    return " ".join(query.lower().split())
+
+
+def merge_results(result_lists: List[List[Dict]], max_results: int) -> List[Dict]:
+    """Concatenate result lists in order, dropping duplicate URLs."""
+    seen_urls = set()
+    merged = []
+    for results in result_lists:
+        for r in results:
+            key = result_key(r)
+            if key not in seen_urls:
+                seen_urls.add(key)
+                merged.append(r)
+    return merged[:max_results]
+
+
+@timed("search_web")
+async def search_web(query: str, max_results: int = 3, timeout: int = 5, kind: str = CLAIM) -> List[Dict]:
     """
     Search the web for information about a claim.
-    Uses SerpAPI (Google) if available, falls back to DuckDuckGo.
+    Claims use the offline knowledge base when it has a relevant match; otherwise
+    the active backends are queried with the routing policy for `kind`.
+    Results are cached per normalized query, max_results and kind.
     
     Args:
         query: The search query (claim to verify)
         max_results: Number of results to return (default 3)
         timeout: Timeout in seconds
+        kind: Request type, CLAIM or CITATION
         
     Returns:
         List of dicts with title, url, snippet
@@ -37,20 +97,47 @@ async def search_web(query: str, max_results: int = 3, timeout: int = 5) -> List
     if not query.strip():
         return []
     
-    # Try SerpAPI (Google) first for better English results
-    if SERP_API_KEY:
-        results = await search_serpapi(query, max_results, timeout)
-        if results:
-            return results
+    key = (normalize_query(query), max_results, kind)
+    results = search_cache.get(key)
+    record_cache("search", results is not None)
+    if results is None:
+        # Identical in-flight queries share one backend call
+        results = await _inflight_searches.do(
+            key, lambda: _search_and_cache(key, query, max_results, timeout, kind)
+        )
     
-    # Fallback to DuckDuckGo with English region
-    return await search_duckduckgo(query, max_results, timeout)
+    # Copies so callers can't mutate cached entries
+    return [dict(r) for r in results]
+
+
+async def _search_and_cache(key: tuple, query: str, max_results: int, timeout: int, kind: str) -> List[Dict]:
+    # Encyclopedic claims are often answered locally; weak matches come back empty.
+    # Citations need the publication itself, which the knowledge base doesn't hold.
+    results = await knowledge_base.search(query, max_results) if kind == CLAIM else []
+    if not results:
+        results = await _search_backends(query, max_results, timeout, kind)
+    # Empty results usually mean a backend failure, so don't cache them
+    if results:
+        search_cache.set(key, results)
+    return results
 
 
+async def _search_backends(query: str, max_results: int, timeout: int, kind: str = CLAIM) -> List[Dict]:
+    # By default SerpAPI (Google, better English results) is hedged with DuckDuckGo:
+    # DuckDuckGo starts as soon as SerpAPI fails or is slower than the hedge delay
+    return await route(
+        SEARCH_POLICIES[kind], active_backends(), query, max_results, timeout, SEARCH_HEDGE_DELAY_MS / 1000
+    )
+
+
+@cassettes.boundary("search_serpapi", ignore=("timeout",))
 async def search_serpapi(query: str, max_results: int = 3, timeout: int = 5) -> List[Dict]:
-    """Search using SerpAPI (Google Search)."""
+    """Search using SerpAPI (Google Search). Skipped while its circuit breaker is open."""
+    if not serpapi_breaker.allow():
+        return []
+    
+    started = time.monotonic()
     try:
-        url = "https://serpapi.com/search"
         params = {
             "api_key": SERP_API_KEY,
             "q": query,
@@ -60,52 +147,47 @@ async def search_serpapi(query: str, max_results: int = 3, timeout: int = 5) ->
             "gl": "us",  # US region
         }
         
-        # Create SSL context to fix Windows DNS/SSL issues with aiohttp
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        
-        async with aiohttp.ClientSession(connector=connector) as session:
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = []
-                    for item in data.get("organic_results", [])[:max_results]:
-                        results.append({
-                            "title": item.get("title", ""),
-                            "url": item.get("link", ""),
-                            "snippet": item.get("snippet", "")
-                        })
-                    print(f"  SerpAPI returned {len(results)} results")
-                    return results
-                else:
-                    error_text = await response.text()
-                    print(f"  SerpAPI error: HTTP {response.status}")
-                    print(f"  SerpAPI response: {error_text[:200]}")
+        session = get_session()
+        async with session.get(SERPAPI_URL, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 200:
+                data = await response.json()
+                results = []
+                for item in data.get("organic_results", [])[:max_results]:
+                    results.append({
+                        "title": item.get("title", ""),
+                        "url": item.get("link", ""),
+                        "snippet": item.get("snippet", "")
+                    })
+                log.info("SerpAPI returned %d results", len(results))
+                serpapi_breaker.record_success(time.monotonic() - started)
+                return results
+            else:
+                error_text = await response.text()
+                log.warning("SerpAPI error: HTTP %d", response.status, extra={"response": error_text[:200]})
+                ERRORS.inc("search_serpapi", f"HTTP{response.status}")
     except Exception as e:
-        print(f"  SerpAPI search error: {type(e).__name__}: {e}")
+        log.warning("SerpAPI search error: %s: %s", type(e).__name__, e)
+        record_error("search_serpapi", e)
+    serpapi_breaker.record_failure(time.monotonic() - started)
     return []
 
 
+@cassettes.boundary("search_duckduckgo", ignore=("timeout",))
 async def search_duckduckgo(query: str, max_results: int = 3, timeout: int = 5) -> List[Dict]:
-    """Search using DuckDuckGo with English region preference."""
+    """
+    Search using DuckDuckGo with English region preference (on the dedicated DDG pool).
+    Skipped while its circuit breaker is open.
+    """
+    if not duckduckgo_breaker.allow():
+        return []
+    
+    started = time.monotonic()
     try:
-        loop = asyncio.get_event_loop()
-        
-        def do_search():
-            with DDGS() as ddgs:
-                # Force English results with region parameter
-                results = list(ddgs.text(
-                    query, 
-                    region='wt-wt',  # Worldwide English
-                    safesearch='moderate',
-                    max_results=max_results
-                ))
-                return results
-        
-        raw_results = await asyncio.wait_for(
-            loop.run_in_executor(None, do_search),
-            timeout=timeout
-        )
+        if DDG_STANDIN_URL:
+            raw_results = await _search_ddg_standin(query, max_results, timeout)
+        else:
+            raw_results = await ddg_pool.search(query, max_results, timeout)
+        duckduckgo_breaker.record_success(time.monotonic() - started)
         
         results = []
         for r in raw_results[:max_results]:
@@ -115,15 +197,26 @@ async def search_duckduckgo(query: str, max_results: int = 3, timeout: int = 5)
                 "snippet": r.get("body", "")
             })
         
-        print(f"  DuckDuckGo returned {len(results)} results")
+        log.info("DuckDuckGo returned %d results", len(results))
         return results
         
-    except asyncio.TimeoutError:
-        print(f"  DuckDuckGo timeout for: {query[:50]}...")
-        return []
+    except asyncio.TimeoutError as e:
+        log.warning("DuckDuckGo timeout for: %s...", query[:50])
+        record_error("search_duckduckgo", e)
     except Exception as e:
-        print(f"  DuckDuckGo search error: {e}")
-        return []
+        log.warning("DuckDuckGo search error: %s", e)
+        record_error("search_duckduckgo", e)
+    duckduckgo_breaker.record_failure(time.monotonic() - started)
+    return []
+
+
+async def _search_ddg_standin(query: str, max_results: int, timeout: int) -> List[Dict]:
+    """DDGS-shaped results (title, href, body) from the load-test stand-in."""
+    session = get_session()
+    params = {"q": query, "max_results": max_results}
+    async with session.get(DDG_STANDIN_URL, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        return await response.json()
 
 
 async def search_for_citation(citation_text: str, max_results: int = 5) -> List[Dict]:
@@ -145,18 +238,21 @@ async def search_for_citation(citation_text: str, max_results: int = 5) -> List[
         f'{citation_text} site:semanticscholar.org',  # Semantic Scholar
     ]
     
-    all_results = []
-    for query in queries[:2]:  # Limit queries
-        results = await search_web(query, max_results=3)
-        all_results.extend(results)
-        await asyncio.sleep(0.2)
+    # Limit queries, and run them at the same time
+    result_lists = await asyncio.gather(
+        *(search_web(query, max_results=3, kind=CITATION) for query in queries[:2])
+    )
     
-    # Deduplicate by URL
-    seen_urls = set()
-    unique_results = []
-    for r in all_results:
-        if r["url"] not in seen_urls:
-            seen_urls.add(r["url"])
-            unique_results.append(r)
-    
-    return unique_results[:max_results]
+    # Deduplicate by normalized URL
+    return merge_results(list(result_lists), max_results)
+
+
+# Looked up at call time so tests can patch the functions and the API key
+serpapi_backend = register_backend(FunctionBackend(
+    "serpapi", lambda q, n, t: search_serpapi(q, n, t), available=lambda: bool(SERP_API_KEY),
+    timeout=SERPAPI_TIMEOUT, weight=SERPAPI_WEIGHT, quota=SERPAPI_QUOTA
+))
+duckduckgo_backend = register_backend(FunctionBackend(
+    "duckduckgo", lambda q, n, t: search_duckduckgo(q, n, t),
+    timeout=DUCKDUCKGO_TIMEOUT, weight=DUCKDUCKGO_WEIGHT
+))
@@ -0,0 +1,216 @@
+"""
+Structured Logging Module - Non-blocking, request-correlated JSON logs
+INPUT: Standard `logging` records from every module (logging.getLogger(__name__))
+OUTPUT: One JSON object (or text line) per record on stdout, tagged with the request id
+CONSTRAINT: Request handling only enqueues records (never blocks: a full queue drops
+            them and counts the drop); a background thread formats and writes them.
+            Records below WARNING can be sampled per request with LOG_SAMPLE_RATE
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+# Minimum level written for the app's own modules (DEBUG, INFO, WARNING, ERROR)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Minimum level written for libraries (httpx, httpcore, groq, ...), which log every request at INFO
+LOG_LIBRARY_LEVEL = os.getenv("LOG_LIBRARY_LEVEL", "WARNING").upper()
+
+# "json" (one object per line) or "text" (human-readable, for local runs)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Share of requests whose DEBUG / INFO records are kept; warnings and errors always are
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+# Records buffered for the writer thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# The app's modules sit flat in backend/ and log through logging.getLogger(__name__)
+APP_LOGGERS = sorted(
+    name[:-3] for name in os.listdir(os.path.dirname(os.path.abspath(__file__)))
+    if name.endswith(".py") and not name.startswith("_")
+)
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the current request id and drop unsampled low-level records."""
+
+    def __init__(self, sample_rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def sampled(self, rid: Optional[str]) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        # Per-request decision, so a sampled request keeps all of its records
+        if rid is not None:
+            return zlib.crc32(rid.encode("utf-8")) % 10000 < self.sample_rate * 10000
+        return random.random() < self.sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return record.levelno >= logging.WARNING or self.sampled(record.request_id)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or raising when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of raising."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        rid = getattr(record, "request_id", None)
+        return f"{line} [{rid}]" if rid else line
+
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (it may be swapped, e.g. by test runners)."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+# Levels in place before setup_logging(), restored by shutdown_logging()
+_previous_levels: Dict[str, int] = {}
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample_rate: float = LOG_SAMPLE_RATE,
+    library_level: str = LOG_LIBRARY_LEVEL
+) -> None:
+    """
+    Route the root logger through the queue and start the writer thread (idempotent).
+    App modules log at `level`; everything else (third-party libraries) at `library_level`.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    writer = StdoutHandler()
+    writer.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(RequestContextFilter(sample_rate))
+
+    root = logging.getLogger()
+    _previous_levels[""] = root.level
+    root.setLevel(library_level)
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        _previous_levels[name] = logger.level
+        logger.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = DrainingQueueListener(_queue_handler.queue, writer, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def flush_logging() -> None:
+    """Wait until the writer thread has written every queued record."""
+    if _listener is not None:
+        _queue_handler.queue.join()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the writer thread and restore the previous levels."""
+    global _queue_handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    for name, level in _previous_levels.items():
+        logging.getLogger(name or None).setLevel(level)
+    _previous_levels.clear()
+    _queue_handler = None
+    _listener = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: reuse the caller's X-Request-ID (or create one) and echo it back."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        rid = headers.get(REQUEST_ID_HEADER.encode("latin-1"), b"").decode("latin-1")[:64] or uuid.uuid4().hex[:16]
+
+        async def send_wrapper(message: Dict) -> None:
+            if message["type"] == "http.response.start":
+                header = (REQUEST_ID_HEADER.encode("latin-1"), rid.encode("latin-1"))
+                message["headers"] = list(message.get("headers") or []) + [header]
+            await send(message)
+
+        token = request_id.set(rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
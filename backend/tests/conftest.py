@@ -7,8 +7,25 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from main import app
+import structured_logging
+import http_pool
 
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(autouse=True)
+def flush_logs():
+    # The log writer thread runs while a client is open; write its records inside the test's captured output
+    yield
+    structured_logging.flush_logging()
+
+
+@pytest.fixture(autouse=True)
+def http_pool_closed():
+    # Tests that use the shared HTTP session outside the app lifespan must shut it down themselves
+    yield
+    if http_pool.leaked():
+        pytest.fail("HTTP session left open after its event loop closed; await http_pool.shutdown() in the test")
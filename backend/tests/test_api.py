@@ -89,3 +89,242 @@ def test_verify_citations_success_flow(client):
             assert data["results"][0]["raw_citation"] == "Doe, J. (2020). Test."
             assert data["results"][0]["status"] == "VERIFIED"
 
+
+def test_verify_keeps_claim_order_and_isolates_failures(client):
+    mock_claims = [
+        {"claim": "Paris is in France", "start_char": 0, "end_char": 18},
+        {"claim": "London is in UK", "start_char": 20, "end_char": 35},
+        {"claim": "Rome is in Italy", "start_char": 37, "end_char": 53}
+    ]
+
+    async def fake_search(query, *args, **kwargs):
+        if query == "London is in UK":
+            raise RuntimeError("search backend down")
+        return [{"title": query, "url": "http://example.com", "snippet": query}]
+
+    with patch("main.extract_claims", new_callable=AsyncMock) as mock_extract:
+        with patch("main.search_web", side_effect=fake_search):
+            with patch("main.check_fact", new_callable=AsyncMock) as mock_check:
+
+                mock_extract.return_value = mock_claims
+                mock_check.return_value = {"status": "VERIFIED", "reason": "Confirmed by sources"}
+
+                response = client.post("/verify", json={"text": "Paris is in France. London is in UK. Rome is in Italy"})
+
+                assert response.status_code == 200
+                results = response.json()["results"]
+                assert [r["claim"] for r in results] == [c["claim"] for c in mock_claims]
+                assert [r["status"] for r in results] == ["VERIFIED", "UNVERIFIABLE", "VERIFIED"]
+                assert "search backend down" in results[1]["reason"]
+
+def read_events(response):
+    import json
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+def test_verify_stream_emits_claims_results_and_summary(client):
+    mock_claims = [
+        {"claim": "Paris is in France", "start_char": 0, "end_char": 18},
+        {"claim": "The moon is cheese", "start_char": 20, "end_char": 38}
+    ]
+
+    async def fake_check(claim, search_results):
+        status = "VERIFIED" if claim.startswith("Paris") else "HALLUCINATED"
+        return {"status": status, "reason": "Automated test reason"}
+
+    with patch("main.extract_claims", new_callable=AsyncMock) as mock_extract:
+        with patch("main.search_web", new_callable=AsyncMock) as mock_search:
+            with patch("main.check_fact", side_effect=fake_check):
+
+                mock_extract.return_value = mock_claims
+                mock_search.return_value = [{"title": "Source", "url": "http://test.com", "snippet": "Test snippet"}]
+
+                response = client.post("/verify/stream", json={"text": "Paris is in France. The moon is cheese"})
+
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("application/x-ndjson")
+                events = read_events(response)
+                assert events[0] == {"event": "claims", "claims": mock_claims}
+                results = {e["index"]: e["result"] for e in events if e["event"] == "result"}
+                assert results[0]["status"] == "VERIFIED"
+                assert results[1]["status"] == "HALLUCINATED"
+                assert events[-1] == {
+                    "event": "summary",
+                    "total": 2,
+                    "counts": {"VERIFIED": 1, "HALLUCINATED": 1, "UNVERIFIABLE": 0}
+                }
+
+def test_verify_stream_rejects_empty_text(client):
+    response = client.post("/verify/stream", json={"text": "  "})
+    assert response.status_code == 400
+
+def test_verify_citations_stream(client):
+    mock_citation = {"raw_citation": "Doe, J. (2020). Test.", "title": "Test"}
+
+    with patch("main.extract_citations", new_callable=AsyncMock) as mock_extract:
+        with patch("main.search_for_citation", new_callable=AsyncMock) as mock_search:
+            with patch("main.verify_citation", new_callable=AsyncMock) as mock_verify:
+
+                mock_extract.return_value = [mock_citation]
+                mock_search.return_value = []
+                mock_verify.return_value = {"status": "VERIFIED", "errors": [], "reason": "Found exact match"}
+
+                response = client.post("/verify-citations/stream", json={"text": "Doe, J. (2020). Test."})
+
+                assert response.status_code == 200
+                events = read_events(response)
+                assert [e["event"] for e in events] == ["citations", "result", "summary"]
+                assert events[1]["result"]["raw_citation"] == "Doe, J. (2020). Test."
+                assert events[2]["counts"]["VERIFIED"] == 1
+
+def test_verify_batch_dedupes_claims_across_items(client):
+    claims_by_text = {
+        "Paris is in France.": [{"claim": "Paris is in France", "start_char": 0, "end_char": 18}],
+        "Yes, Paris is in France!": [{"claim": "paris is in  France", "start_char": 5, "end_char": 23}],
+        "The moon is cheese.": [{"claim": "The moon is cheese", "start_char": 0, "end_char": 18}]
+    }
+
+    async def fake_extract(text):
+        return claims_by_text[text]
+
+    with patch("main.extract_claims", side_effect=fake_extract):
+        with patch("main.search_web", new_callable=AsyncMock) as mock_search:
+            with patch("main.check_fact", new_callable=AsyncMock) as mock_check:
+
+                mock_search.return_value = [{"title": "Source", "url": "http://test.com", "snippet": "Test snippet"}]
+                mock_check.return_value = {"status": "VERIFIED", "reason": "Automated test reason"}
+
+                response = client.post("/verify/batch", json={"items": [
+                    {"id": "a", "text": "Paris is in France."},
+                    {"id": "b", "text": "Yes, Paris is in France!"},
+                    {"id": "c", "text": "The moon is cheese."},
+                    {"id": "d", "text": ""}
+                ]})
+
+                assert response.status_code == 200
+                data = response.json()
+                assert set(data["results"]) == {"a", "b", "c"}
+                assert data["results"]["b"][0]["start_char"] == 5
+                assert data["results"]["c"][0]["status"] == "VERIFIED"
+                assert data["errors"] == {"d": "Text cannot be empty"}
+                # "Paris is in France" is only searched and checked once
+                assert mock_search.await_count == 2
+                assert mock_check.await_count == 2
+
+def test_verify_batch_rejects_duplicate_ids(client):
+    response = client.post("/verify/batch", json={"items": [
+        {"id": "a", "text": "Paris is in France."},
+        {"id": "a", "text": "The moon is cheese."}
+    ]})
+    assert response.status_code == 400
+
+def test_verify_long_document_mode(client):
+    text = "Paris is the capital of France. " * 20
+
+    with patch("main.extract_claims", new_callable=AsyncMock) as mock_extract:
+        with patch("main.search_web", new_callable=AsyncMock) as mock_search:
+            with patch("main.check_fact", new_callable=AsyncMock) as mock_check:
+
+                mock_extract.return_value = [{"claim": "Paris is the capital of France", "start_char": 0, "end_char": 30}]
+                mock_search.return_value = [{"title": "Source", "url": "http://test.com", "snippet": "Test snippet"}]
+                mock_check.return_value = {"status": "VERIFIED", "reason": "Automated test reason"}
+
+                response = client.post("/verify", json={"text": text})
+
+                assert response.status_code == 200
+                results = response.json()["results"]
+                # Extracted per window, repeated claim deduplicated
+                assert mock_extract.await_count > 1
+                assert len(results) == 1
+
+def test_verify_rejects_text_over_document_limit(client):
+    from document_chunker import MAX_DOCUMENT_CHARS
+    response = client.post("/verify", json={"text": "a" * (MAX_DOCUMENT_CHARS + 1)})
+    assert response.status_code == 400
+
+def test_long_documents_are_steered_to_the_streaming_endpoints(client):
+    from main import MAX_SYNC_DOCUMENT_CHARS
+    text = "Paris is the capital of France. " * (MAX_SYNC_DOCUMENT_CHARS // 32 + 1)
+    for endpoint in ("/verify", "/verify-citations"):
+        response = client.post(endpoint, json={"text": text})
+        assert response.status_code == 400
+        assert "/stream" in response.json()["detail"]
+
+    with patch("main.extract_in_windows", new_callable=AsyncMock, return_value=[]):
+        response = client.post("/verify/stream", json={"text": text})
+    assert response.status_code == 200
+    assert response.text.splitlines()[0] == '{"event": "claims", "claims": []}'
+
+def test_verify_starts_searching_before_extraction_finishes(client):
+    import asyncio
+    events = []
+
+    async def streaming_extract(text, on_claim=None):
+        first = {"claim": "Paris is in France", "start_char": 0, "end_char": 18}
+        on_claim(first)
+        # Give the pipeline a chance to start the first search
+        await asyncio.sleep(0.05)
+        events.append("extraction done")
+        return [first, {"claim": "The moon is cheese", "start_char": 20, "end_char": 38}]
+
+    async def fake_search(query, *args, **kwargs):
+        events.append(f"search {query}")
+        return [{"title": "Source", "url": "http://test.com", "snippet": "Test snippet"}]
+
+    with patch("main.extract_claims", side_effect=streaming_extract):
+        with patch("main.search_web", side_effect=fake_search):
+            with patch("main.check_fact", new_callable=AsyncMock) as mock_check:
+                mock_check.return_value = {"status": "VERIFIED", "reason": "Automated test reason"}
+
+                response = client.post("/verify", json={"text": "Paris is in France. The moon is cheese"})
+
+                assert response.status_code == 200
+                assert [r["claim"] for r in response.json()["results"]] == ["Paris is in France", "The moon is cheese"]
+                assert events.index("search Paris is in France") < events.index("extraction done")
+                assert events.count("search Paris is in France") == 1
+
+def test_citation_found_in_offline_index_skips_search(client):
+    record = {
+        "doi": "", "title": "Deep learning", "authors": "LeCun, Yann; Hinton, Geoffrey",
+        "year": "2015", "venue": "Nature", "pages": "436-444", "url": "http://example.com/dl"
+    }
+    citation = {"raw_citation": "LeCun, Y. (2016). Deep learning. Nature.", "authors": "LeCun, Y.",
+                "year": "2016", "title": "Deep learning", "venue": "Nature", "pages": None}
+
+    with patch("main.extract_citations", new_callable=AsyncMock) as mock_extract:
+        with patch("main.citation_index.lookup", new_callable=AsyncMock) as mock_lookup:
+            with patch("main.search_for_citation", new_callable=AsyncMock) as mock_search:
+                mock_extract.return_value = [citation]
+                mock_lookup.return_value = record
+
+                response = client.post("/verify-citations", json={"text": citation["raw_citation"]})
+
+                assert response.status_code == 200
+                result = response.json()["results"][0]
+                assert result["status"] == "HALLUCINATED"
+                assert result["sources"][0]["url"] == "http://example.com/dl"
+                mock_search.assert_not_awaited()
+
+
+def test_fuzzy_offline_index_hit_falls_back_to_search(client):
+    record = {
+        "doi": "10.1109/cvpr.2016.90", "title": "Deep Residual Learning for Image Recognition",
+        "authors": "He, Kaiming", "year": "2016", "venue": "CVPR", "pages": "770-778", "url": "", "match": "fuzzy"
+    }
+    citation = {"raw_citation": "He, K. (2016). Deep residual learning for video recognition. CVPR.",
+                "authors": "He, K.", "year": "2016", "title": "Deep residual learning for video recognition",
+                "venue": "CVPR", "pages": None}
+
+    with patch("main.extract_citations", new_callable=AsyncMock) as mock_extract:
+        with patch("main.citation_index.lookup", new_callable=AsyncMock) as mock_lookup:
+            with patch("main.search_for_citation", new_callable=AsyncMock) as mock_search:
+                with patch("main.verify_citation", new_callable=AsyncMock) as mock_verify:
+                    mock_extract.return_value = [citation]
+                    mock_lookup.return_value = record
+                    mock_search.return_value = []
+                    mock_verify.return_value = {"status": "UNVERIFIABLE", "errors": [], "reason": "No results"}
+
+                    response = client.post("/verify-citations", json={"text": citation["raw_citation"]})
+
+                    assert response.status_code == 200
+                    assert response.json()["results"][0]["status"] == "UNVERIFIABLE"
+                    mock_search.assert_awaited_once()
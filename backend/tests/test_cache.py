@@ -0,0 +1,83 @@
+import asyncio
+from unittest.mock import patch
+
+import search_module
+from cache import TTLCache, SingleFlight
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_size=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_single_flight_coalesces_concurrent_loads():
+    flights = SingleFlight()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert calls == 1
+    assert flights.coalesced == 4
+
+
+def test_search_web_uses_cache_for_normalized_queries():
+    search_module.search_cache.clear()
+    backend_results = [{"title": "Sky", "url": "http://example.com", "snippet": "The sky is blue"}]
+    calls = 0
+
+    async def fake_backends(query, max_results, timeout, kind="claim"):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return backend_results
+
+    async def run():
+        first = await asyncio.gather(
+            search_module.search_web("The sky is blue"),
+            search_module.search_web("the  SKY is blue")
+        )
+        again = await search_module.search_web("The sky is blue ")
+        return first, again
+
+    with patch("search_module._search_backends", side_effect=fake_backends):
+        (first, second), again = asyncio.run(run())
+
+    assert first == second == again == backend_results
+    assert calls == 1
+    search_module.search_cache.clear()
+
+
+def test_search_web_does_not_cache_empty_results():
+    search_module.search_cache.clear()
+
+    async def fake_backends(query, max_results, timeout, kind="claim"):
+        return []
+
+    with patch("search_module._search_backends", side_effect=fake_backends) as mock_backends:
+        asyncio.run(search_module.search_web("nothing here"))
+        asyncio.run(search_module.search_web("nothing here"))
+
+    assert mock_backends.call_count == 2
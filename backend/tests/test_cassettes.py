@@ -0,0 +1,170 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+import pytest
+from groq.types.chat import ChatCompletion
+
+import cassettes
+import llm_client
+
+
+def make_service():
+    calls = []
+
+    @cassettes.boundary("fake_search", ignore=("timeout",))
+    async def search(query, max_results=3, timeout=5):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return [{"title": f"{query} {len(calls)}"}]
+
+    return search, calls
+
+
+def test_replay_returns_recorded_responses_without_calling_the_service(tmp_path):
+    search, calls = make_service()
+    path = str(tmp_path / "cassette.json")
+
+    with cassettes.using(path, cassettes.RECORD):
+        recorded = asyncio.run(search("eiffel", 2, timeout=5))
+    assert calls == ["eiffel"]
+
+    with cassettes.using(path, cassettes.REPLAY) as cassette:
+        # Timeouts are not part of the key
+        started = time.perf_counter()
+        assert asyncio.run(search("eiffel", 2, timeout=1)) == recorded
+        exact = time.perf_counter() - started
+    with cassettes.using(path, cassettes.REPLAY, cassettes.ZERO):
+        started = time.perf_counter()
+        assert asyncio.run(search("eiffel", max_results=2)) == recorded
+        zero = time.perf_counter() - started
+
+    assert calls == ["eiffel"]
+    assert cassette.calls["fake_search"] == 1
+    assert exact >= 0.04 and zero < 0.03
+    assert cassettes.active() is None
+
+
+def test_repeated_calls_replay_in_order_then_repeat_the_last(tmp_path):
+    search, _ = make_service()
+    path = str(tmp_path / "cassette.json")
+    with cassettes.using(path, cassettes.RECORD, cassettes.ZERO):
+        first = asyncio.run(search("vote"))
+        second = asyncio.run(search("vote"))
+
+    with cassettes.using(path, cassettes.REPLAY, cassettes.ZERO) as cassette:
+        replayed = [asyncio.run(search("vote")) for _ in range(3)]
+        cassette.rewind()
+        again = asyncio.run(search("vote"))
+    assert replayed == [first, second, second]
+    assert again == first
+
+
+def test_unrecorded_call_raises_and_is_counted(tmp_path):
+    search, _ = make_service()
+    path = str(tmp_path / "cassette.json")
+    with cassettes.using(path, cassettes.RECORD):
+        asyncio.run(search("recorded"))
+
+    with cassettes.using(path, cassettes.REPLAY, cassettes.ZERO) as cassette:
+        with pytest.raises(cassettes.CassetteMiss):
+            asyncio.run(search("something else"))
+    assert cassette.misses["fake_search"] == 1
+
+
+def test_stream_replay_keeps_chunk_timing(tmp_path):
+    @cassettes.stream_boundary("fake_stream")
+    async def stream(prompt):
+        for word in prompt.split():
+            await asyncio.sleep(0.02)
+            yield word
+
+    async def collect():
+        started = time.perf_counter()
+        items = [item async for item in stream("one two three")]
+        return items, time.perf_counter() - started
+
+    path = str(tmp_path / "cassette.json")
+    with cassettes.using(path, cassettes.RECORD):
+        recorded, _ = asyncio.run(collect())
+    with cassettes.using(path, cassettes.REPLAY):
+        replayed, elapsed = asyncio.run(collect())
+
+    assert replayed == recorded == ["one", "two", "three"]
+    assert elapsed >= 0.05
+
+
+def test_llm_client_complete_is_recorded_and_replayed(tmp_path):
+    response = ChatCompletion.model_validate({
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "llama-3.1-8b-instant",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "[]"}}],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+    create = AsyncMock(return_value=response)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    arguments = dict(model="llama-3.1-8b-instant", messages=[{"role": "user", "content": "hi"}],
+                     temperature=0.0, max_tokens=10)
+    path = str(tmp_path / "cassette.json")
+
+    with patch.object(llm_client, "get_client", return_value=client):
+        with cassettes.using(path, cassettes.RECORD):
+            asyncio.run(llm_client.complete("test", **arguments))
+        with cassettes.using(path, cassettes.REPLAY, cassettes.ZERO):
+            replayed = asyncio.run(llm_client.complete("test", **arguments))
+
+    assert create.await_count == 1
+    assert replayed.choices[0].message.content == "[]"
+    assert replayed.usage.total_tokens == 6
+
+
+def test_hedge_cancelled_call_replays_without_a_miss(tmp_path):
+    from search_backends import HEDGE, FunctionBackend, route
+
+    @cassettes.boundary("slow_primary", ignore=("timeout",))
+    async def primary(query, max_results, timeout):
+        await asyncio.sleep(0.2)
+        return [{"title": "primary", "url": "https://a.example/1", "snippet": ""}]
+
+    @cassettes.boundary("backup", ignore=("timeout",))
+    async def backup(query, max_results, timeout):
+        await asyncio.sleep(1.0)
+        return [{"title": "backup", "url": "https://b.example/1", "snippet": ""}]
+
+    backends = [FunctionBackend("primary", primary), FunctionBackend("backup", backup)]
+
+    def search():
+        return asyncio.run(route(HEDGE, backends, "query", 3, timeout=5, hedge_delay=0.1))
+
+    path = str(tmp_path / "cassette.json")
+    with cassettes.using(path, cassettes.RECORD) as cassette:
+        recorded = search()
+    assert cassette.interactions[next(k for k in cassette.interactions if k.startswith("backup"))][0]["cancelled"]
+
+    with cassettes.using(path, cassettes.REPLAY) as cassette:
+        assert search() == recorded
+    assert cassette.calls["backup"] == 1
+    assert not cassette.misses
+
+
+def test_replay_fails_instead_of_hanging_when_a_cancelled_call_is_not_cancelled(tmp_path):
+    search, _ = make_service()
+    path = str(tmp_path / "cassette.json")
+
+    async def cancel_midway():
+        task = asyncio.ensure_future(search("slow"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with cassettes.using(path, cassettes.RECORD):
+        asyncio.run(cancel_midway())
+
+    # Nothing cancels the call this time: it gives up after the recorded time plus the grace period
+    with cassettes.using(path, cassettes.REPLAY, cancel_grace=0.05) as cassette:
+        started = time.perf_counter()
+        with pytest.raises(cassettes.CassetteMismatch):
+            asyncio.run(search("slow"))
+    assert time.perf_counter() - started < 0.5
+    assert cassette.misses["fake_search"] == 1
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import search_module
+from circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+
+def test_opens_on_error_rate_and_rejects_calls():
+    breaker = CircuitBreaker("test", min_calls=4, error_rate=0.5, open_seconds=60)
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CLOSED
+    breaker.record_failure(0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_opens_on_slow_calls():
+    breaker = CircuitBreaker("test", min_calls=3, slow_call_seconds=1, slow_call_rate=0.6)
+    for _ in range(3):
+        breaker.record_success(2.5)
+    assert breaker.state == OPEN
+    assert breaker.stats()["slow_rate"] == 1.0
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.05)
+    breaker.record_failure(0.1)
+    time.sleep(0.06)
+
+    # Exactly one probe goes through
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow() is True
+
+
+def test_old_calls_leave_the_window():
+    breaker = CircuitBreaker("test", window=0.05, min_calls=2)
+    breaker.record_failure(0.1)
+    time.sleep(0.06)
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 1
+
+
+def test_open_serpapi_breaker_is_skipped_without_a_request():
+    breaker = CircuitBreaker("serpapi-test", min_calls=1, open_seconds=60)
+    breaker.record_failure(5.0)
+
+    with patch("search_module.serpapi_breaker", breaker), patch("search_module.get_session") as mock_session:
+        assert asyncio.run(search_module.search_serpapi("query")) == []
+
+    mock_session.assert_not_called()
+
+
+def test_health_detail_reports_breakers(client):
+    response = client.get("/health", params={"detail": "true"})
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["breakers"]) >= {"serpapi", "duckduckgo", "groq"}
+    assert body["breakers"]["groq"]["state"] in ("closed", "open", "half_open")
+    assert "queue_depth" in body["duckduckgo_pool"]
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import citation_checker
+from citation_compare import (
+    MATCH, MISMATCH, UNKNOWN,
+    compare_authors, compare_pages, compare_venue, compare_year, verdict_from_record, verdict_from_snippets
+)
+
+CVPR = "Proceedings of the IEEE Conference on Computer Vision and Pattern Recognition"
+RECORD = {
+    "title": "Deep Residual Learning for Image Recognition",
+    "authors": "He, Kaiming; Zhang, Xiangyu; Ren, Shaoqing; Sun, Jian",
+    "year": "2016", "venue": CVPR, "pages": "770-778"
+}
+
+
+def test_year_and_pages():
+    assert compare_year("2016", "2016") == MATCH
+    assert compare_year("2017", "2016") == MISMATCH
+    assert compare_year("", "2016") == UNKNOWN
+    assert compare_pages("pp. 770–778", "770--778") == MATCH
+    assert compare_pages("771", "770-778") == MATCH
+    assert compare_pages("771-778", "770-778") == MISMATCH
+
+
+def test_venue_handles_acronyms_and_abbreviations():
+    assert compare_venue("CVPR", CVPR) == MATCH
+    assert compare_venue("Proc. IEEE Conf. Comput. Vis. Pattern Recognit.", CVPR) == MATCH
+    assert compare_venue("NeurIPS", "NIPS") == MATCH
+    assert compare_venue("ICLR", "International Conference on Machine Learning (ICML)") == MISMATCH
+    # An acronym we cannot expand is not evidence either way
+    assert compare_venue("ICCV", CVPR) == UNKNOWN
+
+
+def test_authors():
+    assert compare_authors("He, K., Zhang, X., Ren, S., & Sun, J.", RECORD["authors"]) == MATCH
+    assert compare_authors("K. He et al.", RECORD["authors"]) == MATCH
+    assert compare_authors("Smith, J.", RECORD["authors"]) == MISMATCH
+
+
+def test_verdict_from_record():
+    verified = verdict_from_record({"authors": "He, K.", "year": "2016", "venue": "CVPR", "pages": "770-778"}, RECORD)
+    assert verified["status"] == "VERIFIED"
+    assert verified["errors"] == []
+
+    wrong = verdict_from_record({"year": "2017", "venue": "CVPR", "pages": "770-779"}, RECORD)
+    assert wrong["status"] == "HALLUCINATED"
+    assert len(wrong["errors"]) == 2
+    assert wrong["votes"] == 0
+
+
+CITATION = {"title": "Deep residual learning for image recognition", "authors": "He, K., Zhang, X.",
+            "year": "2016", "venue": "CVPR", "pages": "770-778"}
+
+
+def scholar(snippet, title="Deep residual learning for image recognition"):
+    return [{"title": title, "url": "http://scholar.example", "snippet": snippet},
+            {"title": "Unrelated page about cheese", "url": "http://x", "snippet": "Published 1999, pp. 1-2, ICML"}]
+
+
+def test_snippets_confirm_a_correct_citation():
+    verdict = verdict_from_snippets(CITATION, scholar("K He, X Zhang, S Ren, J Sun - CVPR 2016, pp. 770–778"))
+    assert verdict["status"] == "VERIFIED"
+    assert verdict["votes"] == 0
+
+
+def test_snippets_catch_off_by_one_year_and_pages():
+    wrong = dict(CITATION, year="2017", pages="770-779")
+    verdict = verdict_from_snippets(wrong, scholar("K He, X Zhang - CVPR 2016, pp. 770–778"))
+    assert verdict["status"] == "HALLUCINATED"
+    assert [e.split(" ")[0] for e in verdict["errors"]] == ["Year", "Pages"]
+
+
+def test_snippets_catch_wrong_venue():
+    verdict = verdict_from_snippets(dict(CITATION, venue="ICCV"), scholar("K He - CVPR 2016"))
+    assert verdict["status"] == "HALLUCINATED"
+    assert verdict["errors"] == ["Venue is 'ICCV', source says 'CVPR'"]
+
+
+def test_ambiguous_snippets_escalate():
+    # Two different years and no page numbers: leave it to the LLM
+    assert verdict_from_snippets(CITATION, scholar("K He, X Zhang - CVPR 2016. Cited in 2019")) is None
+    # A year in the wrong context (arXiv id, access date, citation count) is no evidence of a mismatch
+    attention = {"title": "Attention is all you need", "authors": "Vaswani, A.", "year": "2017"}
+    assert verdict_from_snippets(attention, scholar(
+        "A Vaswani, N Shazeer - arXiv preprint arXiv:1706.03762", title="Attention is all you need")) is None
+    assert verdict_from_snippets(attention, scholar(
+        "Attention is all you need. Accessed 2024.", title="Attention is all you need")) is None
+    assert verdict_from_snippets(attention, scholar(
+        "Vaswani et al. Cited by 2019 https://doi.org/10.5555/3295222", title="Attention is all you need")) is None
+    # No result about this title
+    assert verdict_from_snippets(CITATION, scholar("2016", title="Something else entirely")) is None
+
+
+def test_verify_citation_only_calls_the_llm_when_ambiguous():
+    answer = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+        content='{"status": "VERIFIED", "errors": [], "reason": "ok"}'))])
+    with patch("citation_checker.complete", new_callable=AsyncMock) as mock_complete:
+        with patch("citation_checker.verdicts.get", new_callable=AsyncMock, return_value=None):
+            with patch("citation_checker.verdicts.put", new_callable=AsyncMock):
+                mock_complete.return_value = answer
+                clear = asyncio.run(citation_checker.verify_citation(
+                    CITATION, scholar("K He, X Zhang - CVPR 2016, pp. 770–778")))
+                assert clear["status"] == "VERIFIED"
+                mock_complete.assert_not_awaited()
+
+                unclear = asyncio.run(citation_checker.verify_citation(
+                    CITATION, scholar("K He, X Zhang - CVPR 2016. Cited in 2019")))
+                assert unclear["votes"] == 2
+                assert mock_complete.await_count == 2
+
+
+def test_year_in_a_publication_context_is_still_a_mismatch():
+    attention = {"title": "Attention is all you need", "authors": "Vaswani, A.", "year": "2017"}
+    verdict = verdict_from_snippets(attention, scholar("A Vaswani - NeurIPS (2016).", title="Attention is all you need"))
+    assert verdict["status"] == "HALLUCINATED"
+    assert verdict["errors"] == ["Year is '2017', source says '2016'"]
+
+
+def test_lone_unlabelled_snippet_values_escalate():
+    # Preprint years, bare "Published" dates, result counts and workshops are not the cited paper's fields
+    for snippet in ("arXiv preprint arXiv:1512.03385, 2015.", "Published 2015. Computer Science.",
+                    "Cited by 200000. Related articles 1-10", "ECCV workshop 2016"):
+        assert verdict_from_snippets(CITATION, scholar(snippet)) is None, snippet
+
+
+def test_unlabelled_value_is_a_mismatch_when_several_results_agree():
+    results = scholar("Published 2015. Computer Science.") + scholar("Published 2015 by the authors.")
+    verdict = verdict_from_snippets(CITATION, results)
+    assert verdict["status"] == "HALLUCINATED"
+    assert verdict["errors"] == ["Year is '2016', source says '2015'"]
+
+    labelled = verdict_from_snippets(dict(CITATION, venue="ICCV"), scholar("In Proceedings of CVPR, 2016"))
+    assert labelled["errors"] == ["Venue is 'ICCV', source says 'CVPR'"]
@@ -0,0 +1,110 @@
+import asyncio
+import io
+import json
+import sqlite3
+
+from citation_index import MATCH_DOI, MATCH_FUZZY, MATCH_TITLE, CitationIndex, iter_bibtex, iter_csv, iter_jsonl, record_source
+
+BIBTEX = """
+@comment{exported}
+@inproceedings{he2016deep,
+  title={Deep Residual Learning for Image Recognition},
+  author={He, Kaiming and Zhang, Xiangyu and Ren, Shaoqing and Sun, Jian},
+  booktitle={Proceedings of the {IEEE} Conference on Computer Vision and Pattern Recognition},
+  pages={770--778},
+  year={2016},
+  doi = "10.1109/CVPR.2016.90"
+}
+@article{lecun2015, title = "Deep learning", author = "LeCun, Yann and Hinton, Geoffrey", journal = {Nature}, year = 2015, pages = {436--444}}
+"""
+
+JSONL = json.dumps({
+    "title": "Attention Is All You Need",
+    "authors": [{"name": "Ashish Vaswani"}, {"name": "Noam Shazeer"}],
+    "year": 2017, "venue": "NeurIPS", "pages": "5998-6008"
+}) + "\n"
+
+CSV = "Title,Author,Year,Journal,Pages\nLong Short-Term Memory,Hochreiter and Schmidhuber,1997,Neural Computation,1735-1780\n"
+
+
+def build_index(tmp_path):
+    index = CitationIndex(str(tmp_path / "citations.sqlite3"))
+    added = index.build(iter_bibtex(io.StringIO(BIBTEX)))
+    added += index.build(iter_jsonl(io.StringIO(JSONL)))
+    added += index.build(iter_csv(io.StringIO(CSV)))
+    assert added == 4
+    return index
+
+
+def test_bibtex_importer_reads_nested_braces_and_quotes():
+    records = list(iter_bibtex(io.StringIO(BIBTEX)))
+    assert [r["title"] for r in records] == ["Deep Residual Learning for Image Recognition", "Deep learning"]
+    assert records[0]["venue"] == "Proceedings of the IEEE Conference on Computer Vision and Pattern Recognition"
+    assert records[0]["pages"] == "770-778"
+    assert records[1]["authors"] == "LeCun, Yann; Hinton, Geoffrey"
+
+
+def test_exact_fuzzy_and_doi_lookup(tmp_path):
+    index = build_index(tmp_path)
+
+    assert index.lookup_sync({"title": "Deep learning"})["venue"] == "Nature"
+    assert index.lookup_sync({"title": "Attention is all you need!"})["year"] == "2017"
+    # Typo and a missing word still find the record
+    assert index.lookup_sync({"title": "Long short term memmory"})["authors"] == "Hochreiter and Schmidhuber"
+    assert index.lookup_sync({"raw_citation": "doi:10.1109/cvpr.2016.90", "title": "???"})["pages"] == "770-778"
+
+    assert index.lookup_sync({"title": "A completely different paper about cheese"}) is None
+
+
+def test_lookup_reports_how_the_record_was_found(tmp_path):
+    index = build_index(tmp_path)
+    assert index.lookup_sync({"title": "Deep learning"})["match"] == MATCH_TITLE
+    assert index.lookup_sync({"raw_citation": "doi:10.1109/cvpr.2016.90"})["match"] == MATCH_DOI
+    # A near-miss title is a different paper as often as a typo
+    near_miss = index.lookup_sync({"title": "Deep residual learning for video recognition"})
+    assert near_miss["title"] == "Deep Residual Learning for Image Recognition"
+    assert near_miss["match"] == MATCH_FUZZY
+
+
+def test_lookup_is_disabled_without_a_path():
+    assert asyncio.run(CitationIndex("").lookup({"title": "Deep learning"})) is None
+
+
+def test_record_source_looks_like_a_search_result(tmp_path):
+    record = build_index(tmp_path).lookup_sync({"title": "Deep Residual Learning for Image Recognition"})
+    source = record_source(record)
+    assert source["url"] == "https://doi.org/10.1109/cvpr.2016.90"
+    assert "2016" in source["snippet"]
+
+
+def test_rebuilding_updates_records_instead_of_duplicating_them(tmp_path):
+    index = build_index(tmp_path)
+    corrected = BIBTEX.replace("pages={770--778}", "pages={770--779}")
+    assert index.build(iter_bibtex(io.StringIO(corrected))) == 2
+    index.build(iter_jsonl(io.StringIO(JSONL.replace("NeurIPS", "NIPS"))))
+
+    conn = sqlite3.connect(index.path)
+    assert conn.execute("SELECT COUNT(*) FROM records").fetchone()[0] == 4
+    conn.close()
+    assert index.lookup_sync({"raw_citation": "doi:10.1109/cvpr.2016.90"})["pages"] == "770-779"
+    assert index.lookup_sync({"title": "Attention is all you need"})["venue"] == "NIPS"
+
+
+def test_index_without_record_keys_is_migrated(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE records (id INTEGER PRIMARY KEY, doi TEXT, title TEXT NOT NULL, norm_title TEXT NOT NULL,
+                              authors TEXT, year TEXT, venue TEXT, pages TEXT, url TEXT);
+        INSERT INTO records (doi, title, norm_title, year) VALUES ('', 'Deep learning', 'deep learning', '2015');
+        INSERT INTO records (doi, title, norm_title, year) VALUES ('', 'Deep learning', 'deep learning', '2015');
+    """)
+    conn.close()
+
+    index = CitationIndex(path)
+    index.build(iter_jsonl(io.StringIO(json.dumps({"title": "Deep Learning", "year": 2015, "venue": "Nature"}))))
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM records").fetchone()[0] == 1
+    conn.close()
+    assert index.lookup_sync({"title": "Deep learning"})["venue"] == "Nature"
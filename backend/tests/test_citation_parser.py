@@ -0,0 +1,89 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import citation_checker
+from citation_parser import parse_citation, parse_citations, split_reference_spans
+
+APA = ("He, K., Zhang, X., Ren, S., & Sun, J. (2016). Deep residual learning for image recognition. "
+       "In Proceedings of the IEEE conference on computer vision and pattern recognition (pp. 770-778).")
+IEEE = ('[1] K. He, X. Zhang, S. Ren, and J. Sun, "Deep residual learning for image recognition," '
+        'in Proc. IEEE Conf. Comput. Vis. Pattern Recognit. (CVPR), 2016, pp. 770–778.')
+ACM = ("Kaiming He, Xiangyu Zhang, Shaoqing Ren, and Jian Sun. 2016. Deep Residual Learning for Image "
+       "Recognition. In Proceedings of the IEEE Conference on Computer Vision and Pattern Recognition (CVPR). 770–778.")
+PROSE = "As Vaswani et al. showed in 2017, attention is all you need for translation."
+
+
+def make_response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_parses_apa():
+    citation, confidence = parse_citation(APA)
+    assert confidence == 1.0
+    assert citation["authors"] == "He, K., Zhang, X., Ren, S., & Sun, J."
+    assert citation["year"] == "2016"
+    assert citation["title"] == "Deep residual learning for image recognition"
+    assert citation["venue"] == "Proceedings of the IEEE conference on computer vision and pattern recognition"
+    assert citation["pages"] == "770-778"
+
+
+def test_parses_ieee_without_list_marker():
+    citation, confidence = parse_citation(IEEE)
+    assert confidence == 1.0
+    assert citation["raw_citation"].startswith("K. He")
+    assert citation["authors"] == "K. He, X. Zhang, S. Ren, and J. Sun"
+    assert citation["venue"] == "Proc. IEEE Conf. Comput. Vis. Pattern Recognit. (CVPR)"
+    assert (citation["year"], citation["pages"]) == ("2016", "770-778")
+
+
+def test_parses_acm():
+    citation, confidence = parse_citation(ACM)
+    assert confidence == 1.0
+    assert citation["authors"] == "Kaiming He, Xiangyu Zhang, Shaoqing Ren, and Jian Sun"
+    assert citation["title"] == "Deep Residual Learning for Image Recognition"
+    assert citation["pages"] == "770-778"
+
+
+def test_prose_and_implausible_years_are_low_confidence():
+    assert parse_citation(PROSE)[1] < 0.75
+    assert parse_citation("Smith (2050). Future Paper.")[1] < 0.75
+
+
+def test_prose_with_a_year_in_parentheses_goes_to_the_llm():
+    for prose in ("The Eiffel Tower (1889). It is in Paris and was built by Gustave Eiffel.",
+                  "Smith (2017). Attention is all you need."):
+        assert parse_citation(prose)[1] < 0.75, prose
+        assert parse_citations(prose)[0] == []
+    # A name list or a venue still makes it a reference
+    assert parse_citation("Smith, J. (2017). Attention is all you need.")[1] >= 0.75
+    assert parse_citation("Smith (2017). Attention is all you need. Nature, 1(2), 10-20.")[1] >= 0.75
+
+
+def test_wrapped_entries_are_joined():
+    text = 'References\n[1] A. Lee, "First title,"\n in Proc. X, 2019.\n[2] B. Kim, "Second," in Y, 2020.'
+    spans = [text[a:b] for a, b in split_reference_spans(text)]
+    assert spans == ["References", '[1] A. Lee, "First title,"\n in Proc. X, 2019.', '[2] B. Kim, "Second," in Y, 2020.']
+
+
+def test_well_formed_references_skip_the_llm():
+    with patch("citation_checker.complete", new_callable=AsyncMock) as mock_complete:
+        citations = asyncio.run(citation_checker.extract_citations(f"References\n{APA}\n{IEEE}\n{ACM}"))
+
+    mock_complete.assert_not_awaited()
+    assert [c["year"] for c in citations] == ["2016", "2016", "2016"]
+
+
+def test_only_unparsed_spans_go_to_the_llm():
+    llm_citation = {"raw_citation": "Vaswani et al. showed in 2017", "authors": "Vaswani et al.",
+                    "year": "2017", "title": "Attention is all you need", "venue": "", "pages": ""}
+    with patch("citation_checker.complete", new_callable=AsyncMock) as mock_complete:
+        mock_complete.return_value = make_response(json.dumps([llm_citation]))
+        citations = asyncio.run(citation_checker.extract_citations(f"{PROSE}\n{APA}"))
+
+    prompt = mock_complete.await_args.kwargs["messages"][0]["content"]
+    assert PROSE in prompt and APA not in prompt
+    # Document order is kept across both paths
+    assert [c["year"] for c in citations] == ["2017", "2016"]
+    assert parse_citations(f"{PROSE}\n{APA}")[1] == [(0, PROSE)]
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import patch
+
+import claim_extractor
+from claim_extractor import JSONArrayStreamParser
+
+TEXT = "Paris is in France. The moon is cheese."
+
+
+def fake_stream(chunks, log=None):
+    async def stream_complete(module, **kwargs):
+        for chunk in chunks:
+            if log is not None:
+                log.append(("chunk", chunk))
+            await asyncio.sleep(0)
+            yield chunk
+    return stream_complete
+
+
+def test_parser_handles_split_chunks_and_escapes():
+    parser = JSONArrayStreamParser()
+    objects = []
+    for ch in 'Here you go: [{"claim": "A {b} \\"q\\""}, {"cla':
+        objects += parser.feed(ch)
+    assert objects == [{"claim": 'A {b} "q"'}]
+    objects += parser.feed('im": "B"}]')
+    assert objects[1] == {"claim": "B"}
+    assert parser.found == 2
+
+
+def test_claims_are_emitted_before_the_stream_finishes():
+    log = []
+    chunks = ['[{"claim": "Paris is in France"}', ', {"claim": "The moon', ' is cheese"}', ']']
+
+    with patch("claim_extractor.stream_complete", fake_stream(chunks, log)):
+        claims = asyncio.run(claim_extractor.extract_claims(
+            TEXT, on_claim=lambda c: log.append(("claim", c["claim"]))
+        ))
+
+    assert [c["claim"] for c in claims] == ["Paris is in France", "The moon is cheese"]
+    assert claims[1] == {"claim": "The moon is cheese", "start_char": 20, "end_char": 38}
+    # First claim reaches the callback before the second one is streamed
+    assert log.index(("claim", "Paris is in France")) < log.index(("chunk", ', {"claim": "The moon'))
+
+
+def test_stops_after_max_claims():
+    chunks = ["[" + ", ".join(f'{{"claim": "Fact {i}"}}' for i in range(8)) + "]"]
+    with patch("claim_extractor.stream_complete", fake_stream(chunks)):
+        claims = asyncio.run(claim_extractor.extract_claims("Fact 1. Fact 2."))
+    assert len(claims) == claim_extractor.MAX_CLAIMS
+
+
+def test_falls_back_to_whole_response_parsing():
+    with patch("claim_extractor.stream_complete", fake_stream(["[]"])):
+        assert asyncio.run(claim_extractor.extract_claims(TEXT)) == []
+
+    with patch("claim_extractor.stream_complete", fake_stream(["not json"])):
+        assert asyncio.run(claim_extractor.extract_claims(TEXT)) == []
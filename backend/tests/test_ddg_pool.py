@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ddg_pool import DDGPool
+
+
+class FakeDDGS:
+    created = 0
+
+    def __init__(self, timeout=None):
+        FakeDDGS.created += 1
+        self.thread = threading.current_thread().name
+
+    def text(self, query, **kwargs):
+        if query == "slow":
+            time.sleep(0.2)
+        if query == "boom":
+            raise RuntimeError("rate limited")
+        return [{"title": query, "href": "http://example.com", "body": self.thread}]
+
+
+@pytest.fixture
+def pool():
+    FakeDDGS.created = 0
+    with patch("ddg_pool.DDGS", FakeDDGS):
+        pool = DDGPool(workers=1)
+        yield pool
+        pool.shutdown()
+
+
+def test_reuses_one_client_per_worker_thread(pool):
+    async def run():
+        return [await pool.search(f"q{i}", 3, timeout=1) for i in range(5)]
+
+    results = asyncio.run(run())
+    assert all(r[0]["body"].startswith("ddg") for r in results)
+    assert FakeDDGS.created == 1
+    assert pool.stats()["completed"] == 5
+
+
+def test_failed_client_is_replaced(pool):
+    async def run():
+        with pytest.raises(RuntimeError):
+            await pool.search("boom", 3, timeout=1)
+        return await pool.search("ok", 3, timeout=1)
+
+    assert asyncio.run(run())[0]["title"] == "ok"
+    assert FakeDDGS.created == 2
+    assert pool.stats()["failed"] == 1
+
+
+def test_timed_out_queued_jobs_never_run(pool):
+    async def run():
+        # One worker is busy with "slow"; the queued query times out and is cancelled
+        slow = asyncio.ensure_future(pool.search("slow", 3, timeout=1))
+        await asyncio.sleep(0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.search("queued", 3, timeout=0.05)
+        assert pool.stats()["queue_depth"] == 0
+        await slow
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert (stats["timed_out"], stats["skipped"], stats["completed"]) == (1, 1, 1)
+    assert stats["running"] == 0
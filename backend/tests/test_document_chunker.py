@@ -0,0 +1,63 @@
+import asyncio
+
+from document_chunker import chunk_document, extract_in_windows, split_sentences
+
+DOCUMENT = (
+    "Paris is the capital of France. The Eiffel Tower was completed in 1889. "
+    "Python was released in 1991. Water boils at 100 degrees Celsius at sea level. "
+    "The moon orbits the Earth. Mount Everest is the highest mountain on Earth."
+)
+
+
+def test_split_sentences_covers_the_text():
+    spans = split_sentences(DOCUMENT)
+    assert len(spans) == 6
+    assert "".join(DOCUMENT[s:e] for s, e in spans) == DOCUMENT
+
+
+def test_windows_are_sentence_aligned_bounded_and_overlapping():
+    windows = chunk_document(DOCUMENT, window_chars=120, overlap_sentences=1)
+    assert len(windows) > 1
+    for window, offset in windows:
+        assert len(window) <= 120
+        assert DOCUMENT[offset:offset + len(window)] == window
+    # Neighbouring windows overlap
+    for (window, offset), (_, next_offset) in zip(windows, windows[1:]):
+        assert offset < next_offset < offset + len(window)
+    assert windows[-1][0].endswith("mountain on Earth.")
+
+
+def test_overlong_sentence_is_split():
+    text = "word " * 200
+    windows = chunk_document(text, window_chars=100, overlap_sentences=0)
+    assert all(len(w) <= 100 for w, _ in windows)
+    assert sum(len(w) for w, _ in windows) == len(text)
+
+
+def test_extract_in_windows_dedupes_and_maps_offsets():
+    async def fake_extract(window):
+        claims = []
+        for start, end in split_sentences(window):
+            sentence = window[start:end].strip().rstrip(".")
+            claims.append({"claim": sentence, "start_char": start, "end_char": start + len(sentence)})
+        return claims
+
+    claims = asyncio.run(extract_in_windows(DOCUMENT, fake_extract, "claim"))
+
+    texts = [c["claim"] for c in claims]
+    assert len(texts) == len(set(texts)) == 6
+    for claim in claims:
+        assert DOCUMENT[claim["start_char"]:claim["end_char"]] == claim["claim"]
+
+
+def test_extract_in_windows_skips_failed_windows():
+    async def flaky_extract(window):
+        if "Python" in window:
+            raise RuntimeError("boom")
+        return [{"claim": window.strip(), "start_char": -1, "end_char": -1}]
+
+    text = DOCUMENT + " " + "Cats are mammals. Dogs are mammals too. " * 20
+    claims = asyncio.run(extract_in_windows(text, flaky_extract, "claim"))
+    assert claims
+    assert all("Python" not in c["claim"] for c in claims)
+    assert all(c["start_char"] == -1 for c in claims)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fact_checker
+from verdict_store import VerdictStore
+
+
+def make_response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def evidence(text):
+    return [{"title": "Source", "url": "http://example.com", "snippet": text}]
+
+
+class FakeGroq:
+    """Answers batched prompts with a JSON array and single prompts with an object."""
+
+    def __init__(self, skip_ids=()):
+        self.calls = []
+        self.skip_ids = set(skip_ids)
+
+    async def __call__(self, module, **kwargs):
+        content = kwargs["messages"][0]["content"]
+        self.calls.append(content)
+        if "CLAIM 1:" in content:
+            count = content.count("SEARCH RESULTS FOR CLAIM")
+            answer = [
+                {"id": i, "status": "VERIFIED", "reason": f"batched {i}"}
+                for i in range(1, count + 1) if i not in self.skip_ids
+            ]
+            return make_response(json.dumps(answer))
+        return make_response('{"status": "VERIFIED", "reason": "single"}')
+
+
+def run_checks(fake, claims):
+    store = VerdictStore("", ttl=60, max_entries=10)
+
+    async def run():
+        return await asyncio.gather(*(fact_checker.check_fact(c, evidence(c)) for c in claims))
+
+    with patch("fact_checker.verdicts", store):
+        with patch("fact_checker.complete", fake):
+            return asyncio.run(run())
+
+
+def test_concurrent_checks_share_batched_calls():
+    fake = FakeGroq()
+    claims = [f"Claim number {i}" for i in range(5)]
+
+    verdicts = run_checks(fake, claims)
+
+    assert all(v["status"] == "VERIFIED" for v in verdicts)
+    assert all(v["votes"] == 2 for v in verdicts)
+    # Two adaptive votes for five claims: 2 requests instead of 10
+    assert len(fake.calls) == 2
+    assert all("CLAIM 5:" in call for call in fake.calls)
+
+
+
+def test_batch_tasks_are_held_until_they_finish():
+    held = []
+
+    class HoldingGroq(FakeGroq):
+        async def __call__(self, module, **kwargs):
+            held.append(len(fact_checker._batcher._running))
+            return await super().__call__(module, **kwargs)
+
+    run_checks(HoldingGroq(), [f"Claim number {i}" for i in range(5)])
+
+    assert held and all(count == 1 for count in held)
+    assert not fact_checker._batcher._running
+
+
+def test_claims_missing_from_batch_fall_back_to_single_checks():
+    fake = FakeGroq(skip_ids={2})
+    claims = ["First claim", "Second claim", "Third claim"]
+
+    verdicts = run_checks(fake, claims)
+
+    assert [v["status"] for v in verdicts] == ["VERIFIED"] * 3
+    assert "single" in verdicts[1]["reason"]
+    assert "batched" in verdicts[0]["reason"]
+    single_calls = [c for c in fake.calls if "CLAIM 1:" not in c]
+    assert len(single_calls) == 2
+    assert all("Second claim" in c for c in single_calls)
+
+
+def test_check_facts_batch_keeps_order_and_handles_missing_evidence():
+    fake = FakeGroq()
+    store = VerdictStore("", ttl=60, max_entries=10)
+
+    with patch("fact_checker.verdicts", store):
+        with patch("fact_checker.complete", fake):
+            verdicts = asyncio.run(fact_checker.check_facts_batch([
+                ("Claim A", evidence("a")),
+                ("Claim B", []),
+                ("Claim C", evidence("c"))
+            ]))
+
+    assert verdicts[1]["status"] == "UNVERIFIABLE"
+    assert verdicts[1]["votes"] == 0
+    assert "batched 1" in verdicts[0]["reason"]
+    assert "batched 2" in verdicts[2]["reason"]
+    assert len(fake.calls) == 2
+
+
+def test_batching_can_be_disabled():
+    fake = FakeGroq()
+    with patch("fact_checker.FACT_CHECK_BATCH_SIZE", 1):
+        run_checks(fake, ["First claim", "Second claim"])
+    assert len(fake.calls) == 4
+    assert not any("CLAIM 1:" in c for c in fake.calls)
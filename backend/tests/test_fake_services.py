@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import random
+import asyncio
+from unittest.mock import patch
+
+from aiohttp.test_utils import TestServer
+
+import http_pool
+import search_module
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_services import ServiceBehaviour, answer, build_app
+
+
+def services(**groq):
+    return (
+        ServiceBehaviour("groq", latency_ms=0, **groq),
+        ServiceBehaviour("serpapi", latency_ms=0),
+        ServiceBehaviour("ddg", latency_ms=0)
+    )
+
+
+def test_answer_follows_the_prompt_type():
+    rng = random.Random(0)
+    extraction = answer(
+        "You are a claim extraction assistant.\nTEXT TO ANALYZE:\n"
+        "The Eiffel Tower is in Paris. It was completed in 1889.\nReturn a JSON array",
+        rng, 0.0
+    )
+    assert json.loads(extraction) == [{"claim": "The Eiffel Tower is in Paris"}, {"claim": "It was completed in 1889"}]
+
+    batch = json.loads(answer("For EACH numbered claim\nCLAIM 1:\nWater is wet\nCLAIM 2:\nFire is cold\n", rng, 0.0))
+    assert [v["id"] for v in batch] == [1, 2]
+
+    # Without disagreement the same claim always gets the same status
+    first = answer("fact-checking assistant\nCLAIM TO VERIFY: Water is wet\nSEARCH RESULTS:", rng, 0.0)
+    assert answer("fact-checking assistant\nCLAIM TO VERIFY: Water is wet\nSEARCH RESULTS:", rng, 0.0) == first
+
+
+def test_search_backends_can_be_pointed_at_the_fake_services():
+    async def run():
+        server = TestServer(build_app(*services()))
+        await server.start_server()
+        base = str(server.make_url("")).rstrip("/")
+        try:
+            with patch.object(search_module, "SERP_API_KEY", "fake"), \
+                 patch.object(search_module, "SERPAPI_URL", base + "/serpapi/search"), \
+                 patch.object(search_module, "DDG_STANDIN_URL", base + "/ddg/search"):
+                serp = await search_module.search_serpapi("eiffel tower height", max_results=2)
+                ddg = await search_module.search_duckduckgo("eiffel tower height", max_results=3)
+            session = http_pool.get_session()
+            async with session.get(base + "/stats") as response:
+                stats = await response.json()
+        finally:
+            await http_pool.shutdown()
+            await server.close()
+        return serp, ddg, stats
+
+    serp, ddg, stats = asyncio.run(run())
+    assert len(serp) == 2 and all(r["url"].startswith("https://reference") for r in serp)
+    assert len(ddg) == 3 and all("eiffel tower height" in r["snippet"] for r in ddg)
+    assert stats["serpapi"]["calls"] == 1 and stats["ddg"]["calls"] == 1
+
+
+def test_injected_rate_limits_return_429_with_retry_after():
+    async def run():
+        server = TestServer(build_app(*services(rate_limit_rate=1.0)))
+        await server.start_server()
+        try:
+            session = http_pool.get_session()
+            async with session.post(str(server.make_url("/openai/v1/chat/completions")),
+                                    json={"messages": [{"role": "user", "content": "hi"}]}) as response:
+                return response.status, response.headers.get("retry-after")
+        finally:
+            await http_pool.shutdown()
+            await server.close()
+
+    assert asyncio.run(run()) == (429, "1.0")
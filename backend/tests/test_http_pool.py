@@ -0,0 +1,50 @@
+import asyncio
+
+import http_pool
+
+
+def test_session_is_shared_until_shutdown():
+    async def run():
+        await http_pool.startup()
+        first = http_pool.get_session()
+        second = http_pool.get_session()
+        assert first is second
+        assert first.connector.limit == http_pool.HTTP_POOL_SIZE
+        assert first.connector.limit_per_host == http_pool.HTTP_POOL_PER_HOST
+        await http_pool.shutdown()
+        assert first.closed
+
+    asyncio.run(run())
+
+
+def test_session_is_recreated_for_a_new_event_loop():
+    async def use():
+        session = http_pool.get_session()
+        await http_pool.shutdown()
+        return session
+
+    first = asyncio.run(use())
+    second = asyncio.run(use())
+    assert first is not second
+    assert first.closed and second.closed
+    assert not http_pool.leaked()
+
+
+def test_session_not_shut_down_is_reported(caplog):
+    async def grab():
+        return http_pool.get_session()
+
+    async def grab_and_shutdown():
+        session = http_pool.get_session()
+        await http_pool.shutdown()
+        return session
+
+    leaked = asyncio.run(grab())
+    assert http_pool.leaked()
+    with caplog.at_level("WARNING", logger="http_pool"):
+        replacement = asyncio.run(grab_and_shutdown())
+    assert replacement is not leaked
+    assert "was not shut down" in caplog.text
+    assert not http_pool.leaked()
+    # Sockets of a loop that is already closed cannot be closed any more; drop the session quietly
+    leaked.detach()
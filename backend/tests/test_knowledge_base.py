@@ -0,0 +1,68 @@
+import asyncio
+import io
+import json
+from unittest.mock import patch
+
+import search_module
+from knowledge_base import KnowledgeBase, iter_jsonl, iter_wikipedia_abstracts
+
+ABSTRACTS = b"""<feed>
+<doc><title>Wikipedia: Eiffel Tower</title><url>https://en.wikipedia.org/wiki/Eiffel_Tower</url>
+<abstract>The Eiffel Tower is a wrought-iron lattice tower in Paris, France. It was completed in 1889.</abstract></doc>
+<doc><title>Wikipedia: Penicillin</title><url>https://en.wikipedia.org/wiki/Penicillin</url>
+<abstract>Penicillin was discovered in 1928 by Scottish scientist Alexander Fleming.</abstract></doc>
+</feed>"""
+
+
+def build(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "kb.sqlite3"), min_relevance=0.6)
+    assert kb.upsert(iter_wikipedia_abstracts(io.BytesIO(ABSTRACTS)), rebuild=True) == 2
+    return kb
+
+
+def test_relevant_articles_are_returned_like_search_results(tmp_path):
+    kb = build(tmp_path)
+    results = kb.search_sync("Alexander Fleming discovered penicillin in 1928")
+    assert results == [{
+        "title": "Penicillin",
+        "url": "https://en.wikipedia.org/wiki/Penicillin",
+        "snippet": "Penicillin was discovered in 1928 by Scottish scientist Alexander Fleming."
+    }]
+
+
+def test_weak_matches_fall_below_the_threshold(tmp_path):
+    kb = build(tmp_path)
+    # Only "Paris" matches: not enough of the claim to skip the web
+    assert kb.search_sync("Paris hosted the 2024 Summer Olympics opening ceremony") == []
+
+
+def test_update_replaces_and_adds_articles(tmp_path):
+    kb = build(tmp_path)
+    update = "\n".join(json.dumps(doc) for doc in [
+        {"title": "Eiffel Tower", "url": "https://en.wikipedia.org/wiki/Eiffel_Tower",
+         "text": "The Eiffel Tower in Paris is 330 metres tall."},
+        {"title": "Moon", "url": "https://en.wikipedia.org/wiki/Moon", "text": "The Moon is made of rock."}
+    ])
+    assert kb.upsert(iter_jsonl(io.StringIO(update))) == 2
+
+    assert kb.search_sync("The Eiffel Tower is 330 metres tall")[0]["snippet"].endswith("330 metres tall.")
+    assert kb.search_sync("Eiffel Tower wrought-iron lattice completed 1889") == []
+    assert kb.search_sync("The Moon is made of rock")[0]["title"] == "Moon"
+
+
+def test_search_web_uses_local_results_before_the_web(tmp_path):
+    kb = build(tmp_path)
+    search_module.search_cache.clear()
+
+    async def web(query, max_results, timeout, kind="claim"):
+        return [{"title": "Web", "url": "http://web.example", "snippet": "..."}]
+
+    with patch("search_module.knowledge_base", kb):
+        with patch("search_module._search_backends", side_effect=web) as mock_web:
+            local = asyncio.run(search_module.search_web("Penicillin was discovered in 1928"))
+            remote = asyncio.run(search_module.search_web("The moon is made of green cheese"))
+
+    assert local[0]["title"] == "Penicillin"
+    assert remote[0]["title"] == "Web"
+    assert mock_web.call_count == 1
+    search_module.search_cache.clear()
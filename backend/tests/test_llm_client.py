@@ -0,0 +1,144 @@
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from groq import RateLimitError
+
+import llm_client
+from llm_client import AdaptiveLimiter, TokenBucket
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def make_rate_limit_error(retry_after="0"):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def make_response(content="[]", total_tokens=10):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(total_tokens=total_tokens)
+    )
+
+
+def test_token_bucket_takes_and_refunds():
+    bucket = TokenBucket(60)
+    asyncio.run(bucket.acquire(50))
+    assert bucket.tokens < 11
+    bucket.adjust(-40)
+    assert bucket.tokens >= 50
+
+
+def test_adaptive_limiter_aimd():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    for _ in range(10):
+        limiter.on_success()
+    assert 3 < limiter.limit <= 8
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+def test_adaptive_limiter_caps_in_flight():
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        await limiter.acquire()
+        try:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+        finally:
+            limiter.release()
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_retry_after_header_is_honoured():
+    assert llm_client.retry_after_seconds(make_rate_limit_error("7"), attempt=0) == 7.0
+    assert llm_client.retry_after_seconds(Exception("no response"), attempt=2) == 4.0
+
+
+def test_complete_retries_after_429():
+    create = AsyncMock(side_effect=[make_rate_limit_error("0"), make_response("ok")])
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch("llm_client.get_client", return_value=fake_client):
+        response = asyncio.run(llm_client.complete(
+            "test",
+            model="llama-3.1-8b-instant",
+            messages=[{"role": "user", "content": "hi"}],
+            temperature=0.1,
+            max_tokens=16
+        ))
+
+    assert response.choices[0].message.content == "ok"
+    assert create.await_count == 2
+
+
+def test_complete_raises_after_max_retries():
+    create = AsyncMock(side_effect=make_rate_limit_error("0"))
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with patch("llm_client.get_client", return_value=fake_client):
+        with patch("llm_client.GROQ_MAX_RETRIES", 1):
+            with pytest.raises(RateLimitError):
+                asyncio.run(llm_client.complete(
+                    "test",
+                    model="llama-3.1-8b-instant",
+                    messages=[{"role": "user", "content": "hi"}],
+                    temperature=0.1,
+                    max_tokens=16
+                ))
+
+    assert create.await_count == 2
+
+
+def test_complete_fails_fast_while_breaker_is_open():
+    create = AsyncMock(return_value=make_response("ok"))
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    breaker = CircuitBreaker("groq-test", min_calls=1, open_seconds=60)
+    breaker.record_failure(0.1)
+
+    with patch("llm_client.get_client", return_value=fake_client), patch("llm_client.breaker", breaker):
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(llm_client.complete(
+                "test",
+                model="llama-3.1-8b-instant",
+                messages=[{"role": "user", "content": "hi"}],
+                temperature=0.1,
+                max_tokens=16
+            ))
+
+    create.assert_not_awaited()
+
+
+def test_open_breaker_raises_without_touching_the_buckets():
+    breaker = CircuitBreaker("groq-test", min_calls=1, open_seconds=60)
+    breaker.record_failure(0.1)
+    request_bucket = SimpleNamespace(acquire=AsyncMock())
+    token_bucket = SimpleNamespace(acquire=AsyncMock())
+
+    with patch("llm_client.breaker", breaker), patch("llm_client.request_bucket", request_bucket), \
+         patch("llm_client.token_bucket", token_bucket):
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(llm_client.complete(
+                "test",
+                model="llama-3.1-8b-instant",
+                messages=[{"role": "user", "content": "hi"}],
+                temperature=0.1,
+                max_tokens=16
+            ))
+
+    request_bucket.acquire.assert_not_awaited()
+    token_bucket.acquire.assert_not_awaited()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+import llm_client
+import metrics
+from metrics import Counter, Histogram, LLM_CALLS, LLM_TOKENS, STAGE_SECONDS, ERRORS, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_latency_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "search")
+
+    lines = histogram.render()
+    assert lines[:2] == [
+        "# HELP unhallucinate_test_latency_seconds Test latency",
+        "# TYPE unhallucinate_test_latency_seconds histogram"
+    ]
+    assert lines[2:] == [
+        'unhallucinate_test_latency_seconds_bucket{stage="search",le="0.1"} 1',
+        'unhallucinate_test_latency_seconds_bucket{stage="search",le="1"} 3',
+        'unhallucinate_test_latency_seconds_bucket{stage="search",le="+Inf"} 4',
+        'unhallucinate_test_latency_seconds_sum{stage="search"} 4.05',
+        'unhallucinate_test_latency_seconds_count{stage="search"} 4'
+    ]
+
+
+def test_counter_labels_are_escaped():
+    counter = Counter("test_events_total", "Test events", ["kind"])
+    counter.inc('say "hi"\n')
+    counter.inc('say "hi"\n', amount=2)
+    assert counter.samples() == ['unhallucinate_test_events_total{kind="say \\"hi\\"\\n"} 3']
+
+
+def test_timed_records_latency_and_errors():
+    @timed("test_stage")
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    before = STAGE_SECONDS.count("test_stage")
+    with pytest.raises(ValueError):
+        asyncio.run(fail())
+    assert STAGE_SECONDS.count("test_stage") == before + 1
+    assert ERRORS.value("test_stage", "ValueError") >= 1
+
+
+def test_recording_an_event_costs_about_a_microsecond():
+    histogram = Histogram("test_overhead_seconds", "Overhead", ["stage"])
+    counter = Counter("test_overhead_total", "Overhead", ["module", "outcome"])
+    n = 20000
+
+    start = time.perf_counter()
+    for i in range(n):
+        histogram.observe(0.25, "check_fact")
+        counter.inc("fact_checker", "ok")
+    per_event = (time.perf_counter() - start) / (2 * n)
+
+    # Generous bound so slow CI machines pass; typically well under 1us
+    assert per_event < 5e-6
+
+
+def test_llm_calls_and_tokens_are_counted_per_module():
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="[]"))],
+        usage=SimpleNamespace(total_tokens=30, prompt_tokens=25, completion_tokens=5)
+    )
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=AsyncMock(return_value=response)
+    )))
+    calls, prompt = LLM_CALLS.value("metrics_test", "ok"), LLM_TOKENS.value("metrics_test", "prompt")
+
+    with patch("llm_client.get_client", return_value=fake_client):
+        asyncio.run(llm_client.complete(
+            "metrics_test", model="m", messages=[{"role": "user", "content": "hi"}],
+            temperature=0, max_tokens=5
+        ))
+
+    assert LLM_CALLS.value("metrics_test", "ok") == calls + 1
+    assert LLM_TOKENS.value("metrics_test", "prompt") == prompt + 25
+    assert LLM_TOKENS.value("metrics_test", "completion") >= 5
+
+
+def test_metrics_endpoint_reports_requests_and_cache_ratios(client):
+    metrics.record_cache("test_cache", True)
+    metrics.record_cache("test_cache", True)
+    metrics.record_cache("test_cache", False)
+
+    with patch("main.extract_claims", new_callable=AsyncMock) as mock_extract:
+        mock_extract.return_value = []
+        client.post("/verify", json={"text": "Some random text"})
+    client.get("/no-such-page")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'unhallucinate_http_requests_total{route="/verify",status="200"}' in body
+    assert 'unhallucinate_http_requests_total{route="other",status="404"}' in body
+    assert 'unhallucinate_http_requests_in_flight{route="/verify"} 0' in body
+    assert 'unhallucinate_cache_hit_ratio{cache="test_cache"} 0.6667' in body
+    assert "unhallucinate_circuit_breaker_open" in body
@@ -0,0 +1,78 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import request_timing
+from metrics import timed
+
+CLAIMS = [
+    {"claim": "The sky is blue", "start_char": 0, "end_char": 15},
+    {"claim": "Water boils at 100C", "start_char": 17, "end_char": 36}
+]
+
+
+@timed("check_fact")
+async def fake_check_fact(claim, search_results):
+    await asyncio.sleep(0.05)
+    request_timing.record_llm(prompt_tokens=100, completion_tokens=20)
+    return {"status": "VERIFIED", "reason": "ok", "votes": 1}
+
+
+def post_verify(client, **kwargs):
+    with patch("main.extract_claims", new_callable=AsyncMock) as mock_extract:
+        with patch("main.search_web", new_callable=AsyncMock) as mock_search:
+            with patch("main.check_fact", side_effect=fake_check_fact):
+                mock_extract.return_value = CLAIMS
+                mock_search.return_value = [{"title": "t", "url": "http://example.com", "snippet": "s"}]
+                return client.post("/verify", json={"text": "The sky is blue. Water boils at 100C."}, **kwargs)
+
+
+def test_timing_is_only_added_on_request(client):
+    assert "timing" not in post_verify(client).json()
+
+    timing = post_verify(client, params={"timing": "true"}).json()["timing"]
+    assert timing["stages"]["check_fact"]["calls"] == 2
+    assert timing["stages"]["check_fact"]["max_ms"] >= 50
+    assert [item["item"] for item in sorted(timing["items"], key=lambda i: i["item"])] == [
+        "The sky is blue", "Water boils at 100C"
+    ]
+    assert timing["llm_calls"] == 2
+    assert timing["llm_tokens"] == {"prompt": 200, "completion": 40}
+    assert timing["total_ms"] >= timing["stages"]["check_fact"]["max_ms"]
+    assert timing["profile"] is None
+
+
+def test_profile_header_samples_the_event_loop(client):
+    timing = post_verify(client, headers={"X-Debug-Profile": "1"}).json()["timing"]
+
+    assert timing["profile"]["samples"] > 0
+    assert timing["profile"]["top_functions"]
+    assert timing["profile"]["stacks"][0].endswith(tuple("0123456789"))
+
+
+def test_hooks_do_nothing_without_a_trace():
+    with request_timing.tracing(False) as trace:
+        request_timing.record_stage("search_web", 1.0)
+        request_timing.record_llm(10, 10)
+    assert trace is None
+    assert request_timing.current_trace.get() is None
+
+    with request_timing.tracing(True) as trace:
+        request_timing.record_stage("search_web", 0.5)
+    request_timing.record_stage("search_web", 0.5)
+    assert trace.report()["stages"] == {"search_web": {"calls": 1, "total_ms": 500.0, "max_ms": 500.0}}
+
+
+def test_profiles_are_written_to_profile_dir(tmp_path):
+    async def work():
+        with request_timing.tracing(True, profile=True) as trace:
+            await asyncio.sleep(0.05)
+        return trace
+
+    with patch("request_timing.PROFILE_DIR", str(tmp_path)):
+        trace = asyncio.run(work())
+
+    path = trace.profile["path"]
+    assert path.startswith(str(tmp_path))
+    assert "stacks" not in trace.profile
+    with open(path) as f:
+        assert f.read().strip()
@@ -0,0 +1,40 @@
+from reranker import BM25, select_evidence, tokenize
+
+RESULTS = [
+    {"title": "Paris travel guide", "url": "http://a.example",
+     "snippet": "Paris has many cafes. The Louvre opens at nine. Hotels are expensive in summer."},
+    {"title": "Eiffel Tower - History", "url": "http://b.example",
+     "snippet": "The Eiffel Tower was completed in 1889. It was built for the World's Fair. Tickets sell out."},
+    {"title": "Weather", "url": "http://c.example", "snippet": "Rain is expected tomorrow."},
+]
+
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize("The tower was completed") == tokenize("towers completing") == ["tower", "complet"]
+
+
+def test_bm25_prefers_rare_matching_terms():
+    docs = [tokenize("eiffel tower completed 1889"), tokenize("tower of pisa"), tokenize("paris cafes")]
+    scores = BM25(docs).scores(tokenize("When was the Eiffel Tower completed?"))
+    assert scores[0] > scores[1] > scores[2] == 0
+
+
+def test_select_evidence_keeps_best_sentences_in_source_order():
+    evidence = select_evidence("The Eiffel Tower was completed in 1889", RESULTS, top_k=2)
+    assert [r["url"] for r in evidence] == ["http://b.example"]
+    assert evidence[0]["snippet"].startswith("The Eiffel Tower was completed in 1889.")
+    assert evidence[0]["snippet"].count(".") == 2
+    assert evidence[0]["title"] == "Eiffel Tower - History"
+
+
+def test_select_evidence_respects_token_budget():
+    evidence = select_evidence("Eiffel Tower completed 1889 Paris cafes", RESULTS, top_k=10, token_budget=20)
+    kept = sum(len(r["title"]) + len(r["snippet"]) for r in evidence)
+    assert kept <= 20 * 4 + 2
+    assert evidence[0]["snippet"].startswith("The Eiffel Tower was completed")
+
+
+def test_select_evidence_without_snippets_is_a_no_op():
+    assert select_evidence("anything", []) == []
+    no_snippets = [{"title": "T", "url": "u", "snippet": ""}]
+    assert select_evidence("anything", no_snippets) == no_snippets
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import scenario_bench
+from scenario_bench import DEFAULT_BASELINE, DEFAULT_CASSETTE, compare, load_json, scenarios
+
+
+def test_committed_cassette_and_baselines_cover_every_scenario():
+    names = {name for name, _, _ in scenarios()}
+    cassette = load_json(DEFAULT_CASSETTE)
+    assert cassette["interactions"]
+    assert cassette["meta"]["search_backends"]
+    for latency in ("exact", "zero"):
+        baseline = load_json(DEFAULT_BASELINE.format(latency=latency))
+        assert set(baseline["scenarios"]) == names, f"re-record: see tests/README.md ({latency})"
+
+
+def test_compare_flags_more_calls_and_slower_requests():
+    before = {"a": {"latency_ms": 100.0, "llm_calls": 2, "search_calls": 1}}
+    same = {"a": {"latency_ms": 110.0, "llm_calls": 2, "search_calls": 1}}
+    worse = {"a": {"latency_ms": 200.0, "llm_calls": 3, "search_calls": 1}}
+    assert compare(before, same, tolerance=0.2, slack_ms=25) == []
+    assert compare(before, worse, tolerance=0.2, slack_ms=25) == [
+        "a: llm_calls 2 -> 3", "a: latency 100.0ms -> 200.0ms", "total latency 100.0ms -> 200.0ms"
+    ]
+    assert scenario_bench.summary(worse)["llm_calls"] == 3
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+import search_module
+from search_backends import (
+    FALLBACK, FANOUT, HEDGE, FakeBackend, FunctionBackend, Quota, SearchBackend, active_backends, fuse_results,
+    route
+)
+
+
+def result(url, title="Result"):
+    return {"title": title, "url": url, "snippet": "..."}
+
+
+def backend(name, results, delay=0.0, **settings):
+    calls = []
+
+    async def fetch(query, max_results, timeout):
+        calls.append(query)
+        await asyncio.sleep(delay)
+        return results
+
+    b = FunctionBackend(name, fetch, **settings)
+    b.calls_made = calls
+    return b
+
+
+def test_fanout_fuses_by_weight_and_dedupes_normalized_urls():
+    google = backend("google", [result("https://a.example"), result("https://b.example")], weight=1.0)
+    ddg = backend("ddg", [result("http://www.b.example/"), result("https://c.example")], weight=0.7)
+
+    results = asyncio.run(route(FANOUT, [google, ddg], "q", 3, 5, hedge_delay=1))
+
+    # b.example is returned by both backends, so it outranks a.example
+    assert [r["url"] for r in results] == ["https://b.example", "https://a.example", "https://c.example"]
+    assert fuse_results([(1.0, [result("https://x.example")])], 0) == []
+
+
+def test_fallback_only_calls_the_next_backend_on_an_empty_answer():
+    empty = backend("empty", [])
+    second = backend("second", [result("https://a.example")])
+    third = backend("third", [result("https://b.example")])
+
+    results = asyncio.run(route(FALLBACK, [empty, second, third], "q", 3, 5, hedge_delay=1))
+
+    assert results == [result("https://a.example")]
+    assert third.calls_made == []
+
+
+def test_hedge_and_per_backend_timeout():
+    slow = backend("slow", [result("https://slow.example")], delay=5, timeout=0.05)
+    fast = backend("fast", [result("https://fast.example")])
+
+    start = time.perf_counter()
+    assert asyncio.run(route(HEDGE, [slow, fast], "q", 3, 5, hedge_delay=10)) == [result("https://fast.example")]
+    # The slow backend's own timeout (plus grace) brought in the next one, not the hedge delay
+    assert time.perf_counter() - start < 1
+    assert slow.errors == 1
+
+
+def test_quota_exhausted_backends_are_skipped():
+    limited = backend("limited", [result("https://a.example")], quota=1)
+    other = backend("other", [result("https://b.example")])
+    registry = {"limited": limited, "other": other}
+
+    with patch.dict("search_backends._backends", registry, clear=True):
+        assert active_backends(["limited", "other"]) == [limited, other]
+        asyncio.run(limited.search("q", 3, 5))
+        assert active_backends(["limited", "other"]) == [other]
+        assert asyncio.run(limited.search("q", 3, 5)) == []
+    assert limited.calls_made == ["q"]
+
+    quota = Quota(limit=0)
+    assert quota.take() and quota.remaining() is None
+
+
+
+def test_backend_without_fetch_fails_when_created():
+    class Incomplete(SearchBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete")
+
+def test_fake_backend_is_deterministic_and_injects_errors():
+    fake = FakeBackend(latency_ms=0)
+    first = asyncio.run(fake.search("The sky is blue", 3, 5))
+    assert len(first) == 3
+    assert first == asyncio.run(fake.search("The sky is blue", 3, 5))
+    assert first != asyncio.run(fake.search("The sea is blue", 3, 5))
+
+    failing = FakeBackend(latency_ms=0, error_rate=1.0)
+    assert asyncio.run(failing.search("q", 3, 5)) == []
+    assert failing.errors == 1
+
+
+def test_search_web_routes_offline_through_the_fake_backend():
+    search_module.search_cache.clear()
+    fake = FakeBackend(latency_ms=1, seed=0)
+
+    with patch.dict("search_backends._backends", {"fake": fake}):
+        with patch("search_backends.SEARCH_BACKENDS", ["fake"]):
+            claim = asyncio.run(search_module.search_web("Water boils at 100C", max_results=2))
+            citations = asyncio.run(search_module.search_for_citation("Smith (2020). A paper."))
+
+    assert [r["url"].startswith("https://fake.example/") for r in claim] == [True, True]
+    assert len(citations) == 5
+    assert fake.calls == 3
+    search_module.search_cache.clear()
+
+
+def test_citation_policy_is_separate_from_claims():
+    async def passthrough(*args):
+        return []
+
+    with patch("search_module.route", side_effect=passthrough) as mock_route:
+        with patch.dict("search_module.SEARCH_POLICIES", {"claim": HEDGE, "citation": FANOUT}):
+            asyncio.run(search_module._search_backends("q", 3, 5, "citation"))
+            asyncio.run(search_module._search_backends("q", 3, 5))
+
+    assert [c.args[0] for c in mock_route.call_args_list] == [FANOUT, HEDGE]
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import search_module
+from scheduler import hedge
+from search_backends import normalize_url
+from search_module import merge_results
+
+
+def result(url, title="Result"):
+    return {"title": title, "url": url, "snippet": "..."}
+
+
+def test_hedge_starts_backup_after_delay_and_cancels_the_slow_call():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+            return ["slow"]
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def fast():
+        return ["fast"]
+
+    start = time.perf_counter()
+    assert asyncio.run(hedge([slow, fast], delay=0.05)) == ["fast"]
+    assert time.perf_counter() - start < 1
+    assert cancelled == ["slow"]
+
+
+def test_hedge_falls_back_immediately_on_empty_answer():
+    async def empty():
+        return []
+
+    async def backup():
+        return ["backup"]
+
+    start = time.perf_counter()
+    assert asyncio.run(hedge([empty, backup], delay=10)) == ["backup"]
+    assert time.perf_counter() - start < 1
+
+
+def test_hedge_returns_primary_when_it_answers_in_time():
+    calls = []
+
+    async def primary():
+        calls.append("primary")
+        return ["primary"]
+
+    async def backup():
+        calls.append("backup")
+        return ["backup"]
+
+    assert asyncio.run(hedge([primary, backup], delay=1)) == ["primary"]
+    assert calls == ["primary"]
+
+
+def test_search_backends_hedges_serpapi_with_duckduckgo():
+    async def slow_serpapi(query, max_results, timeout):
+        await asyncio.sleep(5)
+        return [result("http://google.example")]
+
+    async def ddg(query, max_results, timeout):
+        return [result("http://ddg.example")]
+
+    with patch("search_module.SERP_API_KEY", "key"), patch("search_module.SEARCH_HEDGE_DELAY_MS", 20):
+        with patch("search_module.search_serpapi", side_effect=slow_serpapi):
+            with patch("search_module.search_duckduckgo", side_effect=ddg):
+                results = asyncio.run(search_module._search_backends("q", 3, 5))
+
+    assert results == [result("http://ddg.example")]
+
+
+def test_normalize_url_ignores_cosmetic_differences():
+    assert normalize_url("https://www.Example.com/paper/?utm_source=x#abs") == normalize_url("http://example.com/paper")
+    assert normalize_url("https://example.com/paper?id=1") != normalize_url("https://example.com/paper?id=2")
+    assert normalize_url("https://ex.org/view?ref=feed&fbclid=abc") == normalize_url("https://ex.org/view")
+    # Parameters that only start like a tracking key still select a page
+    assert normalize_url("https://ex.org/view?refid=10") != normalize_url("https://ex.org/view?refid=11")
+    assert normalize_url("https://ex.org/view?reference=A") != normalize_url("https://ex.org/view?reference=B")
+
+
+def test_search_for_citation_runs_queries_concurrently_and_dedupes():
+    started = []
+
+    async def fake_search(query, max_results=3, kind="claim"):
+        assert kind == "citation"
+        started.append(query)
+        await asyncio.sleep(0.1)
+        if query.startswith('"'):
+            return [result("https://www.scholar.example/a/"), result("https://b.example")]
+        return [result("http://scholar.example/a"), result("https://c.example")]
+
+    with patch("search_module.search_web", side_effect=fake_search):
+        start = time.perf_counter()
+        results = asyncio.run(search_module.search_for_citation("He (2016). Deep residual learning."))
+        elapsed = time.perf_counter() - start
+
+    assert len(started) == 2
+    assert elapsed < 0.19
+    assert [r["url"] for r in results] == ["https://www.scholar.example/a/", "https://b.example", "https://c.example"]
+    assert merge_results([[result("http://a.example")], [result("https://a.example/")]], 5) == [result("http://a.example")]
@@ -0,0 +1,115 @@
+import io
+import json
+import time
+import queue
+import logging
+
+from structured_logging import (
+    DrainingQueueListener, DroppingQueueHandler, JsonFormatter, RequestContextFilter, flush_logging, request_id,
+    setup_logging, shutdown_logging
+)
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(self.format(record))
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_records_are_written_as_json_with_request_id_and_extras():
+    stream = io.StringIO()
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(JsonFormatter())
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.addFilter(RequestContextFilter())
+    listener = DrainingQueueListener(handler.queue, writer)
+    logger = make_logger("test_structured_json", handler)
+
+    listener.start()
+    token = request_id.set("req-1")
+    try:
+        logger.info("SerpAPI returned %d results", 3, extra={"backend": "serpapi"})
+    finally:
+        request_id.reset(token)
+    logger.warning("outside a request")
+    listener.stop()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["msg"] == "SerpAPI returned 3 results"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "test_structured_json"
+    assert first["request_id"] == "req-1"
+    assert first["backend"] == "serpapi"
+    assert "request_id" not in second
+
+
+def test_slow_sink_never_stalls_the_caller():
+    slow = SlowHandler(delay=0.05)
+    handler = DroppingQueueHandler(queue.Queue(maxsize=5))
+    listener = DrainingQueueListener(handler.queue, slow)
+    logger = make_logger("test_structured_slow", handler)
+
+    listener.start()
+    start = time.perf_counter()
+    for i in range(50):
+        logger.info("record %d", i)
+    elapsed = time.perf_counter() - start
+    listener.stop()
+
+    assert elapsed < 0.05
+    assert handler.dropped > 0
+    assert len(slow.records) + handler.dropped == 50
+
+
+def test_sampling_keeps_warnings_and_whole_requests():
+    sampler = RequestContextFilter(sample_rate=0.5)
+
+    def kept(level, rid):
+        token = request_id.set(rid)
+        try:
+            return sampler.filter(logging.LogRecord("x", level, "", 0, "msg", (), None))
+        finally:
+            request_id.reset(token)
+
+    ids = [f"request-{i}" for i in range(200)]
+    decisions = [kept(logging.INFO, rid) for rid in ids]
+    assert 40 < sum(decisions) < 160
+    # Same decision for every record of a request
+    assert decisions == [kept(logging.DEBUG, rid) for rid in ids]
+    assert all(kept(logging.WARNING, rid) for rid in ids)
+    assert not any(RequestContextFilter(0.0).sampled(rid) for rid in ids)
+
+
+def test_library_loggers_stay_at_warning_and_levels_are_restored():
+    setup_logging(level="DEBUG", library_level="WARNING")
+    try:
+        assert logging.getLogger("main").isEnabledFor(logging.DEBUG)
+        assert logging.getLogger("llm_client").isEnabledFor(logging.INFO)
+        assert not logging.getLogger("httpx").isEnabledFor(logging.INFO)
+        assert logging.getLogger("httpcore.connection").isEnabledFor(logging.WARNING)
+        flush_logging()
+    finally:
+        shutdown_logging()
+    assert logging.getLogger("main").level == logging.NOTSET
+
+
+def test_request_id_is_echoed_or_generated(client):
+    response = client.get("/health", headers={"X-Request-ID": "abc123"})
+    assert response.headers["x-request-id"] == "abc123"
+
+    generated = client.get("/health").headers["x-request-id"]
+    assert len(generated) == 16
+
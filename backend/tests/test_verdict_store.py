@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+import fact_checker
+from verdict_store import VerdictStore, verdict_key
+
+SEARCH_RESULTS = [{"title": "Sky Color", "url": "http://example.com", "snippet": "The sky is blue due to scattering."}]
+
+
+def make_response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_store_round_trip_and_ttl(tmp_path):
+    store = VerdictStore(str(tmp_path / "verdicts.sqlite3"), ttl=60, max_entries=100)
+    verdict = {"status": "VERIFIED", "reason": "ok"}
+
+    asyncio.run(store.put("k1", "claim", verdict))
+    assert asyncio.run(store.get("k1")) == verdict
+    assert asyncio.run(store.get("missing")) is None
+
+    expired = VerdictStore(store.path, ttl=-1, max_entries=100)
+    assert asyncio.run(expired.get("k1")) is None
+
+
+def test_store_survives_reopen_and_evicts_oldest(tmp_path):
+    path = str(tmp_path / "verdicts.sqlite3")
+    store = VerdictStore(path, ttl=60, max_entries=2)
+    for i in range(3):
+        store.put_sync(f"k{i}", "claim", {"status": "VERIFIED", "reason": str(i)})
+    store.evict_sync()
+
+    reopened = VerdictStore(path, ttl=60, max_entries=2)
+    assert reopened.get_sync("k0") is None
+    assert reopened.get_sync("k2") == {"status": "VERIFIED", "reason": "2"}
+
+
+def test_disabled_store_is_a_no_op():
+    store = VerdictStore("", ttl=60, max_entries=10)
+    asyncio.run(store.put("k", "claim", {"status": "VERIFIED"}))
+    assert asyncio.run(store.get("k")) is None
+
+
+def test_key_normalizes_claim_and_evidence_order():
+    other = [{"title": "X", "url": "http://x", "snippet": "y"}]
+    a = verdict_key("claim", {"claim": "The sky is blue"}, SEARCH_RESULTS + other, "v1")
+    b = verdict_key("claim", {"claim": "the  sky is BLUE"}, other + SEARCH_RESULTS, "v1")
+    c = verdict_key("claim", {"claim": "The sky is blue"}, SEARCH_RESULTS, "v2")
+    assert a == b
+    assert a != c
+
+
+def test_check_fact_repeat_claim_costs_no_llm_calls(tmp_path):
+    store = VerdictStore(str(tmp_path / "verdicts.sqlite3"), ttl=60, max_entries=100)
+    llm = AsyncMock(return_value=make_response('{"status": "VERIFIED", "reason": "Sources agree"}'))
+
+    with patch("fact_checker.verdicts", store):
+        with patch("fact_checker.complete", llm):
+            first = asyncio.run(fact_checker.check_fact("The sky is blue", SEARCH_RESULTS))
+            calls_after_first = llm.await_count
+            second = asyncio.run(fact_checker.check_fact("The sky is blue", SEARCH_RESULTS))
+
+    assert first == second
+    assert first["status"] == "VERIFIED"
+    assert llm.await_count == calls_after_first
+
+
+def test_check_fact_does_not_cache_model_errors(tmp_path):
+    store = VerdictStore(str(tmp_path / "verdicts.sqlite3"), ttl=60, max_entries=100)
+    llm = AsyncMock(side_effect=RuntimeError("groq down"))
+
+    with patch("fact_checker.verdicts", store):
+        with patch("fact_checker.complete", llm):
+            asyncio.run(fact_checker.check_fact("The sky is blue", SEARCH_RESULTS))
+            calls_after_first = llm.await_count
+            asyncio.run(fact_checker.check_fact("The sky is blue", SEARCH_RESULTS))
+
+    assert llm.await_count == 2 * calls_after_first
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+import fact_checker
+from verdict_store import VerdictStore
+from voting import collect_votes, describe_votes
+
+SEARCH_RESULTS = [{"title": "Sky Color", "url": "http://example.com", "snippet": "The sky is blue."}]
+
+
+def run_votes(statuses, settings=(0.1, 0.3, 0.5)):
+    calls = []
+
+    async def vote(setting):
+        calls.append(setting)
+        return (statuses[len(calls) - 1], "reason")
+
+    return asyncio.run(collect_votes(vote, list(settings))), calls
+
+
+def test_adaptive_voting_stops_when_first_two_agree():
+    results, calls = run_votes(["VERIFIED", "VERIFIED", "HALLUCINATED"])
+    assert len(results) == 2
+    assert calls == [0.1, 0.3]
+
+
+def test_adaptive_voting_asks_for_tie_breaker():
+    results, calls = run_votes(["VERIFIED", "HALLUCINATED", "HALLUCINATED"])
+    assert [r[0] for r in results] == ["VERIFIED", "HALLUCINATED", "HALLUCINATED"]
+    assert calls == [0.1, 0.3, 0.5]
+
+
+def test_full_voting_mode_runs_every_vote():
+    with patch("voting.VOTING_MODE", "full"):
+        results, calls = run_votes(["VERIFIED", "VERIFIED", "VERIFIED"])
+    assert len(results) == 3
+
+
+def test_describe_votes():
+    assert describe_votes(2, 2, "runs", "VERIFIED", "ok") == "All 2 runs agree: ok"
+    assert describe_votes(2, 3, "runs", "VERIFIED", "ok") == "2/3 runs agree: ok"
+    assert describe_votes(1, 3, "checks", "VERIFIED", "ok").startswith("Checks disagree (1/3 each)")
+
+
+def test_check_fact_reports_votes_used(tmp_path):
+    store = VerdictStore("", ttl=60, max_entries=10)
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+        content='{"status": "VERIFIED", "reason": "Sources agree"}'
+    ))])
+    llm = AsyncMock(return_value=response)
+
+    with patch("fact_checker.verdicts", store):
+        with patch("fact_checker.complete", llm):
+            verdict = asyncio.run(fact_checker.check_fact("The sky is blue", SEARCH_RESULTS))
+
+    assert verdict["status"] == "VERIFIED"
+    assert verdict["votes"] == 2
+    assert llm.await_count == 2
+    assert verdict["reason"].startswith("All 2 runs agree")
@@ -0,0 +1,168 @@
+"""
+Verdict Store Module - Persistent cache for fact-check and citation verdicts
+INPUT: Claim / citation fields + the evidence they were judged against
+OUTPUT: Previously computed verdict dicts
+CONSTRAINT: SQLite-backed, TTL + size-bounded, safe to share between worker processes
+Set VERDICT_CACHE_PATH to an empty string to disable the store.
+"""
+
+import os
+import logging
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from metrics import record_cache
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+VERDICT_CACHE_PATH = os.getenv(
+    "VERDICT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "verdict_cache.sqlite3")
+)
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", str(7 * 24 * 3600)))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "50000"))
+
+# Size-based eviction runs once every N writes
+EVICT_EVERY = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_verdicts_accessed ON verdicts (accessed_at);
+"""
+
+
+def _normalize(value: object) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def prompt_version(*parts: object) -> str:
+    """Short hash of prompt/model settings so changing them invalidates old verdicts."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def verdict_key(kind: str, fields: Dict, search_results: List[Dict], version: str) -> str:
+    """
+    Build a cache key from normalized fields and evidence snippets.
+
+    Args:
+        kind: "claim" or "citation"
+        fields: Claim text or citation fields being judged
+        search_results: Evidence the verdict is based on
+        version: prompt_version() of the judging prompt
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {
+        "kind": kind,
+        "version": version,
+        "fields": {k: _normalize(v) for k, v in sorted(fields.items())},
+        "evidence": sorted(
+            f"{_normalize(r.get('title'))}: {_normalize(r.get('snippet'))}"
+            for r in search_results
+        )
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class VerdictStore:
+    """SQLite verdict cache. Blocking calls run in worker threads."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            # WAL + busy timeout let several uvicorn workers share the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get_sync(self, key: str) -> Optional[Dict]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT verdict, created_at FROM verdicts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] + self.ttl < now:
+            with conn:
+                conn.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+            return None
+        with conn:
+            conn.execute("UPDATE verdicts SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put_sync(self, key: str, kind: str, verdict: Dict) -> None:
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, kind, verdict, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(verdict), now, now)
+            )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict_sync()
+
+    def evict_sync(self) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM verdicts WHERE key IN ("
+                "SELECT key FROM verdicts ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return the stored verdict, or None on a miss. Never raises."""
+        if not self.enabled:
+            return None
+        try:
+            verdict = await asyncio.to_thread(self.get_sync, key)
+        except sqlite3.Error as e:
+            log.error("Verdict cache read error: %s", e)
+            return None
+        record_cache("verdicts", verdict is not None)
+        return verdict
+
+    async def put(self, key: str, kind: str, verdict: Dict) -> None:
+        """Store a verdict. Failures are logged and ignored."""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self.put_sync, key, kind, verdict)
+        except sqlite3.Error as e:
+            log.error("Verdict cache write error: %s", e)
+
+
+verdicts = VerdictStore(VERDICT_CACHE_PATH, VERDICT_CACHE_TTL, VERDICT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,91 @@
+"""
+Voting Module - Majority voting over repeated LLM judgements
+INPUT: Async vote function (settings -> result tuple) + per-vote settings
+OUTPUT: List of vote results (or one list per item for batched votes)
+CONSTRAINT: "adaptive" mode asks for two votes and only adds a tie-breaker
+            when they disagree; "full" mode always runs every vote
+"""
+
+import os
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Sequence, Tuple
+
+VOTING_MODE = os.getenv("VOTING_MODE", "adaptive").lower()
+
+
+async def collect_votes(
+    vote: Callable[[Any], Awaitable[Tuple]],
+    settings: Sequence[Any]
+) -> List[Tuple]:
+    """
+    Collect votes, stopping early once a majority is already decided.
+
+    Args:
+        vote: Async function returning a tuple whose first item is the status
+        settings: One entry per vote, e.g. its temperature (3 for a best-of-3)
+
+    Returns:
+        The votes actually cast (2 or 3 in adaptive mode)
+    """
+    if VOTING_MODE != "adaptive" or len(settings) != 3:
+        return list(await asyncio.gather(*(vote(s) for s in settings)))
+
+    # Two matching votes already win a best-of-3
+    first_two = list(await asyncio.gather(vote(settings[0]), vote(settings[1])))
+    if first_two[0][0] == first_two[1][0]:
+        return first_two
+
+    tie_breaker = await vote(settings[2])
+    return first_two + [tie_breaker]
+
+
+async def collect_batch_votes(
+    vote_batch: Callable[[List[int], Any], Awaitable[List[Tuple]]],
+    settings: Sequence[Any],
+    size: int
+) -> List[List[Tuple]]:
+    """
+    Batched version of collect_votes: each round votes on many items in one call.
+
+    Args:
+        vote_batch: Async function (item indices, setting) -> one vote per index
+        settings: One entry per vote round
+        size: Number of items
+
+    Returns:
+        Votes per item; in adaptive mode only tied items get a third round
+    """
+    everyone = list(range(size))
+    if VOTING_MODE != "adaptive" or len(settings) != 3:
+        rounds = await asyncio.gather(*(vote_batch(everyone, s) for s in settings))
+        return [[r[i] for r in rounds] for i in everyone]
+
+    first, second = await asyncio.gather(
+        vote_batch(everyone, settings[0]),
+        vote_batch(everyone, settings[1])
+    )
+    votes = [[first[i], second[i]] for i in everyone]
+
+    tied = [i for i in everyone if first[i][0] != second[i][0]]
+    if tied:
+        tie_breakers = await vote_batch(tied, settings[2])
+        for i, vote in zip(tied, tie_breakers):
+            votes[i].append(vote)
+    return votes
+
+
+def majority(statuses: List[str]) -> Tuple[str, int]:
+    """Return the most common status and how many votes it got."""
+    status, count = Counter(statuses).most_common(1)[0]
+    return status, count
+
+
+def describe_votes(count: int, total: int, label: str, status: str, reason: str) -> str:
+    """Human-readable voting summary, e.g. '2/3 runs agree: ...'."""
+    if count == total:
+        return f"All {total} {label} agree: {reason}"
+    if count > 1:
+        return f"{count}/{total} {label} agree: {reason}"
+    return f"{label.capitalize()} disagree (1/{total} each). Using {status}: {reason}"
+
@@ -18,7 +18,8 @@ export default function HallucinationDetector() {
   const [factIndex, setFactIndex] = useState(0);
   const [mode, setMode] = useState<VerificationMode>("claims");
   const [scrollProgress, setScrollProgress] = useState(0);
-  const MAX_CHAR_LIMIT = 200;
+  // Matches the backend cap (MAX_DOCUMENT_CHARS); longer documents are chunked server-side
+  const MAX_CHAR_LIMIT = 100000;
 
   // Preserving original backend connection logic
   const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
@@ -41,6 +42,37 @@ export default function HallucinationDetector() {
     return () => window.removeEventListener('scroll', handleScroll);
   }, []);
 
+  // Streaming endpoints send one NDJSON event per line so results show up as they finish
+  const readResults = async <T,>(body: ReadableStream<Uint8Array>, setPartial: (results: T[]) => void) => {
+    const partial: T[] = [];
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    const handleEvent = (line: string) => {
+      if (!line.trim()) return;
+      const event = JSON.parse(line);
+      if (event.event === "claims" || event.event === "citations") {
+        setPartial([]);
+      } else if (event.event === "result") {
+        partial[event.index] = event.result;
+        setPartial(partial.filter(Boolean));
+      } else if (event.event === "error") {
+        throw new Error(event.detail);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop() ?? "";
+      lines.forEach(handleEvent);
+    }
+    handleEvent(buffer);
+  };
+
   const handleVerify = async () => {
     if (!inputText.trim()) return;
 
@@ -55,21 +87,19 @@ export default function HallucinationDetector() {
     setCitationResults(null);
 
     try {
-      const endpoint = mode === "claims" ? "/verify" : "/verify-citations";
+      const endpoint = mode === "claims" ? "/verify/stream" : "/verify-citations/stream";
       const response = await fetch(`${API_BASE_URL}${endpoint}`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ text: inputText }),
       });
 
-      if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+      if (!response.ok || !response.body) throw new Error(`HTTP error! status: ${response.status}`);
 
-      const data = await response.json();
-      
       if (mode === "claims") {
-        setResults(data.results || []);
+        await readResults<ClaimResult>(response.body, setResults);
       } else {
-        setCitationResults(data.results || []);
+        await readResults<CitationResult>(response.body, setCitationResults);
       }
     } catch (err) {
       setError(err instanceof Error ? err.message : "An unexpected error occurred.");
@@ -9,6 +9,7 @@ export interface ClaimResult {
   status: "VERIFIED" | "HALLUCINATED" | "UNVERIFIABLE";
   reason: string;
   sources: Source[];
+  votes?: number;
 }
 
 export interface CitationResult {
@@ -22,6 +23,7 @@ export interface CitationResult {
   errors: string[];
   reason: string;
   sources: Source[];
+  votes?: number;
 }
 
 export type VerificationMode = "claims" | "citations";
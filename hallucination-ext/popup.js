@@ -1,6 +1,7 @@
 // Configuration - Your Render.io backend URL
 const BACKEND_URL = 'https://unhallucinate-ai.onrender.com';
-const MAX_CHAR_LIMIT = 200;
+// Matches the backend cap (MAX_DOCUMENT_CHARS); longer documents are chunked server-side
+const MAX_CHAR_LIMIT = 100000;
 
 // Mode state
 let currentMode = 'fact'; // 'fact' or 'citation'
@@ -37,7 +38,7 @@ document.addEventListener('DOMContentLoaded', async () => {
       
       if (results && results[0] && results[0].result) {
         const selectedText = results[0].result;
-        // Trim to 200 characters if longer
+        // Trim to the character limit if longer
         textInput.value = selectedText.substring(0, MAX_CHAR_LIMIT);
         updateCharCount();
       }
@@ -81,7 +82,7 @@ textInput.addEventListener('input', () => {
   updateCharCount();
 });
 
-// Handle paste event to trim text to 200 characters
+// Handle paste event to trim text to the character limit
 textInput.addEventListener('paste', (e) => {
   e.preventDefault();
   const pastedText = e.clipboardData.getData('text');
@@ -131,10 +132,10 @@ verifyBtn.addEventListener('click', async () => {
   clearError();
 
   try {
-    // Determine endpoint based on mode
+    // Streaming endpoints send one NDJSON event per line, so long documents show results as they finish
     const endpoint = currentMode === 'fact' 
-      ? `${BACKEND_URL}/verify` 
-      : `${BACKEND_URL}/verify-citations`;
+      ? `${BACKEND_URL}/verify/stream` 
+      : `${BACKEND_URL}/verify-citations/stream`;
     
     // Call backend API
     const response = await fetch(endpoint, {
@@ -145,12 +146,14 @@ verifyBtn.addEventListener('click', async () => {
       body: JSON.stringify({ text: text })
     });
 
-    if (!response.ok) {
+    if (!response.ok || !response.body) {
       throw new Error(`Backend error: ${response.status}`);
     }
 
-    const data = await response.json();
-    displayResults(data);
+    const results = await readResults(response.body, displayResults);
+    if (results.length === 0) {
+      showError('No claims found in the text.');
+    }
 
   } catch (error) {
     console.error('Verification error:', error);
@@ -160,14 +163,41 @@ verifyBtn.addEventListener('click', async () => {
   }
 });
 
+// Read NDJSON events, calling onResults with the results finished so far after each one
+async function readResults(body, onResults) {
+  const partial = [];
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const handleEvent = (line) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line);
+    if (event.event === 'result') {
+      partial[event.index] = event.result;
+      onResults(partial.filter(Boolean));
+    } else if (event.event === 'error') {
+      throw new Error(event.detail);
+    }
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.forEach(handleEvent);
+  }
+  handleEvent(buffer);
+  return partial.filter(Boolean);
+}
+
 // Display results
-function displayResults(data) {
-  if (!data.results || data.results.length === 0) {
-    showError('No claims found in the text.');
+function displayResults(results) {
+  if (results.length === 0) {
     return;
   }
-
-  const results = data.results;
   
   // Calculate stats
   const verified = results.filter(r => r.status === 'VERIFIED').length;
@@ -222,7 +252,7 @@ function displayResults(data) {
       <div class="claim-header">
         <span class="claim-status">${statusEmoji} ${result.status}</span>
       </div>
-      <p class="claim-text">${escapeHtml(result.claim)}</p>
+      <p class="claim-text">${escapeHtml(result.claim || result.raw_citation)}</p>
       <p class="claim-reason">${escapeHtml(result.reason || '')}</p>
       ${sourcesHtml}
     `;